@@ -2,278 +2,97 @@
 from __future__ import annotations
 
 import base64
+import bisect
 import hashlib
 import hmac
+import argparse
+import csv
+import html
+import http.client
+import io
+import importlib
+import itertools
 import json
+import math
 import os
+import random
+import re
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from getpass import getpass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+from urllib.parse import urlparse
 
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich.text import Text
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    import readline
+except ImportError:  # Windows without pyreadline
+    readline = None
+
+
+class LazyRich:
+    """A Rich class (or console) that is imported on first use.
+
+    Headless commands such as ``dashboard --format json`` never touch these, so
+    they run without loading Rich at all.
+    """
+
+    def __init__(self, module: str, name: str, instance: Optional[Dict[str, Any]] = None) -> None:
+        self._module = module
+        self._name = name
+        self._instance = instance
+        self._target: Any = None
+
+    def resolve(self) -> Any:
+        if self._target is None:
+            target = getattr(importlib.import_module(self._module), self._name)
+            self._target = target(**self._instance) if self._instance is not None else target
+        return self._target
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+
+Console = LazyRich("rich.console", "Console")
+Panel = LazyRich("rich.panel", "Panel")
+Table = LazyRich("rich.table", "Table")
+Text = LazyRich("rich.text", "Text")
+Group = LazyRich("rich.console", "Group")
+Live = LazyRich("rich.live", "Live")
 
 DATA_FILE = Path(__file__).parent / "tagihan_data.json"
-console = Console()
-
-LANGUAGE_STRINGS: Dict[str, Dict[str, str]] = {
-    "id": {
-        "language_name": "Bahasa Indonesia (ID)",
-        "dashboard_title": "Dasbor Manajemen Keuangan 💰",
-        "year_label": "Tahun",
-        "month_label": "Bulan",
-        "monthly_report": "Laporan Bulanan 📊",
-        "stat_total_income": "Total Pendapatan",
-        "stat_budgeted_expenses": "Anggaran Terencana",
-        "stat_spending": "Pengeluaran {month}",
-        "stat_savings": "Tabungan {month}",
-        "expenses_list": "Daftar Pengeluaran",
-        "column_name": "Nama",
-        "column_allocation": "Alokasi 💰",
-        "column_realization": "Realisasi 💵",
-        "column_progress": "Progres Penggunaan Anggaran",
-        "column_percent_usage": "% Penggunaan",
-        "column_amount": "Jumlah",
-        "column_category": "Kategori",
-        "no_expenses": "Belum ada pengeluaran.",
-        "error_positive_int": "Masukkan angka bulat tidak negatif.",
-        "prompt_income_name": "Nama sumber pendapatan: ",
-        "prompt_amount": "Jumlah (Rp): ",
-        "income_added": "Sumber pendapatan berhasil ditambahkan.",
-        "prompt_saving_name": "Nama tabungan: ",
-        "saving_added": "Tabungan berhasil ditambahkan.",
-        "prompt_budget_name": "Nama anggaran: ",
-        "prompt_budget_category": "Kategori (opsional): ",
-        "budget_added": "Item anggaran berhasil ditambahkan.",
-        "no_budget_items": "Belum ada item anggaran.",
-        "no_budget_items_edit": "Belum ada item anggaran untuk diedit.",
-        "prompt_budget_index": "Pilih nomor item untuk update realisasi: ",
-        "prompt_budget_realization": "Realisasi (Rp): ",
-        "invalid_choice": "Pilihan tidak dikenal.",
-        "realization_updated": "Realisasi berhasil diperbarui.",
-        "realization_mode_instruction": "Pilih metode input realisasi:",
-        "realization_mode_manual": "1. Masukkan nominal secara manual",
-        "realization_mode_percentage": "2. Masukkan berdasarkan persentase (1-100%)",
-        "realization_mode_full": "3. Tandai 100% tercapai",
-        "prompt_percentage": "Persentase (1-100): ",
-        "invalid_percentage": "Persentase harus antara 1 dan 100.",
-        "percentage_unavailable": "Alokasi 0, gunakan input manual.",
-        "copy_prev_missing": "Tidak ada data untuk {month_label}.",
-        "copy_prev_confirm": "Salin data {month_label} ke periode saat ini? (y/n): ",
-        "copy_prev_success": "Data dari {month_label} berhasil disalin.",
-        "copy_prev_adjust_prompt": "Sesuaikan alokasi anggaran hasil salin? (y/n): ",
-        "adjust_budget_header": "Sesuaikan alokasi anggaran",
-        "adjust_skip_hint": "Tekan Enter untuk mempertahankan nilai lama.",
-        "adjust_budget_prompt": "Alokasi baru untuk {name} (saat ini {allocation}): ",
-        "adjust_invalid_amount": "Masukkan angka bulat tidak negatif atau kosong untuk melewati.",
-        "adjust_complete": "{count} item diperbarui.",
-        "delete_category_prompt": "Pilih kategori untuk dihapus:",
-        "delete_income_option": "Sumber pendapatan",
-        "delete_saving_option": "Tabungan",
-        "delete_budget_option": "Item anggaran",
-        "delete_prompt_choice": "Masukkan pilihan: ",
-        "delete_no_items": "Tidak ada {category} untuk dihapus.",
-        "delete_prompt_index": "Pilih nomor yang akan dihapus: ",
-        "invalid_number": "Nomor tidak valid.",
-        "delete_success": "{name} berhasil dihapus.",
-        "paste_menu_title": "Tempel dari Spreadsheet",
-        "paste_menu_option_income": "Tempel sumber pendapatan",
-        "paste_menu_option_saving": "Tempel tabungan",
-        "paste_menu_option_budget": "Tempel item anggaran",
-        "paste_instructions": "Tempel data yang disalin dari spreadsheet. Tekan Enter pada baris kosong untuk selesai.",
-        "paste_finish_hint": "Gunakan tab antar kolom agar sistem mudah membaca data.",
-        "paste_no_rows": "Tidak ada data yang ditempel.",
-        "paste_errors_header": "Baris berikut dilewati:",
-        "paste_error": "Baris {line}: {reason}",
-        "paste_reason_missing_name": "kolom nama kosong",
-        "paste_reason_missing_amount": "kolom jumlah tidak ditemukan",
-        "paste_reason_invalid_amount": "jumlah tidak dapat dibaca",
-        "paste_reason_invalid_realization": "realisasi tidak dapat dibaca",
-        "paste_preview_title": "Pratinjau data yang akan ditambahkan",
-        "paste_confirm": "Tambahkan {count} {target}? (y/n): ",
-        "paste_success": "{count} {target} berhasil ditambahkan.",
-        "paste_no_valid_rows": "Tidak ada baris valid untuk ditambahkan.",
-        "paste_target_income": "sumber pendapatan",
-        "paste_target_saving": "tabungan",
-        "paste_target_budget": "item anggaran",
-        "paste_cancelled": "Penambahan dibatalkan.",
-        "budgeting_menu_title": "Menu Anggaran",
-        "budgeting_menu_add_income": "Tambah sumber pendapatan",
-        "budgeting_menu_add_saving": "Tambah tabungan",
-        "budgeting_menu_add_budget": "Tambah item anggaran",
-        "budgeting_menu_edit_budget": "Edit realisasi anggaran",
-        "budgeting_menu_delete_item": "Hapus item",
-        "budgeting_menu_copy_prev": "Salin data bulan sebelumnya",
-        "budgeting_menu_paste": "Tempel dari spreadsheet",
-        "budgeting_menu_back": "Kembali ke menu utama",
-        "prompt_choice": "Masukkan pilihan: ",
-        "main_menu_title": "Menu Utama",
-        "main_menu_dashboard": "Lihat Dashboard",
-        "main_menu_budget": "Menu Anggaran",
-        "main_menu_period": "Ubah Bulan/Tahun",
-        "main_menu_language": "Ganti Bahasa",
-        "main_menu_exit": "Keluar",
-        "thank_you": "Terima kasih! Data disimpan.",
-        "period_updated": "Periode berhasil diperbarui.",
-        "prompt_year": "Tahun (contoh 2025): ",
-        "prompt_month": "Bulan (contoh Mei): ",
-        "language_menu_title": "Ganti Bahasa",
-        "language_current": "Bahasa saat ini: {language}",
-        "language_menu_prompt": "Pilih bahasa (nomor atau kode): ",
-        "language_changed": "Bahasa diperbarui menjadi {language}.",
-        "data_corrupt_reset": "File data rusak atau tidak bisa dibaca. Membuat ulang data default.",
-        "list_budget_line": "{index}. {name}: Alokasi {allocation}, Realisasi {realization}",
-        "default_name": "Tanpa Nama",
-        "default_item_name": "Item",
-        "auth_title": "Masuk atau Daftar",
-        "prompt_email": "Masukkan email: ",
-        "email_required": "Email tidak boleh kosong.",
-        "user_not_found_signup": "Email belum terdaftar. Membuat akun baru...",
-        "prompt_password": "Masukkan kata sandi: ",
-        "prompt_password_confirm": "Konfirmasi kata sandi: ",
-        "password_mismatch": "Kata sandi tidak cocok. Coba lagi.",
-        "signup_success": "Akun baru berhasil dibuat untuk {email}.",
-        "login_success": "Berhasil masuk sebagai {email}.",
-        "invalid_credentials": "Email atau kata sandi salah.",
-        "period_year_instruction": "Pilih tahun (masukkan nomor opsi):",
-        "period_year_option_prev": "1. Tahun sebelumnya ({year})",
-        "period_year_option_current": "2. Tahun berjalan ({year})",
-        "period_year_option_next": "3. Tahun berikutnya ({year})",
-        "period_month_instruction": "Pilih bulan dengan memasukkan angka 1-12:",
-        "period_month_option": "{number}. {name}",
-        "invalid_month": "Nomor bulan tidak valid.",
-    },
-    "en": {
-        "language_name": "English (EN)",
-        "dashboard_title": "Money Management Dashboard 💰",
-        "year_label": "Year",
-        "month_label": "Month",
-        "monthly_report": "Monthly Report 📊",
-        "stat_total_income": "Total Income",
-        "stat_budgeted_expenses": "Budgeted Expenses",
-        "stat_spending": "{month} Spending",
-        "stat_savings": "{month} Savings",
-        "expenses_list": "Expenses List",
-        "column_name": "Name",
-        "column_allocation": "Allocation 💰",
-        "column_realization": "Realization 💵",
-        "column_progress": "Budget Usage Progress",
-        "column_percent_usage": "% Usage",
-        "column_amount": "Amount",
-        "column_category": "Category",
-        "no_expenses": "No expenses yet.",
-        "error_positive_int": "Enter a non-negative whole number.",
-        "prompt_income_name": "Income source name: ",
-        "prompt_amount": "Amount (Rp): ",
-        "income_added": "Income source added successfully.",
-        "prompt_saving_name": "Saving name: ",
-        "saving_added": "Saving added successfully.",
-        "prompt_budget_name": "Budget item name: ",
-        "prompt_budget_category": "Category (optional): ",
-        "budget_added": "Budget item added successfully.",
-        "no_budget_items": "No budget items yet.",
-        "no_budget_items_edit": "No budget items available to edit.",
-        "prompt_budget_index": "Select item number to update realization: ",
-        "prompt_budget_realization": "Realization (Rp): ",
-        "invalid_choice": "Unknown choice.",
-        "realization_updated": "Realization updated successfully.",
-        "realization_mode_instruction": "Choose realization input method:",
-        "realization_mode_manual": "1. Enter amount manually",
-        "realization_mode_percentage": "2. Enter based on percentage (1-100%)",
-        "realization_mode_full": "3. Mark as 100% complete",
-        "prompt_percentage": "Percentage (1-100): ",
-        "invalid_percentage": "Percentage must be between 1 and 100.",
-        "percentage_unavailable": "Allocation is 0, please use manual input.",
-        "copy_prev_missing": "No data available for {month_label}.",
-        "copy_prev_confirm": "Copy {month_label} data into the current period? (y/n): ",
-        "copy_prev_success": "Copied data from {month_label} successfully.",
-        "copy_prev_adjust_prompt": "Adjust copied budget allocations? (y/n): ",
-        "adjust_budget_header": "Adjust budget allocations",
-        "adjust_skip_hint": "Press Enter to keep the current value.",
-        "adjust_budget_prompt": "New allocation for {name} (currently {allocation}): ",
-        "adjust_invalid_amount": "Enter a non-negative whole number or leave blank to skip.",
-        "adjust_complete": "Updated {count} items.",
-        "delete_category_prompt": "Choose a category to delete:",
-        "delete_income_option": "Income sources",
-        "delete_saving_option": "Savings",
-        "delete_budget_option": "Budget items",
-        "delete_prompt_choice": "Enter your choice: ",
-        "delete_no_items": "No {category} to delete.",
-        "delete_prompt_index": "Select the number to delete: ",
-        "invalid_number": "Number is not valid.",
-        "delete_success": "{name} deleted successfully.",
-        "paste_menu_title": "Paste from Spreadsheet",
-        "paste_menu_option_income": "Paste income sources",
-        "paste_menu_option_saving": "Paste savings",
-        "paste_menu_option_budget": "Paste budget items",
-        "paste_instructions": "Paste data copied from your spreadsheet. Submit an empty line to finish.",
-        "paste_finish_hint": "Use tab-separated columns so the parser can read them easily.",
-        "paste_no_rows": "No data was pasted.",
-        "paste_errors_header": "Skipped rows:",
-        "paste_error": "Row {line}: {reason}",
-        "paste_reason_missing_name": "missing name column",
-        "paste_reason_missing_amount": "amount column not found",
-        "paste_reason_invalid_amount": "amount could not be parsed",
-        "paste_reason_invalid_realization": "realization could not be parsed",
-        "paste_preview_title": "Preview of data to be added",
-        "paste_confirm": "Add {count} {target}? (y/n): ",
-        "paste_success": "Added {count} {target} successfully.",
-        "paste_no_valid_rows": "No valid rows to add.",
-        "paste_target_income": "income sources",
-        "paste_target_saving": "savings",
-        "paste_target_budget": "budget items",
-        "paste_cancelled": "Paste cancelled.",
-        "budgeting_menu_title": "Budgeting Menu",
-        "budgeting_menu_add_income": "Add income source",
-        "budgeting_menu_add_saving": "Add saving",
-        "budgeting_menu_add_budget": "Add budget item",
-        "budgeting_menu_edit_budget": "Edit budget realization",
-        "budgeting_menu_delete_item": "Delete item",
-        "budgeting_menu_copy_prev": "Copy previous month's data",
-        "budgeting_menu_paste": "Paste from spreadsheet",
-        "budgeting_menu_back": "Back to main menu",
-        "prompt_choice": "Enter your choice: ",
-        "main_menu_title": "Main Menu",
-        "main_menu_dashboard": "View Dashboard",
-        "main_menu_budget": "Budgeting Menu",
-        "main_menu_period": "Change Month/Year",
-        "main_menu_language": "Change Language",
-        "main_menu_exit": "Exit",
-        "thank_you": "Thank you! Data saved.",
-        "period_updated": "Period updated successfully.",
-        "prompt_year": "Year (e.g. 2025): ",
-        "prompt_month": "Month (e.g. May): ",
-        "language_menu_title": "Change Language",
-        "language_current": "Current language: {language}",
-        "language_menu_prompt": "Select a language (number or code): ",
-        "language_changed": "Language updated to {language}.",
-        "data_corrupt_reset": "Data file corrupt or unreadable. Recreating with defaults.",
-        "list_budget_line": "{index}. {name}: Allocation {allocation}, Realization {realization}",
-        "default_name": "Unnamed",
-        "default_item_name": "Item",
-        "auth_title": "Log In or Sign Up",
-        "prompt_email": "Enter email: ",
-        "email_required": "Email cannot be empty.",
-        "user_not_found_signup": "Email is not registered. Creating a new account...",
-        "prompt_password": "Enter password: ",
-        "prompt_password_confirm": "Confirm password: ",
-        "password_mismatch": "Passwords do not match. Try again.",
-        "signup_success": "New account created for {email}.",
-        "login_success": "Logged in as {email}.",
-        "invalid_credentials": "Email or password is incorrect.",
-        "period_year_instruction": "Select a year option (enter number):",
-        "period_year_option_prev": "1. Previous year ({year})",
-        "period_year_option_current": "2. Current year ({year})",
-        "period_year_option_next": "3. Next year ({year})",
-        "period_month_instruction": "Choose a month by entering 1-12:",
-        "period_month_option": "{number}. {name}",
-        "invalid_month": "Month number is not valid.",
-    },
-}
+DEFAULT_KDF_ITERATIONS = 200_000
+KDF_ALGORITHM = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+KDF_TARGET_SECONDS = 0.25
+console = LazyRich("rich.console", "Console", {})
+error_console = LazyRich("rich.console", "Console", {"stderr": True})
+
+LOCALE_DIR = Path(__file__).resolve().parent / "locales"
+DEFAULT_LANGUAGE = "id"
+FALLBACK_LANGUAGE = "en"
 
 MONTH_NAMES = {
     "id": [
@@ -314,32 +133,152 @@ for index in range(1, 13):
     MONTH_ALIASES[str(index)] = index
 
 
+@dataclass
+class ProfileChange:
+    """One mutation of a month's lists, as seen by change listeners."""
+
+    kind: str
+    month: str
+    list_name: Optional[str] = None
+    index: Optional[int] = None
+    before: Any = None
+    after: Any = None
+    transaction: Optional[Dict[str, Any]] = None
+
+
 @dataclass
 class Session:
     data: Dict[str, Any]
     email: str
     profile: Dict[str, Any]
     key: bytes
+    revision: int = 0
+    listeners: List[Callable[["Session", ProfileChange], None]] = field(default_factory=list)
+    search_index: Optional["SearchIndex"] = None
+    completions: Optional["ItemCompletions"] = None
+    month_cache: Optional["MonthCache"] = None
+    pending_ops: List[Dict[str, Any]] = field(default_factory=list)
+    recording: bool = True
+    history_base: Optional[Tuple[str, Dict[str, Any]]] = None
+
+
+class ProfileConflictError(Exception):
+    """Another process saved this profile after the session last read it."""
+
+
+class DataFileError(Exception):
+    """The data file exists but could not be read, so nothing was written to it."""
+
+
+class InvalidCredentialsError(ValueError):
+    """The password does not match the user's verifier (or legacy password hash)."""
+
+
+@dataclass
+class LoginTimings:
+    """Wall-clock breakdown of the path from launch to the first dashboard."""
+
+    launched: float = field(default_factory=time.perf_counter)
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    def record(self, phase: str, started: float) -> float:
+        elapsed = time.perf_counter() - started
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+        return elapsed
 
 
 def format_currency(amount: int) -> str:
     return f"Rp{amount:,}" if amount >= 0 else f"-Rp{abs(amount):,}"
 
 
+class Translator:
+    """One language's catalog, compiled for lookup.
+
+    Strings without placeholders are returned as-is; the others are stored as
+    bound ``str.format`` methods. Keys missing from the catalog fall back to
+    English, then to the key itself.
+    """
+
+    __slots__ = ("language", "plain", "formatters")
+
+    def __init__(self, language: str, catalog: Dict[str, str]) -> None:
+        self.language = language
+        self.plain: Dict[str, str] = {}
+        self.formatters: Dict[str, Callable[..., str]] = {}
+        for key, template in catalog.items():
+            if "{" in template or "}" in template:
+                self.formatters[key] = template.format
+            else:
+                self.plain[key] = template
+
+    def __call__(self, key: str, **kwargs: Any) -> str:
+        text = self.plain.get(key)
+        if text is not None:
+            return text
+        formatter = self.formatters.get(key)
+        return formatter(**kwargs) if formatter is not None else key
+
+
+_languages: Optional[Tuple[str, ...]] = None
+_translators: Dict[str, Translator] = {}
+_translators_lock = threading.Lock()
+
+
+def available_languages() -> Tuple[str, ...]:
+    """Language codes with a catalog in ``locales/``, default language first."""
+    global _languages
+    if _languages is None:
+        codes = [path.stem for path in LOCALE_DIR.glob("*.json")]
+        _languages = tuple(sorted(codes, key=lambda code: (code != DEFAULT_LANGUAGE, code)))
+    return _languages
+
+
+def load_catalog(language: str) -> Dict[str, str]:
+    return json.loads((LOCALE_DIR / f"{language}.json").read_text(encoding="utf-8"))
+
+
+def translator_for(language: str) -> Translator:
+    """Load and compile a catalog on first use; later calls are a dict lookup."""
+    translator = _translators.get(language)
+    if translator is not None:
+        return translator
+    if language not in available_languages():
+        return translator_for(DEFAULT_LANGUAGE)
+    with _translators_lock:
+        translator = _translators.get(language)
+        if translator is None:
+            catalog = load_catalog(language)
+            if language != FALLBACK_LANGUAGE:
+                catalog = {**load_catalog(FALLBACK_LANGUAGE), **catalog}
+            translator = _translators[language] = Translator(language, catalog)
+    return translator
+
+
 def get_language(profile: Dict[str, Any]) -> str:
-    language = profile.get("language", "id")
-    if language not in LANGUAGE_STRINGS:
-        profile["language"] = "id"
-        return "id"
+    language = profile.get("language", DEFAULT_LANGUAGE)
+    if language not in available_languages():
+        profile["language"] = DEFAULT_LANGUAGE
+        return DEFAULT_LANGUAGE
     return language
 
 
+def translator(profile: Dict[str, Any]) -> Translator:
+    """The translator for ``profile``'s language; bind it once in render loops."""
+    return _translators.get(profile.get("language")) or translator_for(get_language(profile))
+
+
 def tr(profile: Dict[str, Any], key: str, **kwargs: Any) -> str:
-    language = get_language(profile)
-    template = LANGUAGE_STRINGS.get(language, LANGUAGE_STRINGS["id"]).get(key)
-    if template is None:
-        template = LANGUAGE_STRINGS["en"].get(key, key)
-    return template.format(**kwargs)
+    # Same as ``translator(profile)(key, **kwargs)``, inlined: menus call this constantly.
+    compiled = _translators.get(profile.get("language")) or translator_for(get_language(profile))
+    text = compiled.plain.get(key)
+    if text is not None:
+        return text
+    formatter = compiled.formatters.get(key)
+    return formatter(**kwargs) if formatter is not None else key
+
+
+def language_name(code: str) -> str:
+    return translator_for(code)("language_name")
 
 
 def get_month_name(profile: Dict[str, Any], month_index: int | None = None) -> str:
@@ -354,12 +293,14 @@ def get_month_name(profile: Dict[str, Any], month_index: int | None = None) -> s
     return MONTH_NAMES.get(language, MONTH_NAMES["id"])[4]
 
 
-def build_progress_bar(percentage: float, width: int = 20) -> str:
+def progress_bar_text(percentage: float, width: int = 20) -> str:
     filled = int(min(percentage, 100) / 100 * width)
-    remaining = width - filled
-    bar = "#" * filled + "-" * remaining
+    return "#" * filled + "-" * (width - filled)
+
+
+def build_progress_bar(percentage: float, width: int = 20) -> str:
     color = "bright_magenta" if percentage <= 100 else "red"
-    return f"[{color}]{bar}[/]"
+    return f"[{color}]{progress_bar_text(percentage, width)}[/]"
 
 
 def month_key(year: int, month: int) -> str:
@@ -386,14 +327,89 @@ def normalize_month_value(value: Any) -> int:
     return 5
 
 
+def month_index(key: str) -> int:
+    year, month = parse_month_key(key)
+    return year * 12 + month - 1
+
+
+def recurring_active(template: Dict[str, Any], key: str) -> bool:
+    start = month_index(template["start"])
+    current = month_index(key)
+    end = template.get("end")
+    if current < start or (end and current > month_index(end)):
+        return False
+    return (current - start) % max(1, int(template.get("every", 1))) == 0
+
+
+def recurring_amount(template: Dict[str, Any], key: str) -> int:
+    amount = 0
+    for since, value in template.get("amounts", []):
+        if since > key:
+            break
+        amount = value
+    return amount
+
+
+def materialize_recurring_item(template: Dict[str, Any], key: str) -> Dict[str, Any]:
+    item: Dict[str, Any] = {"name": template["name"]}
+    if template["list"] == "budget":
+        item["allocation"] = recurring_amount(template, key)
+        item["realization"] = 0
+        item["category"] = template.get("category", "")
+    else:
+        item["amount"] = recurring_amount(template, key)
+    item["template"] = template["id"]
+    return item
+
+
+def apply_recurring_templates(profile: Dict[str, Any], key: str, month_data: Dict[str, Any]) -> None:
+    """Add the items of every recurring template due in ``key`` that the month lacks.
+
+    Runs once per month and template revision; months the user never opens
+    are never materialized.
+    """
+    templates = profile.get("recurring")
+    if not templates:
+        return
+    version = profile.get("_recurring_version", 0)
+    if month_data.get("_recurring") == version:
+        return
+    present = {item.get("template") for field_name in LIST_FIELDS.values() for item in month_data[field_name]}
+    present.update(month_data.get("skipped_templates", []))
+    for template in templates:
+        if template["id"] not in present and recurring_active(template, key):
+            month_data[LIST_FIELDS[template["list"]]].append(materialize_recurring_item(template, key))
+    # Marked only once complete, so peek_month_data() on the prefetch thread
+    # never takes a half-filled month for a materialized one.
+    month_data["_recurring"] = version
+
+
 def get_month_data(profile: Dict[str, Any], year: int, month: int) -> Dict[str, Any]:
     months = profile.setdefault("months", {})
     key = month_key(year, month)
     month_data = months.setdefault(key, {})
     ensure_month_defaults(month_data)
+    apply_recurring_templates(profile, key, month_data)
     return month_data
 
 
+def peek_month_data(profile: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """A month with its due recurring items, like :func:`get_month_data`, without changing ``profile``.
+
+    Months that still need materializing are returned as a copy.
+    """
+    month_data = profile.get("months", {}).get(key) or {}
+    if all(field_name in month_data for field_name in LIST_FIELDS.values()) and (
+        not profile.get("recurring") or month_data.get("_recurring") == profile.get("_recurring_version", 0)
+    ):
+        return month_data
+    peeked = dict(month_data)
+    for field_name in LIST_FIELDS.values():
+        peeked[field_name] = list(month_data.get(field_name, []))
+    apply_recurring_templates(profile, key, peeked)
+    return peeked
+
+
 def get_current_month_data(profile: Dict[str, Any]) -> Dict[str, Any]:
     year = profile.get("current_year", 2025)
     month = normalize_month_value(profile.get("current_month", 5))
@@ -401,6 +417,12 @@ def get_current_month_data(profile: Dict[str, Any]) -> Dict[str, Any]:
     return get_month_data(profile, year, month)
 
 
+def current_month_key(profile: Dict[str, Any]) -> str:
+    year = profile.get("current_year", 2025)
+    month = normalize_month_value(profile.get("current_month", 5))
+    return month_key(year, month)
+
+
 def sync_current_month_references(profile: Dict[str, Any]) -> Dict[str, Any]:
     month_data = get_current_month_data(profile)
     profile["income_sources"] = month_data["income_sources"]
@@ -493,9 +515,8 @@ def default_data() -> Dict[str, Any]:
 def ensure_profile_defaults(profile: Dict[str, Any]) -> None:
     profile.setdefault("current_year", 2025)
     profile["current_month"] = normalize_month_value(profile.get("current_month", 5))
-    language = profile.get("language", "id")
-    if language not in LANGUAGE_STRINGS:
-        profile["language"] = "id"
+    if profile.get("language", DEFAULT_LANGUAGE) not in available_languages():
+        profile["language"] = DEFAULT_LANGUAGE
 
     months = profile.setdefault("months", {})
     if any(key in profile for key in ("income_sources", "saving_list", "budgeting_list")):
@@ -555,9 +576,8 @@ def normalize_data(data: Dict[str, Any]) -> None:
         ensure_profile_defaults(pending_profile)
     else:
         data["pending_profile"] = None
-    default_language = data.get("default_language", "id")
-    if default_language not in LANGUAGE_STRINGS:
-        data["default_language"] = "id"
+    if data.get("default_language", DEFAULT_LANGUAGE) not in available_languages():
+        data["default_language"] = DEFAULT_LANGUAGE
     for email, payload in list(data["profiles"].items()):
         if not isinstance(payload, dict):
             data["profiles"].pop(email)
@@ -566,34 +586,146 @@ def normalize_data(data: Dict[str, Any]) -> None:
             ensure_profile_defaults(payload)
 
 
+def data_lock_path() -> Path:
+    return DATA_FILE.with_name(DATA_FILE.name + ".lock")
+
+
+@contextmanager
+def data_file_lock() -> Iterator[None]:
+    """Advisory lock around the read-merge-write critical section."""
+    with data_lock_path().open("a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
 def save_data(data: Dict[str, Any]) -> None:
-    with DATA_FILE.open("w", encoding="utf-8") as handle:
+    temporary = DATA_FILE.with_name(f".{DATA_FILE.name}.{os.getpid()}.tmp")
+    with temporary.open("w", encoding="utf-8") as handle:
         json.dump(data, handle, indent=2)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, DATA_FILE)
+
+
+def read_data_file() -> Dict[str, Any]:
+    with DATA_FILE.open("r", encoding="utf-8") as handle:
+        raw = json.load(handle)
+    if not isinstance(raw, dict):
+        raise ValueError("Data file must contain a JSON object")
+    data = migrate_legacy_data(raw)
+    normalize_data(data)
+    return data
 
 
 def load_data() -> Dict[str, Any]:
-    if not DATA_FILE.exists():
-        data = default_data()
-        save_data(data)
-        return data
+    with data_file_lock():
+        if not DATA_FILE.exists():
+            data = default_data()
+            save_data(data)
+            return data
 
-    try:
-        with DATA_FILE.open("r", encoding="utf-8") as handle:
-            raw = json.load(handle)
-    except (json.JSONDecodeError, OSError):
-        console.print("[red]Data file corrupt or unreadable. Recreating with defaults.[/]")
-        data = default_data()
-        save_data(data)
+        try:
+            with DATA_FILE.open("r", encoding="utf-8") as handle:
+                original = handle.read()
+            raw = json.loads(original)
+            if not isinstance(raw, dict):
+                raise ValueError("Data file must contain a JSON object")
+        except (json.JSONDecodeError, OSError, ValueError):
+            corrupt = DATA_FILE.with_name(f"{DATA_FILE.name}.corrupt-{int(time.time())}")
+            try:
+                os.replace(DATA_FILE, corrupt)
+            except OSError:
+                console.print("[red]Data file corrupt or unreadable. Recreating with defaults.[/]")
+            else:
+                console.print(
+                    f"[red]Data file corrupt or unreadable. Moved it to {corrupt} (inspect it with "
+                    f"`--data-file {corrupt} fsck`) and recreating with defaults.[/]"
+                )
+            data = default_data()
+            save_data(data)
+            return data
+
+        data = migrate_legacy_data(raw)
+        normalize_data(data)
+        # Only rewrite when migration or normalization actually changed something,
+        # so starting a session never clobbers what other processes just saved.
+        if json.dumps(data, indent=2) != original:
+            save_data(data)
         return data
 
-    data = migrate_legacy_data(raw)
-    normalize_data(data)
-    save_data(data)
-    return data
+
+def record_revision(record: Any) -> int:
+    if isinstance(record, dict) and isinstance(record.get("revision"), int):
+        return record["revision"]
+    return 0
+
+
+def commit_profile_records(
+    data: Dict[str, Any],
+    records: Dict[str, Dict[str, Any]],
+    expected: Dict[str, int],
+    users: Optional[Dict[str, Dict[str, Any]]] = None,
+    default_language: Optional[str] = None,
+) -> Set[str]:
+    """Write only the given profiles into the latest on-disk document.
+
+    Under the file lock the file is re-read, every record whose on-disk
+    revision still matches ``expected`` replaces that user's profile and user
+    entry (taken from ``users`` when given, else from ``data``) with its
+    revision bumped, and everything else on disk is kept as is; the default
+    language is only written when ``default_language`` is given.
+    ``data`` is refreshed in place with the merged document. Returns the emails
+    whose revision had moved on, which were not written. Raises
+    :class:`DataFileError` when the file exists but cannot be read.
+    """
+    with data_file_lock():
+        try:
+            latest = read_data_file()
+        except FileNotFoundError:
+            latest = deepcopy(data)
+        except (OSError, ValueError) as error:
+            raise DataFileError(f"{DATA_FILE} could not be read: {error}") from error
+        conflicts: Set[str] = set()
+        for email, record in records.items():
+            if record_revision(latest["profiles"].get(email)) != expected.get(email, 0):
+                conflicts.add(email)
+                continue
+            record["revision"] = expected.get(email, 0) + 1
+            latest["profiles"][email] = record
+            own_user = (users or {}).get(email) or next(
+                (entry for entry in data["users"] if entry.get("email") == email), None
+            )
+            if own_user is not None:
+                others = [entry for entry in latest["users"] if entry.get("email") != email]
+                latest["users"] = others + [own_user]
+        if len(conflicts) < len(records):
+            if data.get("pending_profile") is None:
+                latest["pending_profile"] = None
+            if default_language is not None:
+                latest["default_language"] = default_language
+            save_data(latest)
+    data.clear()
+    data.update(latest)
+    return conflicts
 
 
 def calculate_totals(profile: Dict[str, Any]) -> Dict[str, int]:
     month_data = sync_current_month_references(profile)
+    return calculate_month_totals(month_data)
+
+
+def calculate_month_totals(month_data: Dict[str, Any]) -> Dict[str, int]:
     total_income = sum(item.get("amount", 0) for item in month_data["income_sources"])
     total_budgeted = sum(item.get("allocation", 0) for item in month_data["budgeting_list"])
     total_spending = sum(item.get("realization", 0) for item in month_data["budgeting_list"])
@@ -606,101 +738,725 @@ def calculate_totals(profile: Dict[str, Any]) -> Dict[str, int]:
     }
 
 
-def display_header(profile: Dict[str, Any]) -> None:
-    year = profile.get("current_year", 2025)
+numpy: Any = False  # imported by load_numpy() on first use; None when not installed
+
+
+def load_numpy() -> Any:
+    """NumPy for batch forecasts, imported lazily so startup does not pay for it."""
+    global numpy
+    if numpy is False:
+        try:
+            numpy = importlib.import_module("numpy")
+        except ImportError:
+            numpy = None
+    return numpy
+
+
+FORECAST_WINDOW = 3
+FORECAST_TREND_MONTHS = 12
+FORECAST_SEASONAL_MONTHS = 24
+FORECAST_MIN_MONTHS = 3
+FORECAST_HORIZON = 3
+FORECAST_DASHBOARD_ROWS = 5
+
+
+def month_spending(items: List[Dict[str, Any]]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Realization and allocation per category (or name, for items without one)."""
+    spent: Dict[str, int] = {}
+    allocated: Dict[str, int] = {}
+    for item in items:
+        category = item.get("category") or item.get("name", "-")
+        spent[category] = spent.get(category, 0) + int(item.get("realization", 0))
+        allocated[category] = allocated.get(category, 0) + int(item.get("allocation", 0))
+    return spent, allocated
+
+
+def spending_history(
+    profile: Dict[str, Any], until: Optional[str] = None, cache: Optional["MonthCache"] = None
+) -> Tuple[List[str], List[str], List[List[int]], List[List[int]]]:
+    """Month × category matrices of realization and allocation, oldest month first.
+
+    Budget items are grouped by category, or by name when they have none.
+    Months without budget items are left out, as are months after ``until``
+    (default: the current month). With a ``cache``, each month's sums come
+    from it and months are only peeked at, not materialized.
+    """
+    until = until or current_month_key(profile)
+    columns: Dict[str, int] = {}
+    months: List[str] = []
+    spent_rows: List[Dict[int, int]] = []
+    allocated_rows: List[Dict[int, int]] = []
+    for key in sorted(profile.get("months", {})):
+        if key > until:
+            break
+        try:
+            year, month = parse_month_key(key)
+        except ValueError:
+            continue
+        if cache is None:
+            by_category = month_spending(get_month_data(profile, year, month)["budgeting_list"])
+        else:
+            by_category = cache.spending(profile, key)
+        if not by_category[0]:
+            continue
+        spent: Dict[int, int] = {}
+        allocated: Dict[int, int] = {}
+        for category, amount in by_category[0].items():
+            column = columns.setdefault(category, len(columns))
+            spent[column] = amount
+            allocated[column] = by_category[1][category]
+        months.append(key)
+        spent_rows.append(spent)
+        allocated_rows.append(allocated)
+    width = len(columns)
+    return (
+        months,
+        list(columns),
+        [[row.get(column, 0) for column in range(width)] for row in spent_rows],
+        [[row.get(column, 0) for column in range(width)] for row in allocated_rows],
+    )
+
+
+def forecast_matrix_numpy(months: List[str], spent: List[List[int]], horizon: int) -> Any:
+    data = numpy.asarray(spent, dtype=float)
+    periods, width = data.shape
+    calendar = numpy.array([int(key[5:7]) - 1 for key in months])
+    seasonal = numpy.ones((12, width))
+    if periods >= FORECAST_SEASONAL_MONTHS:
+        overall = data.mean(axis=0)
+        sums = numpy.zeros((12, width))
+        numpy.add.at(sums, calendar, data)
+        counts = numpy.bincount(calendar, minlength=12)[:, None]
+        seen = (counts > 0) & (overall > 0)
+        seasonal = numpy.where(seen, sums / numpy.maximum(counts, 1) / numpy.where(overall > 0, overall, 1.0), 1.0)
+        factors = seasonal[calendar]
+        data = data / numpy.where(factors > 0, factors, 1.0)
+    window = min(FORECAST_WINDOW, periods)
+    level = data[-window:].mean(axis=0)
+    span = min(FORECAST_TREND_MONTHS, periods)
+    slope = numpy.zeros(width)
+    if span >= 2:
+        steps = numpy.arange(span) - (span - 1) / 2
+        slope = steps @ data[-span:] / (steps @ steps)
+    ahead = numpy.arange(1, horizon + 1)[:, None] + (window - 1) / 2
+    future = (calendar[-1] + numpy.arange(1, horizon + 1)) % 12
+    return numpy.maximum((level + slope * ahead) * seasonal[future], 0.0)
+
+
+def forecast_matrix_python(months: List[str], spent: List[List[int]], horizon: int) -> List[List[float]]:
+    periods, width = len(spent), len(spent[0]) if spent else 0
+    calendar = [int(key[5:7]) - 1 for key in months]
+    seasonal = [[1.0] * width for _ in range(12)]
+    data = [[float(value) for value in row] for row in spent]
+    if periods >= FORECAST_SEASONAL_MONTHS:
+        sums = [[0.0] * width for _ in range(12)]
+        counts = [0] * 12
+        for month, row in zip(calendar, data):
+            counts[month] += 1
+            sums[month] = [total + value for total, value in zip(sums[month], row)]
+        overall = [sum(column) / periods for column in zip(*data)]
+        seasonal = [
+            [
+                sums[month][column] / counts[month] / overall[column] if counts[month] and overall[column] > 0 else 1.0
+                for column in range(width)
+            ]
+            for month in range(12)
+        ]
+        data = [
+            [value / factor if factor > 0 else value for value, factor in zip(row, seasonal[month])]
+            for month, row in zip(calendar, data)
+        ]
+    window = min(FORECAST_WINDOW, periods)
+    level = [sum(column) / window for column in zip(*data[-window:])]
+    span = min(FORECAST_TREND_MONTHS, periods)
+    slope = [0.0] * width
+    if span >= 2:
+        steps = [step - (span - 1) / 2 for step in range(span)]
+        denominator = sum(step * step for step in steps)
+        # The steps are centred on zero, so the column means drop out of the covariance.
+        slope = [sum(step * value for step, value in zip(steps, column)) / denominator for column in zip(*data[-span:])]
+    projection = []
+    for ahead in range(1, horizon + 1):
+        offset = ahead + (window - 1) / 2
+        factors = seasonal[(calendar[-1] + ahead) % 12]
+        projection.append([max((base + trend * offset) * factor, 0.0) for base, trend, factor in zip(level, slope, factors)])
+    return projection
+
+
+def forecast_matrix(months: List[str], spent: List[List[int]], horizon: int) -> List[List[float]]:
+    """Project every category ``horizon`` months past the last row of ``spent``.
+
+    Each column is deseasonalized (with two years of history or more), then
+    projected from its moving average and least-squares trend over the last
+    year, and re-seasonalized for the target month. NumPy does this for all
+    columns at once when it is installed; the pure-Python path gives the same
+    numbers.
+    """
+    if load_numpy() is not None:
+        return forecast_matrix_numpy(months, spent, horizon).tolist()
+    return forecast_matrix_python(months, spent, horizon)
+
+
+def spending_forecast(
+    profile: Dict[str, Any],
+    horizon: int = FORECAST_HORIZON,
+    until: Optional[str] = None,
+    cache: Optional["MonthCache"] = None,
+) -> List[Dict[str, Any]]:
+    """Projected spending of the categories budgeted in ``until`` (default: this month), likely overruns first."""
+    until = until or current_month_key(profile)
+    months, categories, spent, allocated = spending_history(profile, until, cache)
+    if len(months) < FORECAST_MIN_MONTHS or months[-1] != until:
+        return []
+    projection = forecast_matrix(months, spent, horizon)
+    rows = []
+    for column, category in enumerate(categories):
+        allocation = allocated[-1][column]
+        if not allocation:
+            continue
+        projected = [int(round(step[column])) for step in projection]
+        rows.append(
+            {"category": category, "allocation": allocation, "projected": projected, "overrun": projected[0] > allocation}
+        )
+    rows.sort(key=lambda row: (not row["overrun"], -row["projected"][0]))
+    return rows
+
+
+MONTH_CACHE_SIZE = 24
+MONTH_PREFETCH_RADIUS = 1
+
+
+def month_summary(month_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Totals and name-sorted expense rows of one month, as the dashboard shows them."""
+    return {
+        "totals": calculate_month_totals(month_data),
+        "expenses": [
+            expense_row(item) for item in sorted(month_data["budgeting_list"], key=lambda entry: entry.get("name", ""))
+        ],
+    }
+
+
+class MonthCache:
+    """Dashboard data of recently viewed months and their neighbours.
+
+    Months are already decoded in the profile; what is kept here is what the
+    dashboard derives from them: each month's summary, its per-category sums
+    and its forecast. ``on_change`` drops whatever an edit makes stale, and
+    :meth:`prefetch` fills in the months around the viewed one on a worker
+    thread, so flipping between months only has to render.
+
+    The worker only reads the profile. Every edit bumps ``generation``, and
+    results computed from an older generation are thrown away.
+    """
+
+    def __init__(self, size: int = MONTH_CACHE_SIZE) -> None:
+        self.size = size
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+        self.forecasts: Dict[str, List[Dict[str, Any]]] = {}
+        self.sums: Dict[str, Tuple[Dict[str, int], Dict[str, int]]] = {}
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.pool: Optional[ThreadPoolExecutor] = None
+        self.pending: Optional[Future] = None
+
+    def clear(self) -> None:
+        with self.lock:
+            self.generation += 1
+            self.summaries.clear()
+            self.forecasts.clear()
+            self.sums.clear()
+
+    def on_change(self, session: Session, change: ProfileChange) -> None:
+        if change.kind == "templates" or not change.month:
+            self.clear()
+            return
+        with self.lock:
+            self.generation += 1
+            self.summaries.pop(change.month, None)
+            self.sums.pop(change.month, None)
+            # A month feeds the forecast of every later month.
+            for key in [key for key in self.forecasts if key >= change.month]:
+                del self.forecasts[key]
+
+    def lookup(self, table: Dict[str, Any], key: str) -> Tuple[Any, int]:
+        with self.lock:
+            value = table.pop(key, None)
+            if value is not None:
+                table[key] = value
+            return value, self.generation
+
+    def store(self, table: Dict[str, Any], key: str, value: Any, generation: int, bounded: bool = True) -> None:
+        with self.lock:
+            if generation != self.generation:
+                return
+            table[key] = value
+            while bounded and len(table) > self.size:
+                del table[next(iter(table))]
+
+    def summary(self, profile: Dict[str, Any], key: str) -> Dict[str, Any]:
+        summary, generation = self.lookup(self.summaries, key)
+        if summary is None:
+            summary = month_summary(peek_month_data(profile, key))
+            self.store(self.summaries, key, summary, generation)
+        return summary
+
+    def spending(self, profile: Dict[str, Any], key: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Per-category sums of one month; kept for every month, they are tiny."""
+        sums, generation = self.lookup(self.sums, key)
+        if sums is None:
+            sums = month_spending(peek_month_data(profile, key)["budgeting_list"])
+            self.store(self.sums, key, sums, generation, bounded=False)
+        return sums
+
+    def forecast(self, profile: Dict[str, Any], key: str) -> List[Dict[str, Any]]:
+        forecast, generation = self.lookup(self.forecasts, key)
+        if forecast is None:
+            forecast = spending_forecast(profile, until=key, cache=self)
+            self.store(self.forecasts, key, forecast, generation)
+        return forecast
+
+    def prefetch(self, profile: Dict[str, Any], key: str) -> None:
+        """Prepare the months within ``MONTH_PREFETCH_RADIUS`` of ``key`` in the background."""
+        keys = []
+        previous = following = parse_month_key(key)
+        for _ in range(MONTH_PREFETCH_RADIUS):
+            previous, following = get_previous_month(*previous), get_next_month(*following)
+            keys += [month_key(*following), month_key(*previous)]
+        if self.pending is not None:
+            self.pending.cancel()
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="month-prefetch")
+        self.pending = self.pool.submit(self.warm, profile, keys)
+
+    def warm(self, profile: Dict[str, Any], keys: List[str]) -> None:
+        for key in keys:
+            self.summary(profile, key)
+            self.forecast(profile, key)
+
+
+WHATIF_MAX_SCENARIOS = 10_000
+WHATIF_SHOWN = 10
+
+
+@dataclass
+class WhatIfRule:
+    """One what-if rule with the candidate values to try for it.
+
+    ``scale`` changes the allocations of ``target`` by each percentage, ``cap``
+    limits their total to each amount, and ``move`` shifts each amount of
+    allocation from the ``source`` item to the ``target`` item.
+    """
+
+    kind: str
+    target: str
+    values: List[float]
+    source: str = ""
+
+
+def parse_whatif_rule(line: str) -> WhatIfRule:
+    """Parse ``% Food = -10 -5``, ``cap Food = 1jt 1,5jt`` or ``move Gym > Food = 100rb``."""
+    head, separator, tail = line.partition("=")
+    kind, _, target = head.strip().partition(" ")
+    kind, target = kind.lower(), target.strip()
+    if not separator or not target or not tail.split():
+        raise ValueError(line)
+    if kind in {"%", "scale"}:
+        return WhatIfRule("scale", target, [float(value.rstrip("%").replace(",", ".")) for value in tail.split()])
+    amounts = [parse_amount_value(value) for value in tail.split()]
+    if None in amounts:
+        raise ValueError(line)
+    if kind == "cap":
+        return WhatIfRule("cap", target, [float(amount) for amount in amounts])
+    source, arrow, target = target.partition(">")
+    if kind != "move" or not arrow or not source.strip() or not target.strip():
+        raise ValueError(line)
+    return WhatIfRule("move", target.strip(), [float(amount) for amount in amounts], source.strip())
+
+
+def whatif_columns(items: List[Dict[str, Any]], rule: WhatIfRule) -> List[int]:
+    """Columns a rule touches: a category (``*`` for all) or, for ``move``, source then target item."""
+    def named(name: str) -> List[int]:
+        return [column for column, item in enumerate(items) if item.get("name", "").lower() == name.lower()][:1]
+
+    if rule.kind == "move":
+        source, target = named(rule.source), named(rule.target)
+        return source + target if source and target and source != target else []
+    return [
+        column
+        for column, item in enumerate(items)
+        if rule.target == "*" or (item.get("category") or item.get("name", "")).lower() == rule.target.lower()
+    ]
+
+
+def whatif_allocations_numpy(
+    allocations: List[int], rules: List[Tuple[WhatIfRule, List[int]]], choices: List[Tuple[float, ...]]
+) -> Any:
+    matrix = numpy.tile(numpy.asarray(allocations, dtype=float), (len(choices), 1))
+    values = numpy.asarray(choices, dtype=float).reshape(len(choices), len(rules))
+    for position, (rule, columns) in enumerate(rules):
+        value = values[:, position]
+        if rule.kind == "scale":
+            scaled = numpy.floor(matrix[:, columns] * (1 + value[:, None] / 100) + 0.5)
+            matrix[:, columns] = numpy.maximum(scaled, 0.0)
+        elif rule.kind == "cap":
+            total = matrix[:, columns].sum(axis=1)
+            over = total > value
+            factor = numpy.where(over, value / numpy.where(over, total, 1.0), 1.0)
+            matrix[:, columns] = numpy.floor(matrix[:, columns] * factor[:, None])
+        else:
+            source, target = columns
+            moved = numpy.minimum(value, matrix[:, source])
+            matrix[:, source] -= moved
+            matrix[:, target] += moved
+    return matrix
+
+
+def whatif_allocations_python(
+    allocations: List[int], rules: List[Tuple[WhatIfRule, List[int]]], choices: List[Tuple[float, ...]]
+) -> List[List[float]]:
+    matrix = []
+    for values in choices:
+        row = [float(allocation) for allocation in allocations]
+        for value, (rule, columns) in zip(values, rules):
+            if rule.kind == "scale":
+                for column in columns:
+                    row[column] = max(math.floor(row[column] * (1 + value / 100) + 0.5), 0.0)
+            elif rule.kind == "cap":
+                total = sum(row[column] for column in columns)
+                if total > value:
+                    for column in columns:
+                        row[column] = float(math.floor(row[column] * (value / total)))
+            else:
+                source, target = columns
+                moved = min(value, row[source])
+                row[source] -= moved
+                row[target] += moved
+        matrix.append(row)
+    return matrix
+
+
+def evaluate_whatif(
+    items: List[Dict[str, Any]], income: int, fixed: int, rules: List[Tuple[WhatIfRule, List[int]]]
+) -> List[Dict[str, Any]]:
+    """Every combination of rule values as a scenario, highest projected savings first.
+
+    Each item is expected to spend its new allocation or its realization in
+    the base month, whichever is larger: budgets get used, and bills get paid
+    even when underfunded. Savings are ``income - fixed - spending``; the
+    realization an allocation no longer covers is reported as unfunded. NumPy
+    evaluates all scenarios as one matrix when it is installed.
+    """
+    choices = list(itertools.product(*(rule.values for rule, _ in rules)))
+    allocations = [int(item.get("allocation", 0)) for item in items]
+    demand = [int(item.get("realization", 0)) for item in items]
+    if load_numpy() is not None:
+        matrix = whatif_allocations_numpy(allocations, rules, choices)
+        needed = numpy.asarray(demand, dtype=float)
+        spending = numpy.maximum(matrix, needed).sum(axis=1).tolist()
+        unfunded = numpy.maximum(needed - matrix, 0.0).sum(axis=1).tolist()
+        rows = matrix.astype(int).tolist()
+    else:
+        matrix = whatif_allocations_python(allocations, rules, choices)
+        spending = [sum(max(value, need) for value, need in zip(row, demand)) for row in matrix]
+        unfunded = [sum(max(need - value, 0.0) for value, need in zip(row, demand)) for row in matrix]
+        rows = [[int(value) for value in row] for row in matrix]
+    scenarios = [
+        {
+            "values": list(values),
+            "allocations": row,
+            "spending": fixed + int(spent),
+            "savings": income - fixed - int(spent),
+            "unfunded": int(short),
+        }
+        for values, row, spent, short in zip(choices, rows, spending, unfunded)
+    ]
+    scenarios.sort(key=lambda scenario: (-scenario["savings"], scenario["unfunded"]))
+    return scenarios
+
+
+DASHBOARD_STATS = ("total_income", "total_budgeted_expenses", "total_spending", "savings")
+
+
+def expense_row(item: Dict[str, Any]) -> Dict[str, Any]:
+    allocation = int(item.get("allocation", 0))
+    realization = int(item.get("realization", 0))
+    return {
+        "name": item.get("name", "-"),
+        "allocation": allocation,
+        "realization": realization,
+        "percent": (realization / allocation * 100) if allocation else 0,
+    }
+
+
+def dashboard_view(profile: Dict[str, Any], cache: Optional[MonthCache] = None) -> Dict[str, Any]:
+    """Everything a dashboard renderer needs for the current month, already localized."""
+    month_data = sync_current_month_references(profile)
+    key = current_month_key(profile)
+    if cache is None:
+        summary = month_summary(month_data)
+        forecast = spending_forecast(profile)
+    else:
+        summary = cache.summary(profile, key)
+        forecast = cache.forecast(profile, key)
     month_name = get_month_name(profile)
-    title = Text(tr(profile, "dashboard_title"), style="bold white")
+    strings = translator(profile)
+    year, month = profile.get("current_year", 2025), profile.get("current_month", 5)
+    forecast_labels = []
+    for _ in range(FORECAST_HORIZON):
+        year, month = get_next_month(year, month)
+        forecast_labels.append(format_month_label(profile, year, month))
+    return {
+        "month": key,
+        "year": profile.get("current_year", 2025),
+        "month_name": month_name,
+        "title": strings("dashboard_title"),
+        "subtitle": strings("monthly_report"),
+        "year_label": strings("year_label"),
+        "month_label": strings("month_label"),
+        "totals": dict(summary["totals"]),
+        "stat_labels": {
+            "total_income": strings("stat_total_income"),
+            "total_budgeted_expenses": strings("stat_budgeted_expenses"),
+            "total_spending": strings("stat_spending", month=month_name),
+            "savings": strings("stat_savings", month=month_name),
+        },
+        "expenses_title": strings("expenses_list"),
+        "columns": [
+            strings("column_name"),
+            strings("column_allocation"),
+            strings("column_realization"),
+            strings("column_progress"),
+            strings("column_percent_usage"),
+        ],
+        "no_expenses": strings("no_expenses"),
+        "expenses": list(summary["expenses"]),
+        "forecast_title": strings("forecast_title"),
+        "forecast_columns": [strings("column_category"), strings("column_allocation")] + forecast_labels,
+        "forecast_overrun": strings("forecast_overrun"),
+        "forecast": forecast[:FORECAST_DASHBOARD_ROWS],
+    }
+
+
+def rich_dashboard_header(view: Dict[str, Any]) -> List[Any]:
+    title = Text(view["title"], style="bold white")
     meta = Text.assemble(
-        (f"{tr(profile, 'year_label')}: {year}", "bold white"),
+        (f"{view['year_label']}: {view['year']}", "bold white"),
         ("\n", ""),
-        (f"{tr(profile, 'month_label')}: {month_name}", "bold white"),
+        (f"{view['month_label']}: {view['month_name']}", "bold white"),
     )
     header = Table.grid(expand=True)
     header.add_column(justify="left")
     header.add_column(justify="right")
     header.add_row(title, meta)
-    console.print(Panel(header, border_style="green"))
-    console.print(Panel(tr(profile, "monthly_report"), border_style="green"))
+    return [Panel(header, border_style="green"), Panel(view["subtitle"], border_style="green")]
 
 
-def display_stats(profile: Dict[str, Any], aggregates: Dict[str, int]) -> None:
-    month_name = get_month_name(profile)
-    stats_table = Table.grid(expand=True)
-    stats_table.add_column()
-    stats_table.add_column()
-    stats_table.add_column()
-    stats_table.add_column()
-
-    panels = [
-        (tr(profile, "stat_total_income"), format_currency(aggregates["total_income"])),
-        (
-            tr(profile, "stat_budgeted_expenses"),
-            format_currency(aggregates["total_budgeted_expenses"]),
-        ),
-        (
-            tr(profile, "stat_spending", month=month_name),
-            format_currency(aggregates["total_spending"]),
+def rich_stat_panel(view: Dict[str, Any], stat: str) -> Any:
+    return Panel(
+        Text.assemble(
+            (view["stat_labels"][stat], "bold white"), ("\n", ""), (format_currency(view["totals"][stat]), "bold green")
         ),
-        (
-            tr(profile, "stat_savings", month=month_name),
-            format_currency(aggregates["savings"]),
-        ),
-    ]
+        border_style="green",
+    )
 
-    stat_panels: List[Panel] = []
-    for title, value in panels:
-        stat_panels.append(
-            Panel(
-                Text.assemble((title, "bold white"), ("\n", ""), (value, "bold green")),
-                border_style="green",
-            )
-        )
 
-    stats_table.add_row(*stat_panels)
-    console.print(stats_table)
+def rich_dashboard_stats(view: Dict[str, Any]) -> Any:
+    stats_table = Table.grid(expand=True)
+    for _ in DASHBOARD_STATS:
+        stats_table.add_column()
+    stats_table.add_row(*(rich_stat_panel(view, stat) for stat in DASHBOARD_STATS))
+    return stats_table
+
+
+def rich_expense_cells(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    percent = row["percent"]
+    percent_text = Text(f"{percent:.2f}%", style="yellow")
+    if percent > 100:
+        percent_text.stylize("red")
+    return (
+        row["name"],
+        format_currency(row["allocation"]),
+        format_currency(row["realization"]),
+        build_progress_bar(percent),
+        percent_text,
+    )
+
 
+def rich_dashboard_expenses(view: Dict[str, Any]) -> Any:
+    expenses_table = Table(title=view["expenses_title"], header_style="bold white", show_lines=False, expand=True)
+    name, allocation, realization, progress, usage = view["columns"]
+    expenses_table.add_column(name, style="white")
+    expenses_table.add_column(allocation, style="green", justify="right")
+    expenses_table.add_column(realization, style="cyan", justify="right")
+    expenses_table.add_column(progress, style="white")
+    expenses_table.add_column(usage, style="yellow", justify="right")
+    if not view["expenses"]:
+        expenses_table.add_row(view["no_expenses"], "-", "-", "-", "-")
+    for row in view["expenses"]:
+        expenses_table.add_row(*rich_expense_cells(row))
+    return expenses_table
+
+
+def rich_dashboard_forecast(view: Dict[str, Any]) -> Any:
+    forecast_table = Table(title=view["forecast_title"], header_style="bold white", expand=True)
+    category, allocation, *months = view["forecast_columns"]
+    forecast_table.add_column(category, style="white")
+    forecast_table.add_column(allocation, style="green", justify="right")
+    for label in months:
+        forecast_table.add_column(label, style="cyan", justify="right")
+    for row in view["forecast"]:
+        projected = [Text(format_currency(value)) for value in row["projected"]]
+        if row["overrun"]:
+            projected[0].stylize("bold red")
+        forecast_table.add_row(row["category"], format_currency(row["allocation"]), *projected)
+    return forecast_table
+
+
+def render_dashboard_rich(view: Dict[str, Any], handle: Any = None) -> None:
+    target = console if handle is None else Console(file=handle, force_terminal=True, width=120)
+    for renderable in rich_dashboard_header(view):
+        target.print(renderable)
+    target.print(rich_dashboard_stats(view))
+    target.print(rich_dashboard_expenses(view))
+    if view["forecast"]:
+        target.print(rich_dashboard_forecast(view))
+
+
+def text_table(table: List[List[str]], left: Tuple[int, ...]) -> List[str]:
+    """Space-aligned rows; columns in ``left`` are left-aligned, the rest right-aligned."""
+    widths = [max(len(cells[column]) for cells in table) for column in range(len(table[0]))]
+    return [
+        "  ".join(
+            cell.ljust(width) if column in left else cell.rjust(width)
+            for column, (cell, width) in enumerate(zip(cells, widths))
+        ).rstrip()
+        for cells in table
+    ]
 
-def display_expenses(profile: Dict[str, Any], items: List[Dict[str, Any]]) -> None:
-    expenses_table = Table(
-        title=tr(profile, "expenses_list"),
-        header_style="bold white",
-        show_lines=False,
-        expand=True,
-    )
-    expenses_table.add_column(tr(profile, "column_name"), style="white")
-    expenses_table.add_column(tr(profile, "column_allocation"), style="green", justify="right")
-    expenses_table.add_column(tr(profile, "column_realization"), style="cyan", justify="right")
-    expenses_table.add_column(tr(profile, "column_progress"), style="white")
-    expenses_table.add_column(tr(profile, "column_percent_usage"), style="yellow", justify="right")
 
-    if not items:
-        expenses_table.add_row(tr(profile, "no_expenses"), "-", "-", "-", "-")
+def render_dashboard_text(view: Dict[str, Any], handle: Any) -> None:
+    """Plain columns for pipes and slow terminals; no colour codes."""
+    heading = f"{view['title']} - {view['month_name']} {view['year']}"
+    lines = [heading, "=" * len(heading)]
+    width = max(len(view["stat_labels"][stat]) for stat in DASHBOARD_STATS)
+    for stat in DASHBOARD_STATS:
+        lines.append(f"{view['stat_labels'][stat]:<{width}}  {format_currency(view['totals'][stat]):>16}")
+    lines.extend(["", view["expenses_title"]])
+    if not view["expenses"]:
+        lines.append(view["no_expenses"])
     else:
-        for item in sorted(items, key=lambda entry: entry.get("name", "")):
-            allocation = int(item.get("allocation", 0))
-            realization = int(item.get("realization", 0))
-            percent = (realization / allocation * 100) if allocation else 0
-            progress_bar = build_progress_bar(percent if allocation else 0)
-            percent_text = Text(f"{percent:.2f}%", style="yellow")
-            if percent > 100:
-                percent_text.stylize("red")
-            expenses_table.add_row(
-                item.get("name", "-"),
-                format_currency(allocation),
-                format_currency(realization),
-                progress_bar,
-                percent_text,
+        table = [view["columns"]] + [
+            [
+                row["name"],
+                format_currency(row["allocation"]),
+                format_currency(row["realization"]),
+                progress_bar_text(row["percent"]),
+                f"{row['percent']:.2f}%",
+            ]
+            for row in view["expenses"]
+        ]
+        lines.extend(text_table(table, (0, 3)))
+    if view["forecast"]:
+        table = [view["forecast_columns"] + [""]] + [
+            [row["category"], format_currency(row["allocation"])]
+            + [format_currency(value) for value in row["projected"]]
+            + [f"! {view['forecast_overrun']}" if row["overrun"] else ""]
+            for row in view["forecast"]
+        ]
+        lines.extend(["", view["forecast_title"]] + text_table(table, (0, len(table[0]) - 1)))
+    handle.write("\n".join(lines) + "\n\n")
+
+
+def render_dashboard_json(view: Dict[str, Any], handle: Any) -> None:
+    """One JSON object per dashboard with raw integers, for other tools."""
+    document = {name: view[name] for name in ("email", "month", "totals") if name in view}
+    document["expenses"] = [{**row, "percent": round(row["percent"], 2)} for row in view["expenses"]]
+    document["forecast"] = view["forecast"]
+    handle.write(json.dumps(document, ensure_ascii=False) + "\n")
+
+
+HTML_DASHBOARD_STYLE = (
+    "body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;width:100%}"
+    "td,th{padding:.3em .6em;border-bottom:1px solid #ddd}td.n{text-align:right}"
+    ".stats{display:flex;gap:1em}.stats div{border:1px solid #2a2;padding:.6em;flex:1}.over{color:#c00}"
+)
+
+
+def render_dashboard_html(view: Dict[str, Any], handle: Any) -> None:
+    """A self-contained static page."""
+    escape = html.escape
+    stats = "".join(
+        f"<div><b>{escape(view['stat_labels'][stat])}</b><br>{escape(format_currency(view['totals'][stat]))}</div>"
+        for stat in DASHBOARD_STATS
+    )
+    header = "".join(f"<th>{escape(column)}</th>" for column in view["columns"])
+    rows = "".join(
+        f"<tr><td>{escape(row['name'])}</td><td class=n>{escape(format_currency(row['allocation']))}</td>"
+        f"<td class=n>{escape(format_currency(row['realization']))}</td>"
+        f"<td><progress max=100 value={min(row['percent'], 100):.0f}></progress></td>"
+        f"<td class=\"n{' over' if row['percent'] > 100 else ''}\">{row['percent']:.2f}%</td></tr>"
+        for row in view["expenses"]
+    ) or f"<tr><td colspan=5>{escape(view['no_expenses'])}</td></tr>"
+    forecast = ""
+    if view["forecast"]:
+        forecast_header = "".join(f"<th>{escape(column)}</th>" for column in view["forecast_columns"])
+        forecast_rows = "".join(
+            f"<tr><td>{escape(row['category'])}</td><td class=n>{escape(format_currency(row['allocation']))}</td>"
+            + "".join(
+                f"<td class=\"n{' over' if step == 0 and row['overrun'] else ''}\">{escape(format_currency(value))}</td>"
+                for step, value in enumerate(row["projected"])
             )
+            + "</tr>"
+            for row in view["forecast"]
+        )
+        forecast = (
+            f"<h2>{escape(view['forecast_title'])}</h2><table><tr>{forecast_header}</tr>{forecast_rows}</table>\n"
+        )
+    title = f"{view['title']} - {view['month_name']} {view['year']}"
+    handle.write(
+        f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{escape(title)}</title>"
+        f"<style>{HTML_DASHBOARD_STYLE}</style></head><body>\n"
+        f"<h1>{escape(view['title'])}</h1><p>{escape(view['year_label'])}: {view['year']} &middot; "
+        f"{escape(view['month_label'])}: {escape(view['month_name'])}</p>\n"
+        f"<h2>{escape(view['subtitle'])}</h2><div class=stats>{stats}</div>\n"
+        f"<h2>{escape(view['expenses_title'])}</h2><table><tr>{header}</tr>{rows}</table>\n"
+        f"{forecast}</body></html>\n"
+    )
+
 
-    console.print(expenses_table)
+DASHBOARD_RENDERERS: Dict[str, Callable[..., None]] = {
+    "rich": render_dashboard_rich,
+    "text": render_dashboard_text,
+    "json": render_dashboard_json,
+    "html": render_dashboard_html,
+}
 
 
-def display_dashboard(profile: Dict[str, Any]) -> None:
+def display_dashboard(profile: Dict[str, Any], cache: Optional[MonthCache] = None) -> None:
     console.clear()
-    aggregates = calculate_totals(profile)
-    display_header(profile)
-    display_stats(profile, aggregates)
-    display_expenses(profile, profile["budgeting_list"])
+    render_dashboard_rich(dashboard_view(profile, cache))
+    if cache is not None:
+        cache.prefetch(profile, current_month_key(profile))
+
+
+def show_period(session: Session, year: int, month: int) -> None:
+    """Switch the viewed month. Nothing is saved; the period goes to disk with the next save."""
+    profile = session.profile
+    profile["current_year"] = year
+    profile["current_month"] = month
+    sync_current_month_references(profile)
+
+
+def browse_dashboard(session: Session) -> None:
+    """Show the dashboard; ``<`` and ``>`` flip to the previous and next month."""
+    profile = session.profile
+    while True:
+        display_dashboard(profile, session.month_cache)
+        command = input(tr(profile, "dashboard_browse_prompt")).strip()
+        if command not in ("<", ">"):
+            return
+        year, month = profile.get("current_year", 2025), normalize_month_value(profile.get("current_month", 5))
+        show_period(session, *(get_previous_month(year, month) if command == "<" else get_next_month(year, month)))
 
 
 def prompt_positive_int(message: str, error_message: str) -> int:
@@ -715,32 +1471,74 @@ def prompt_positive_int(message: str, error_message: str) -> int:
             console.print(f"[red]{error_message}[/]")
 
 
+AMOUNT_SUFFIXES: Dict[str, int] = {
+    "rb": 1_000,
+    "ribu": 1_000,
+    "k": 1_000,
+    "jt": 1_000_000,
+    "juta": 1_000_000,
+    "miliar": 1_000_000_000,
+    "milyar": 1_000_000_000,
+}
+AMOUNT_SUFFIX_PATTERN = r"(rb|ribu|k|jt|juta|miliar|milyar)"
+# One match tokenizes the whole value: optional currency, leading digits,
+# thousands groups sharing one separator, a decimal part, an optional ",-"
+# tail and a magnitude suffix.
+AMOUNT_PATTERN = re.compile(
+    r"\s*(?:rp\.?|idr)?\s*(\d+)((?:([.,'\u00a0 ])\d{3})(?:\3\d{3})*)?(?:[.,](\d+))?(?:[.,]-)?\s*"
+    + AMOUNT_SUFFIX_PATTERN
+    + r"?\.?\s*",
+    re.IGNORECASE | re.ASCII,
+)
+AMOUNT_FRACTION_TAIL = re.compile(r"\d{1,2}\s*" + AMOUNT_SUFFIX_PATTERN + r"\.?", re.IGNORECASE | re.ASCII)
+
+
 def parse_amount_value(raw: str) -> int | None:
-    cleaned = raw.strip()
-    if not cleaned:
-        return None
-    lowered = cleaned.lower()
-    if "-" in lowered or lowered.startswith("("):
-        return None
-    digits = "".join(ch for ch in lowered if ch.isdigit())
-    if not digits:
-        return None
-    try:
-        return int(digits)
-    except ValueError:
+    """Parse an amount written in Indonesian or English notation.
+
+    ``"1.500.000,50"``, ``"1,500,000.50"``, ``"Rp 2,5 jt"``, ``"750rb"`` and
+    ``"Rp15.000,-"`` are all understood; decimals are rounded half up to whole
+    Rupiah. Negative or malformed amounts give ``None``.
+    """
+    if raw.isascii() and raw.isdigit():
+        return int(raw)
+    match = AMOUNT_PATTERN.fullmatch(raw)
+    if match is None:
         return None
+    whole, groups, separator, fraction, suffix = match.groups()
+    if groups:
+        if len(whole) > 3:
+            return None
+        if fraction is None and suffix and len(groups) == 4:
+            # "1.250 jt": a single group before a suffix is a decimal part.
+            fraction = groups[1:]
+        elif fraction is not None and raw[match.start(4) - 1] == separator:
+            return None
+        else:
+            whole += groups.replace(separator, "")
+    scale = AMOUNT_SUFFIXES[suffix.lower()] if suffix else 1
+    if fraction is None:
+        return int(whole) * scale
+    divisor = 10 ** len(fraction)
+    return (2 * int(whole + fraction) * scale + divisor) // (2 * divisor)
 
 
 def merge_amount_tokens(first: str, rest: List[str]) -> Tuple[str, List[str]]:
+    """Re-join an amount that a comma-separated paste split across columns.
+
+    ``"1", "500", "000"`` becomes ``"1,500,000"`` and ``"Rp 2", "5 jt"`` becomes
+    ``"Rp 2,5 jt"``; anything else is left for the following columns.
+    """
     value = first
     remaining = list(rest)
     if parse_amount_value(value) is None:
         return value, remaining
     while remaining:
         fragment = remaining[0].strip()
-        if not fragment or not fragment.isdigit() or len(fragment) > 3:
+        digit_group = len(fragment) == 3 and fragment.isascii() and fragment.isdigit()
+        if not digit_group and AMOUNT_FRACTION_TAIL.fullmatch(fragment) is None:
             break
-        candidate = value + fragment
+        candidate = f"{value},{fragment}"
         if parse_amount_value(candidate) is None:
             break
         value = candidate
@@ -760,26 +1558,430 @@ def generate_salt() -> bytes:
     return os.urandom(16)
 
 
-def derive_key(password: str, salt: bytes) -> bytes:
-    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 200_000, dklen=32)
+def derive_key(password: str, salt: bytes, iterations: int = DEFAULT_KDF_ITERATIONS) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations, dklen=32)
+
+
+def user_kdf_iterations(user: Dict[str, Any]) -> int:
+    kdf = user.get("kdf")
+    if isinstance(kdf, dict) and isinstance(kdf.get("iterations"), int) and kdf["iterations"] > 0:
+        return kdf["iterations"]
+    return DEFAULT_KDF_ITERATIONS
+
+
+KDF_USER_FIELDS = ("password_hash", "salt", "kdf", "verifier")
+KDF_MIN_ITERATIONS = 100_000
+KDF_MIN_SCRYPT_N = 2**14
+KDF_MAX_SCRYPT_N = 2**20
+KDF_CALIBRATION: Dict[Tuple[str, float], Dict[str, Any]] = {}
+
+
+def kdf_params_problem(params: Any) -> Optional[str]:
+    """Why ``params`` cannot be used for a verifier-style user entry, or None."""
+    if not isinstance(params, dict):
+        return "not an object"
+    algorithm = params.get("algorithm")
+    if algorithm == "pbkdf2_sha256":
+        iterations = params.get("iterations")
+        return None if type(iterations) is int and iterations > 0 else "invalid iterations"
+    if algorithm == "scrypt":
+        n, r, p = params.get("n"), params.get("r"), params.get("p")
+        if not all(type(value) is int and value > 0 for value in (n, r, p)) or n < 2 or n & (n - 1):
+            return "invalid scrypt parameters"
+        return None if hasattr(hashlib, "scrypt") else "scrypt is not available in this Python build"
+    return f"unknown algorithm {algorithm!r}"
+
+
+def run_kdf(password: str, salt: bytes, params: Dict[str, Any]) -> bytes:
+    """One run of the user's KDF: a 32-byte master secret."""
+    problem = kdf_params_problem(params)
+    if problem is not None:
+        raise ValueError(f"KDF: {problem}")
+    secret = password.encode("utf-8")
+    if params["algorithm"] == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+        return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, maxmem=256 * r * (n + p), dklen=32)
+    return hashlib.pbkdf2_hmac("sha256", secret, salt, params["iterations"], dklen=32)
+
+
+def split_master_key(master: bytes) -> Tuple[bytes, str]:
+    """The profile key and the stored password verifier, both from one KDF output."""
+    key = hmac.new(master, b"tagihan profile key", hashlib.sha256).digest()
+    verifier = hmac.new(master, b"tagihan verifier", hashlib.sha256).hexdigest()
+    return key, verifier
+
+
+def calibrate_kdf(algorithm: Optional[str] = None, target: Optional[float] = None) -> Dict[str, Any]:
+    """Parameters for which one KDF run takes about ``target`` seconds on this machine.
+
+    A few cheap probe runs are timed and scaled up, once per process.
+    """
+    algorithm = algorithm or KDF_ALGORITHM
+    target = KDF_TARGET_SECONDS if target is None else target
+    cached = KDF_CALIBRATION.get((algorithm, target))
+    if cached is not None:
+        return cached
+    if algorithm == "scrypt":
+        probe = {"algorithm": "scrypt", "n": 2**12, "r": 8, "p": 1}
+        seconds = best_time(lambda: run_kdf("calibrate", bytes(16), probe), 3)
+        n = probe["n"]
+        while n < KDF_MAX_SCRYPT_N and seconds * 2 <= target:
+            n, seconds = n * 2, seconds * 2
+        params = {"algorithm": "scrypt", "n": max(n, KDF_MIN_SCRYPT_N), "r": 8, "p": 1}
+    else:
+        probe = {"algorithm": "pbkdf2_sha256", "iterations": 20_000}
+        seconds = best_time(lambda: run_kdf("calibrate", bytes(16), probe), 3)
+        iterations = int(probe["iterations"] * target / max(seconds, 1e-6)) // 1_000 * 1_000
+        params = {"algorithm": "pbkdf2_sha256", "iterations": max(iterations, KDF_MIN_ITERATIONS)}
+    KDF_CALIBRATION[(algorithm, target)] = params
+    return params
+
+
+def describe_kdf(params: Dict[str, Any]) -> str:
+    if params.get("algorithm") == "scrypt":
+        return f"scrypt (N={params['n']:,}, r={params['r']}, p={params['p']})"
+    return f"PBKDF2-SHA256 ({params.get('iterations', 0):,} iterations)"
+
+
+def run_kdf_calibration() -> None:
+    table = Table(title=f"KDF calibration for {KDF_TARGET_SECONDS:.2f}s per login", header_style="bold white")
+    table.add_column("Algorithm", style="white")
+    table.add_column("Parameters", style="cyan")
+    table.add_column("Measured", justify="right")
+    for algorithm in ("scrypt", "pbkdf2_sha256"):
+        if algorithm == "scrypt" and not hasattr(hashlib, "scrypt"):
+            table.add_row(algorithm, "not available in this Python build", "-")
+            continue
+        params = calibrate_kdf(algorithm)
+        seconds = best_time(lambda: run_kdf("calibrate", bytes(16), params), 1)
+        marker = " (used)" if algorithm == KDF_ALGORITHM else ""
+        table.add_row(algorithm + marker, describe_kdf(params), f"{seconds:.3f}s")
+    console.print(table)
+
+
+def kdf_needs_upgrade(user: Dict[str, Any]) -> bool:
+    """Whether a login should re-key this user to the current algorithm and calibrated cost.
+
+    Costs within half of the calibrated value are kept, so timing noise does
+    not re-key users at every login.
+    """
+    params = user.get("kdf")
+    if "verifier" not in user or kdf_params_problem(params) is not None or params["algorithm"] != KDF_ALGORITHM:
+        return True
+    policy = calibrate_kdf()
+    if KDF_ALGORITHM == "scrypt":
+        return params["n"] * 2 <= policy["n"]
+    return params["iterations"] * 2 <= policy["iterations"]
+
+
+def derive_user_key(password: str, user: Dict[str, Any]) -> bytes:
+    """Check ``password`` and return the profile key, with a single KDF run.
+
+    Entries with a ``verifier`` check it against the same KDF output the key
+    comes from. Older entries still have an unsalted ``password_hash`` and a
+    PBKDF2 key, until :func:`upgrade_user_kdf` re-keys them.
+    """
+    if "verifier" in user:
+        salt = base64.b64decode(user.get("salt") or "")
+        key, verifier = split_master_key(run_kdf(password, salt, user.get("kdf")))
+        if not hmac.compare_digest(verifier, str(user["verifier"])):
+            raise InvalidCredentialsError("password does not match")
+        return key
+    if not verify_password(user.get("password_hash", ""), password):
+        raise InvalidCredentialsError("password does not match")
+    return derive_key(password, add_or_update_salt(user), user_kdf_iterations(user))
 
 
 def keystream_bytes(key: bytes, nonce: bytes, length: int) -> bytes:
+    prefix = hashlib.sha256(key + nonce)
     blocks: List[bytes] = []
-    counter = 0
-    while len(b"".join(blocks)) < length:
-        counter_bytes = counter.to_bytes(4, "big")
-        block = hashlib.sha256(key + nonce + counter_bytes).digest()
-        blocks.append(block)
-        counter += 1
+    for counter in range((length + 31) // 32):
+        block = prefix.copy()
+        block.update(counter.to_bytes(4, "big"))
+        blocks.append(block.digest())
     return b"".join(blocks)[:length]
 
 
-def encrypt_profile_payload(key: bytes, profile: Dict[str, Any]) -> Dict[str, str]:
-    plaintext = json.dumps(profile, separators=(",", ":")).encode("utf-8")
-    nonce = os.urandom(16)
+def xor_bytes(data: bytes, keystream: bytes) -> bytes:
+    if not data:
+        return b""
+    mixed = int.from_bytes(data, "big") ^ int.from_bytes(keystream, "big")
+    return mixed.to_bytes(len(data), "big")
+
+
+PROFILE_ALIAS_FIELDS = ("income_sources", "saving_list", "budgeting_list")
+
+
+def compact_month_items(
+    templates: Dict[str, Dict[str, Any]], key: str, items: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Reduce recurring items to what differs from their template (nothing if untouched)."""
+    if not templates:
+        return items
+    compacted = []
+    for item in items:
+        template_id = item.get("template")
+        if template_id is None:
+            compacted.append(item)
+            continue
+        template = templates.get(template_id)
+        if template is None:
+            compacted.append({name: value for name, value in item.items() if name != "template"})
+            continue
+        default = materialize_recurring_item(template, key)
+        override = {name: value for name, value in item.items() if default.get(name) != value}
+        if override:
+            compacted.append({"template": template_id, **override})
+    return compacted
+
+
+def expand_month_items(
+    templates: Dict[str, Dict[str, Any]], key: str, items: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    expanded = []
+    for item in items:
+        template = templates.get(item.get("template"))
+        expanded.append({**materialize_recurring_item(template, key), **item} if template is not None else item)
+    return expanded
+
+
+def encode_ledger(transactions: List[Dict[str, Any]]) -> List[List[Any]]:
+    """A ledger as three columns: day numbers stored as deltas, amounts and notes."""
+    days: List[int] = []
+    amounts: List[int] = []
+    notes: List[str] = []
+    previous = 0
+    for transaction in transactions:
+        day = date.fromisoformat(transaction["date"]).toordinal()
+        days.append(day - previous)
+        previous = day
+        amounts.append(transaction["amount"])
+        notes.append(transaction.get("note", ""))
+    return [days, amounts, notes]
+
+
+def ledger_problem(ledger: Any, strings: Optional[List[str]] = None) -> Optional[str]:
+    """Why a stored ledger cannot be decoded, or None. Notes may be ids into ``strings``."""
+    if not (isinstance(ledger, list) and len(ledger) == 3 and all(isinstance(column, list) for column in ledger)):
+        return "not three columns"
+    days, amounts, notes = ledger
+    if not len(days) == len(amounts) == len(notes):
+        return "columns differ in length"
+    if any(type(value) is not int for value in days) or any(type(value) is not int for value in amounts):
+        return "days and amounts must be integers"
+    known = len(strings) if strings is not None else 0
+    if any(not isinstance(note, str) and not (type(note) is int and 0 <= note < known) for note in notes):
+        return "unknown note string"
+    day = 0
+    for delta in days:
+        day += delta
+        if not 1 <= day <= date.max.toordinal():
+            return f"invalid day number {day}"
+    return None
+
+
+def decode_ledger(ledger: List[List[Any]]) -> List[Dict[str, Any]]:
+    transactions = []
+    labels: Dict[int, str] = {}
+    day = 0
+    for delta, amount, note in zip(*ledger):
+        day += delta
+        label = labels.get(day)
+        if label is None:
+            label = labels[day] = date.fromordinal(day).isoformat()
+        transaction = {"date": label, "amount": amount}
+        if note:
+            transaction["note"] = note
+        transactions.append(transaction)
+    return transactions
+
+
+def encode_profile_for_storage(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the form of ``profile`` that gets encrypted.
+
+    The current-month aliases and transient ``_`` keys are dropped. Items
+    coming from recurring templates keep only their per-month overrides. A
+    month whose own items are exactly the item objects of an earlier month
+    (a copy nobody has edited yet) is stored as ``{"copy_of": key}``, so
+    copied months cost nothing on disk until one of their items diverges.
+    Payment ledgers are stored in columns (see :func:`encode_ledger`).
+    """
+    stored = {
+        name: value
+        for name, value in profile.items()
+        if name not in PROFILE_ALIAS_FIELDS and name != "months" and not name.startswith("_")
+    }
+    templates = {template["id"]: template for template in profile.get("recurring", [])}
+    months: Dict[str, Dict[str, Any]] = {}
+    for key, month_data in profile.get("months", {}).items():
+        compacted = {name: value for name, value in month_data.items() if not name.startswith("_")}
+        for field_name in PROFILE_ALIAS_FIELDS:
+            items = compact_month_items(templates, key, month_data.get(field_name, []))
+            if field_name == "budgeting_list":
+                items = [
+                    {
+                        **{name: value for name, value in item.items() if name != "transactions"},
+                        "ledger": encode_ledger(item["transactions"]),
+                    }
+                    if "transactions" in item
+                    else item
+                    for item in items
+                ]
+            if items:
+                compacted[field_name] = items
+            else:
+                compacted.pop(field_name, None)
+        skipped = [template_id for template_id in month_data.get("skipped_templates", []) if template_id in templates]
+        if skipped:
+            compacted["skipped_templates"] = skipped
+        else:
+            compacted.pop("skipped_templates", None)
+        months[key] = compacted
+
+    stored_months: Dict[str, Any] = {}
+    first_month: Dict[Tuple[Tuple[int, ...], ...], str] = {}
+    for key in sorted(months):
+        month_data = months[key]
+        own_items = tuple(
+            tuple(id(item) for item in month_data.get(field_name, []) if "template" not in item)
+            for field_name in PROFILE_ALIAS_FIELDS
+        )
+        source_key = first_month.setdefault(own_items, key) if any(own_items) else key
+        if source_key != key and set(month_data) <= set(PROFILE_ALIAS_FIELDS) and not any(
+            "template" in item for field_name in PROFILE_ALIAS_FIELDS for item in month_data.get(field_name, [])
+        ):
+            stored_months[key] = {"copy_of": source_key}
+        else:
+            stored_months[key] = month_data
+    stored["months"] = stored_months
+    return stored
+
+
+def decode_profile_from_storage(stored: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of :func:`encode_profile_for_storage`.
+
+    ``copy_of`` months get their own list objects holding the *same* item
+    dicts as their source, so copies share memory until an item is replaced.
+    Template overrides are expanded back into full items; untouched recurring
+    items are added later by :func:`get_month_data`.
+    """
+    months = unpack_profile_strings(stored).get("months")
+    if not isinstance(months, dict):
+        return stored
+
+    def resolve(key: str, trail: frozenset) -> Any:
+        entry = months.get(key)
+        if not isinstance(entry, dict) or "copy_of" not in entry:
+            return entry
+        source_key = entry["copy_of"]
+        source = resolve(source_key, trail | {key}) if source_key not in trail else None
+        materialized: Dict[str, Any] = {
+            field_name: [item for item in source.get(field_name, []) if "template" not in item]
+            if isinstance(source, dict)
+            else []
+            for field_name in PROFILE_ALIAS_FIELDS
+        }
+        months[key] = materialized
+        return materialized
+
+    for month_data in months.values():
+        if not isinstance(month_data, dict) or not isinstance(month_data.get("budgeting_list"), list):
+            continue
+        for item in month_data["budgeting_list"]:
+            # Damaged ledgers stay encoded for fsck to report.
+            if isinstance(item, dict) and "ledger" in item and ledger_problem(item["ledger"]) is None:
+                item["transactions"] = decode_ledger(item.pop("ledger"))
+    for key in list(months):
+        resolve(key, frozenset())
+    templates = {
+        template["id"]: template for template in stored.get("recurring", []) if isinstance(template, dict)
+    }
+    if templates:
+        for key, month_data in months.items():
+            if not isinstance(month_data, dict):
+                continue
+            for field_name in PROFILE_ALIAS_FIELDS:
+                if isinstance(month_data.get(field_name), list):
+                    month_data[field_name] = expand_month_items(templates, key, month_data[field_name])
+    return stored
+
+
+PROFILE_STRING_FIELDS = ("name", "category")
+
+
+def pack_profile_strings(stored: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace month item names and categories by indexes into one ``strings`` table.
+
+    The same names repeat in every month; storing each once keeps the payload
+    small and cheap to encrypt, and on load every repeat shares one string
+    object. ``stored`` itself is left untouched.
+    """
+    ids: Dict[str, int] = {}
+    months: Dict[str, Any] = {}
+    for key, month_data in stored.get("months", {}).items():
+        packed = dict(month_data)
+        for field_name in PROFILE_ALIAS_FIELDS:
+            if field_name not in month_data:
+                continue
+            packed_items = []
+            for item in month_data[field_name]:
+                item = item.copy()
+                for name in PROFILE_STRING_FIELDS:
+                    value = item.get(name)
+                    if value.__class__ is str:
+                        item[name] = ids.setdefault(value, len(ids))
+                ledger = item.get("ledger")
+                if ledger is not None:
+                    item["ledger"] = [ledger[0], ledger[1], [ids.setdefault(note, len(ids)) for note in ledger[2]]]
+                packed_items.append(item)
+            packed[field_name] = packed_items
+        months[key] = packed
+    return {**stored, "months": months, "strings": list(ids)}
+
+
+def unpack_profile_strings(stored: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of :func:`pack_profile_strings`, in place; plain profiles pass through unchanged."""
+    strings = stored.pop("strings", None)
+    months = stored.get("months")
+    if not isinstance(strings, list) or not isinstance(months, dict):
+        return stored
+    table = [sys.intern(value) if isinstance(value, str) else value for value in strings]
+    for month_data in months.values():
+        if not isinstance(month_data, dict):
+            continue
+        for field_name in PROFILE_ALIAS_FIELDS:
+            items = month_data.get(field_name)
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                for name in PROFILE_STRING_FIELDS:
+                    value = item.get(name)
+                    # Unknown ids stay as they are for fsck to report.
+                    if type(value) is int and 0 <= value < len(table):
+                        item[name] = table[value]
+                ledger = item.get("ledger")
+                if isinstance(ledger, list) and len(ledger) == 3 and isinstance(ledger[2], list):
+                    ledger[2] = [
+                        table[note] if type(note) is int and 0 <= note < len(table) else note for note in ledger[2]
+                    ]
+    return stored
+
+
+def encrypt_profile_payload(key: bytes, profile: Dict[str, Any], nonce: Optional[bytes] = None) -> Dict[str, Any]:
+    return encrypt_payload(key, pack_profile_strings(encode_profile_for_storage(profile)), nonce)
+
+
+def encrypt_payload(key: bytes, document: Any, nonce: Optional[bytes] = None) -> Dict[str, Any]:
+    return encrypt_bytes(key, json.dumps(document, separators=(",", ":")).encode("utf-8"), nonce)
+
+
+def encrypt_bytes(key: bytes, plaintext: bytes, nonce: Optional[bytes] = None) -> Dict[str, Any]:
+    """Encrypt with a fresh random nonce; pass one only for reproducible fixtures."""
+    nonce = nonce or os.urandom(16)
     keystream = keystream_bytes(key, nonce, len(plaintext))
-    ciphertext = bytes(p ^ k for p, k in zip(plaintext, keystream))
+    ciphertext = xor_bytes(plaintext, keystream)
     tag = hmac.new(key, nonce + ciphertext, hashlib.sha256).digest()
     return {
         "version": 1,
@@ -789,76 +1991,966 @@ def encrypt_profile_payload(key: bytes, profile: Dict[str, Any]) -> Dict[str, st
     }
 
 
-def decrypt_profile_payload(key: bytes, payload: Dict[str, Any]) -> Dict[str, Any]:
-    if "ciphertext" not in payload:
-        ensure_profile_defaults(payload)
-        return payload
-
+def decode_encrypted_payload(payload: Dict[str, Any]) -> Tuple[bytes, bytes, bytes]:
     try:
         nonce = base64.b64decode(payload["nonce"])
         ciphertext = base64.b64decode(payload["ciphertext"])
         tag = base64.b64decode(payload["tag"])
     except (KeyError, ValueError, TypeError) as error:
         raise ValueError("Invalid encrypted payload") from error
+    return nonce, ciphertext, tag
 
+
+def open_encrypted_payload(key: bytes, decoded: Tuple[bytes, bytes, bytes]) -> Dict[str, Any]:
+    return json.loads(open_encrypted_bytes(key, decoded).decode("utf-8"))
+
+
+def open_encrypted_bytes(key: bytes, decoded: Tuple[bytes, bytes, bytes]) -> bytes:
+    nonce, ciphertext, tag = decoded
     expected_tag = hmac.new(key, nonce + ciphertext, hashlib.sha256).digest()
     if not hmac.compare_digest(expected_tag, tag):
         raise ValueError("Integrity check failed")
 
     keystream = keystream_bytes(key, nonce, len(ciphertext))
-    plaintext = bytes(c ^ k for c, k in zip(ciphertext, keystream))
-    profile = json.loads(plaintext.decode("utf-8"))
-    ensure_profile_defaults(profile)
-    return profile
-
+    return xor_bytes(ciphertext, keystream)
 
-def get_user_entry(data: Dict[str, Any], email: str) -> Dict[str, Any]:
-    for entry in data["users"]:
-        if entry.get("email") == email:
-            return entry
-    raise KeyError(email)
 
+def decrypt_payload(key: bytes, payload: Dict[str, Any]) -> Any:
+    return open_encrypted_payload(key, decode_encrypted_payload(payload))
 
-def persist_session(session: Session) -> None:
-    ensure_profile_defaults(session.profile)
-    encrypted = encrypt_profile_payload(session.key, session.profile)
-    session.data.setdefault("profiles", {})[session.email] = encrypted
-    save_data(session.data)
+
+def decrypt_profile_payload(key: bytes, payload: Dict[str, Any]) -> Dict[str, Any]:
+    if "ciphertext" not in payload:
+        ensure_profile_defaults(payload)
+        return payload
+
+    profile = decode_profile_from_storage(open_encrypted_payload(key, decode_encrypted_payload(payload)))
+    ensure_profile_defaults(profile)
+    return profile
+
+
+def unlock_profile_pipelined(
+    password: str,
+    user: Dict[str, Any],
+    payload: Any,
+    timings: Optional[LoginTimings] = None,
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Derive the key in a worker thread while the payload is base64-decoded.
+
+    hashlib releases the GIL for the whole PBKDF2 run, so decoding the
+    (potentially large) ciphertext here overlaps with key derivation instead
+    of waiting for it.
+    """
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        derive_started = time.perf_counter()
+        key_future = pool.submit(derive_user_key, password, user)
+        decoded = None
+        if isinstance(payload, dict) and "ciphertext" in payload:
+            decode_started = time.perf_counter()
+            try:
+                decoded = decode_encrypted_payload(payload)
+            finally:
+                if timings is not None:
+                    timings.record("payload_decode", decode_started)
+        key = key_future.result()
+        if timings is not None:
+            timings.record("key_derivation", derive_started)
+
+    open_started = time.perf_counter()
+    if decoded is not None:
+        profile = decode_profile_from_storage(open_encrypted_payload(key, decoded))
+    elif isinstance(payload, dict):
+        profile = payload
+    else:
+        profile = default_profile()
+    ensure_profile_defaults(profile)
+    if timings is not None:
+        timings.record("decrypt", open_started)
+    return key, profile
+
+
+def get_user_entry(data: Dict[str, Any], email: str) -> Dict[str, Any]:
+    for entry in data["users"]:
+        if entry.get("email") == email:
+            return entry
+    raise KeyError(email)
+
+
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+SEARCH_ITEM_FIELDS = ("name", "category", "amount", "allocation", "realization")
+
+
+def tokenize_search_text(text: str) -> List[str]:
+    return SEARCH_TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index from name/category tokens to ``(month, list, index)``.
+
+    Next to the postings it keeps a small summary of every indexed item, so a
+    query can be answered from the index alone without opening the months.
+    """
+
+    def __init__(self) -> None:
+        self.entries: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self.postings: Dict[str, Set[Tuple[str, str, int]]] = {}
+        self._vocabulary: Optional[List[str]] = None
+
+    @classmethod
+    def build(cls, profile: Dict[str, Any]) -> "SearchIndex":
+        index = cls()
+        for key in sorted(profile.get("months", {})):
+            try:
+                year, month = parse_month_key(key)
+            except ValueError:
+                continue
+            month_data = get_month_data(profile, year, month)
+            for list_name, field_name in LIST_FIELDS.items():
+                index.reindex(key, list_name, month_data[field_name])
+        return index
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "SearchIndex":
+        index = cls()
+        stored = payload.get("entries", {})
+        for ref, summaries in stored.items():
+            if isinstance(summaries, dict):
+                summaries = stored.get(summaries.get("same_as"), [])
+            month, _, list_name = ref.partition("/")
+            index.entries[(month, list_name)] = summaries
+        for token, refs in payload.get("postings", {}).items():
+            index.postings[token] = {(month, list_name, position) for month, list_name, position in refs}
+        return index
+
+    def to_payload(self, revision: int) -> Dict[str, Any]:
+        # Months copied from one another index identically; store each
+        # distinct summary list once and point the others at it.
+        entries: Dict[str, Any] = {}
+        first_ref: Dict[str, str] = {}
+        for (month, list_name), items in sorted(self.entries.items()):
+            ref = f"{month}/{list_name}"
+            fingerprint = json.dumps([list_name, items], sort_keys=True)
+            if fingerprint in first_ref:
+                entries[ref] = {"same_as": first_ref[fingerprint]}
+            else:
+                first_ref[fingerprint] = ref
+                entries[ref] = items
+        return {
+            "revision": revision,
+            "entries": entries,
+            "postings": {token: sorted(refs) for token, refs in self.postings.items()},
+        }
+
+    @staticmethod
+    def item_tokens(summary: Dict[str, Any]) -> Set[str]:
+        return set(tokenize_search_text(f"{summary.get('name', '')} {summary.get('category', '')}"))
+
+    def reindex(self, month: str, list_name: str, items: List[Dict[str, Any]]) -> None:
+        """Replace everything indexed for one month's list with ``items``."""
+        for position, summary in enumerate(self.entries.pop((month, list_name), [])):
+            for token in self.item_tokens(summary):
+                refs = self.postings.get(token)
+                if refs is not None:
+                    refs.discard((month, list_name, position))
+                    if not refs:
+                        del self.postings[token]
+        summaries = [{name: item[name] for name in SEARCH_ITEM_FIELDS if name in item} for item in items]
+        if summaries:
+            self.entries[(month, list_name)] = summaries
+        for position, summary in enumerate(summaries):
+            for token in self.item_tokens(summary):
+                self.postings.setdefault(token, set()).add((month, list_name, position))
+        self._vocabulary = None
+
+    def tokens_with_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def search(self, query: str) -> List[Tuple[str, str, int, Dict[str, Any]]]:
+        """Items matching every query word (as a prefix), newest month first."""
+        refs: Optional[Set[Tuple[str, str, int]]] = None
+        for term in tokenize_search_text(query):
+            term_refs: Set[Tuple[str, str, int]] = set()
+            for token in self.tokens_with_prefix(term):
+                term_refs |= self.postings[token]
+            refs = term_refs if refs is None else refs & term_refs
+            if not refs:
+                return []
+        if refs is None:
+            return []
+        ordered = sorted(refs, key=lambda ref: (ref[0], list(LIST_FIELDS).index(ref[1]), -ref[2]), reverse=True)
+        return [(month, list_name, position, self.entries[(month, list_name)][position]) for month, list_name, position in ordered]
+
+
+def update_search_index(session: Session, change: ProfileChange) -> None:
+    if session.search_index is None or change.kind == "templates":
+        return
+    list_names = [change.list_name] if change.list_name else list(LIST_FIELDS)
+    for list_name in list_names:
+        session.search_index.reindex(change.month, list_name, get_item_list(session, change.month, list_name))
+
+
+def load_search_index(key: bytes, record: Any, profile: Dict[str, Any], revision: int) -> SearchIndex:
+    """Use the stored index when it matches the profile revision, else rebuild."""
+    if isinstance(record, dict) and isinstance(record.get("index"), dict):
+        try:
+            payload = decrypt_payload(key, record["index"])
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict) and payload.get("revision") == revision:
+            return SearchIndex.from_payload(payload)
+    return SearchIndex.build(profile)
+
+
+def start_session(
+    data: Dict[str, Any], email: str, profile: Dict[str, Any], key: bytes, revision: int = 0
+) -> Session:
+    session = Session(data=data, email=email, profile=profile, key=key, revision=revision)
+    session.search_index = load_search_index(key, data["profiles"].get(email), profile, revision)
+    session.month_cache = MonthCache()
+    session.listeners.append(update_search_index)
+    session.listeners.append(session.month_cache.on_change)
+    session.listeners.append(record_operation)
+    return session
+
+
+def seal_profile_record(session: Session, revision: int) -> Dict[str, Any]:
+    """Encrypt the profile plus its search index and version history for saving at ``revision``."""
+    close_history_step(session)
+    ensure_profile_defaults(session.profile)
+    stored = encode_profile_for_storage(session.profile)
+    record = encrypt_payload(session.key, pack_profile_strings(stored))
+    if session.search_index is not None:
+        record["index"] = encrypt_payload(session.key, session.search_index.to_payload(revision))
+    history = extend_profile_history(session, revision, stored, len(record["ciphertext"]))
+    if history:
+        record["history"] = history
+    return record
+
+
+HISTORY_SNAPSHOT_EVERY = 25
+HISTORY_KEEP_VERSIONS = 200
+HISTORY_SIZE_FACTOR = 3.0
+
+
+def history_document(stored: Dict[str, Any]) -> Dict[str, Any]:
+    """Snapshot of a stored profile for the version history (undo log excluded).
+
+    Month lists are copied because live lists are appended to in place; the
+    items themselves are never edited and can be shared.
+    """
+    document = {name: value for name, value in stored.items() if name not in ("months", "oplog")}
+    document["months"] = {
+        key: {name: list(value) if isinstance(value, list) else value for name, value in month_data.items()}
+        for key, month_data in stored.get("months", {}).items()
+    }
+    return document
+
+
+def profile_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Changes from ``old`` to ``new`` at the granularity of top-level fields and whole months."""
+    changed: Dict[str, Any] = {}
+    removed: List[str] = []
+    for name in old.keys() | new.keys():
+        if name == "months":
+            continue
+        if name not in new:
+            removed.append(name)
+        elif old.get(name) != new[name]:
+            changed[name] = new[name]
+    old_months = old.get("months", {})
+    new_months = new.get("months", {})
+    removed.extend(f"months/{key}" for key in old_months if key not in new_months)
+    for key, month_data in new_months.items():
+        if old_months.get(key) != month_data:
+            changed[f"months/{key}"] = month_data
+    return {"set": changed, "del": removed}
+
+
+def apply_profile_delta(document: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    result = {**document, "months": dict(document.get("months", {}))}
+    for path in delta.get("del", []):
+        if path.startswith("months/"):
+            result["months"].pop(path[len("months/") :], None)
+        else:
+            result.pop(path, None)
+    for path, value in delta.get("set", {}).items():
+        if path.startswith("months/"):
+            result["months"][path[len("months/") :]] = value
+        else:
+            result[path] = value
+    return result
+
+
+def seal_history_entry(key: bytes, entry: Dict[str, Any]) -> Dict[str, Any]:
+    plaintext = zlib.compress(json.dumps(entry, separators=(",", ":")).encode("utf-8"), 9)
+    return {"kind": entry["kind"], **encrypt_bytes(key, plaintext)}
+
+
+def open_history_entry(key: bytes, sealed: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        plaintext = zlib.decompress(open_encrypted_bytes(key, decode_encrypted_payload(sealed)))
+    except zlib.error as error:
+        raise ValueError("Corrupted history entry") from error
+    return json.loads(plaintext.decode("utf-8"))
+
+
+def iter_history_versions(
+    key: bytes, entries: List[Dict[str, Any]]
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]:
+    """Yield ``(sealed entry, entry, stored profile)`` for every version that can be rebuilt, oldest first."""
+    document: Optional[Dict[str, Any]] = None
+    for sealed in entries:
+        entry = open_history_entry(key, sealed)
+        if entry["kind"] == "full":
+            document = entry["profile"]
+        elif document is None:
+            continue
+        else:
+            document = apply_profile_delta(document, entry["delta"])
+        yield sealed, entry, document
+
+
+def last_snapshot_position(entries: List[Dict[str, Any]]) -> int:
+    for position in range(len(entries) - 1, -1, -1):
+        if entries[position].get("kind") == "full":
+            return position
+    return -1
+
+
+def prune_history(entries: List[Dict[str, Any]], versions: int, size_limit: float) -> List[Dict[str, Any]]:
+    """Drop the oldest snapshot chains while the history is over either limit.
+
+    Deltas need their snapshot, so history is only cut right before a full
+    snapshot and the newest chain is always kept.
+    """
+    start = 0
+    size = sum(len(entry["ciphertext"]) for entry in entries)
+    for position, entry in enumerate(entries):
+        if len(entries) - start <= versions and size <= size_limit:
+            break
+        if position > start and entry.get("kind") == "full":
+            size -= sum(len(dropped["ciphertext"]) for dropped in entries[start:position])
+            start = position
+    return entries[start:]
+
+
+def extend_profile_history(
+    session: Session, revision: int, stored: Dict[str, Any], profile_size: int
+) -> List[Dict[str, Any]]:
+    """Add the profile being saved as a new version and apply the retention policy.
+
+    A version is a zlib-compressed delta against the previous one, with a full
+    snapshot every ``HISTORY_SNAPSHOT_EVERY`` versions or once the deltas since
+    the last snapshot outgrow the profile. Each entry is encrypted on its own,
+    so a save only encrypts its new entry.
+    """
+    record = session.data["profiles"].get(session.email)
+    entries = list(record.get("history", [])) if isinstance(record, dict) else []
+    last_tag = entries[-1].get("tag") if entries else None
+    if session.history_base is not None and session.history_base[0] == last_tag:
+        base: Optional[Dict[str, Any]] = session.history_base[1]
+    else:
+        base = None
+        try:
+            for _, _, base in iter_history_versions(session.key, entries[max(0, last_snapshot_position(entries)) :]):
+                pass
+        except ValueError:
+            entries, base = [], None
+
+    document = history_document(stored)
+    snapshot_at = last_snapshot_position(entries)
+    chain = entries[snapshot_at + 1 :] if snapshot_at >= 0 else entries
+    entry: Dict[str, Any] = {"revision": revision, "saved_at": datetime.now().isoformat(timespec="seconds")}
+    delta = profile_delta(base, document) if base is not None else None
+    if delta is not None and not delta["set"] and not delta["del"]:
+        return entries
+    if delta is None or len(chain) + 1 >= HISTORY_SNAPSHOT_EVERY or sum(
+        len(sealed["ciphertext"]) for sealed in chain
+    ) > profile_size:
+        entry.update(kind="full", profile=document)
+    else:
+        entry.update(kind="delta", delta=delta)
+    sealed = seal_history_entry(session.key, entry)
+    entries.append(sealed)
+    session.history_base = (sealed["tag"], document)
+
+    retention = session.profile.get("history_retention", {})
+    versions = int(retention.get("versions", HISTORY_KEEP_VERSIONS))
+    size_factor = float(retention.get("size_factor", HISTORY_SIZE_FACTOR))
+    return prune_history(entries, versions, size_factor * profile_size)
+
+
+def commit_session(session: Session, default_language: Optional[str] = None) -> None:
+    """Encrypt and save only this session's profile (and ``default_language`` when given); raise on a lost race."""
+    encrypted = seal_profile_record(session, session.revision + 1)
+    conflicts = commit_profile_records(
+        session.data,
+        {session.email: encrypted},
+        {session.email: session.revision},
+        default_language=default_language,
+    )
+    if conflicts:
+        raise ProfileConflictError(session.email)
+    session.revision += 1
+
+
+def reload_session_profile(session: Session) -> None:
+    """Replace the in-memory profile with the latest saved version."""
+    record = session.data["profiles"].get(session.email)
+    profile = decrypt_profile_payload(session.key, record) if isinstance(record, dict) else default_profile()
+    session.profile.clear()
+    session.profile.update(profile)
+    session.revision = record_revision(record)
+    session.search_index = load_search_index(session.key, record, session.profile, session.revision)
+    session.completions = None
+    if session.month_cache is not None:
+        session.month_cache.clear()
+    session.pending_ops = []
+
+
+def persist_session(session: Session, default_language: Optional[str] = None) -> None:
+    try:
+        commit_session(session, default_language)
+    except ProfileConflictError:
+        reload_session_profile(session)
+        console.print(f"[yellow]{tr(session.profile, 'profile_conflict_reloaded')}[/]")
+    except DataFileError:
+        console.print(f"[red]{tr(session.profile, 'data_file_unreadable')}[/]")
+
+
+LIST_FIELDS: Dict[str, str] = {
+    "income": "income_sources",
+    "saving": "saving_list",
+    "budget": "budgeting_list",
+}
+
+
+def parse_month_key(key: str) -> Tuple[int, int]:
+    year_text, _, month_text = key.partition("-")
+    if not (year_text.isdigit() and month_text.isdigit()):
+        raise ValueError(f"Invalid month key: {key}")
+    year, month = int(year_text), int(month_text)
+    if not 1 <= month <= 12:
+        raise ValueError(f"Invalid month key: {key}")
+    return year, month
+
+
+def build_item(list_name: str, raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate an item coming from outside the CLI prompts (API, imports)."""
+    if list_name not in LIST_FIELDS:
+        raise ValueError(f"Unknown list: {list_name}")
+    name = str(raw.get("name", "")).strip() or "Item"
+    amount_fields = ("allocation", "realization") if list_name == "budget" else ("amount",)
+    item: Dict[str, Any] = {"name": name}
+    for field_name in amount_fields:
+        value = raw.get(field_name, 0)
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise ValueError(f"{field_name} must be a non-negative integer")
+        item[field_name] = value
+    if list_name == "budget":
+        item["category"] = str(raw.get("category", "")).strip()
+    return item
+
+
+def get_item_list(session: Session, key: str, list_name: str) -> List[Dict[str, Any]]:
+    if list_name not in LIST_FIELDS:
+        raise ValueError(f"Unknown list: {list_name}")
+    year, month = parse_month_key(key)
+    return get_month_data(session.profile, year, month)[LIST_FIELDS[list_name]]
+
+
+def notify_change(session: Session, change: ProfileChange) -> None:
+    for listener in session.listeners:
+        listener(session, change)
+
+
+def insert_item(
+    session: Session, key: str, list_name: str, item: Dict[str, Any], index: Optional[int] = None
+) -> int:
+    items = get_item_list(session, key, list_name)
+    if index is None:
+        index = len(items)
+    items.insert(index, item)
+    if "template" in item:
+        year, month = parse_month_key(key)
+        skipped = get_month_data(session.profile, year, month).get("skipped_templates", [])
+        if item["template"] in skipped:
+            skipped.remove(item["template"])
+    notify_change(session, ProfileChange("insert", key, list_name, index, None, item))
+    return index
+
+
+def remove_item(session: Session, key: str, list_name: str, index: int) -> Dict[str, Any]:
+    items = get_item_list(session, key, list_name)
+    if not 0 <= index < len(items):
+        raise IndexError(index)
+    removed = items.pop(index)
+    if "template" in removed:
+        year, month = parse_month_key(key)
+        get_month_data(session.profile, year, month).setdefault("skipped_templates", []).append(removed["template"])
+    notify_change(session, ProfileChange("remove", key, list_name, index, removed, None))
+    return removed
+
+
+def update_item(
+    session: Session, key: str, list_name: str, index: int, changes: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Replace the item at ``index`` with an updated copy and return the copy."""
+    items = get_item_list(session, key, list_name)
+    if not 0 <= index < len(items):
+        raise IndexError(index)
+    return set_item(session, key, list_name, index, {**items[index], **changes})
+
+
+def set_item(session: Session, key: str, list_name: str, index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+    items = get_item_list(session, key, list_name)
+    if not 0 <= index < len(items):
+        raise IndexError(index)
+    previous = items[index]
+    items[index] = item
+    notify_change(session, ProfileChange("update", key, list_name, index, previous, item))
+    return item
+
+
+def build_transaction(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a payment: a ``YYYY-MM-DD`` date (default today), a non-zero amount
+    (negative for a refund) and an optional note."""
+    try:
+        day = datetime.strptime(str(raw.get("date") or date.today().isoformat()), "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("date must be YYYY-MM-DD") from None
+    amount = raw.get("amount")
+    if isinstance(amount, bool) or not isinstance(amount, int) or amount == 0:
+        raise ValueError("amount must be a non-zero integer")
+    transaction: Dict[str, Any] = {"date": day.isoformat(), "amount": amount}
+    note = str(raw.get("note") or "").strip()
+    if note:
+        transaction["note"] = note
+    return transaction
+
+
+def append_transaction(
+    session: Session, key: str, index: int, transaction: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Record a payment on a budget item and add it to the item's realization.
+
+    The item is replaced by a copy as usual, but its ledger list is extended in
+    place, so an append costs the same however long the ledger is. That is safe
+    because no other live item holds the list: copied months start without a
+    ledger, and undo pops entries in reverse order before it restores any
+    earlier version of the item.
+    """
+    items = get_item_list(session, key, "budget")
+    if not 0 <= index < len(items):
+        raise IndexError(index)
+    previous = items[index]
+    realization = int(previous.get("realization", 0)) + transaction["amount"]
+    if realization < 0:
+        raise ValueError("realization would become negative")
+    ledger = previous.get("transactions")
+    if ledger is None:
+        ledger = []
+    ledger.append(transaction)
+    item = {**previous, "transactions": ledger, "realization": realization}
+    items[index] = item
+    notify_change(session, ProfileChange("append", key, "budget", index, previous, item, transaction))
+    return item
+
+
+def pop_transaction(session: Session, key: str, index: int) -> Dict[str, Any]:
+    """Remove the newest payment of a budget item (the inverse of :func:`append_transaction`)."""
+    items = get_item_list(session, key, "budget")
+    if not 0 <= index < len(items) or not items[index].get("transactions"):
+        raise IndexError(index)
+    previous = items[index]
+    transaction = previous["transactions"].pop()
+    item = {**previous, "realization": int(previous.get("realization", 0)) - transaction["amount"]}
+    if not item["transactions"]:
+        del item["transactions"]
+    items[index] = item
+    notify_change(session, ProfileChange("pop", key, "budget", index, previous, item, transaction))
+    return transaction
+
+
+def replace_month_lists(session: Session, key: str, lists: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Swap whole lists of a month (e.g. when copying another month into it)."""
+    year, month = parse_month_key(key)
+    month_data = get_month_data(session.profile, year, month)
+    before = {list_name: month_data[LIST_FIELDS[list_name]] for list_name in lists}
+    for list_name, items in lists.items():
+        month_data[LIST_FIELDS[list_name]] = items
+    month_data.pop("_recurring", None)
+    apply_recurring_templates(session.profile, key, month_data)
+    if key == current_month_key(session.profile):
+        sync_current_month_references(session.profile)
+    notify_change(session, ProfileChange("replace", key, None, None, before, lists))
+
+
+def set_recurring_templates(session: Session, templates: List[Dict[str, Any]]) -> None:
+    """Install a new template list and bring already loaded months in line.
+
+    Template dicts are treated as immutable: callers pass new dicts for edited
+    templates so each month's overrides can be computed against the old ones.
+    Untouched recurring items follow the new templates; overridden fields and
+    the overrides of deleted templates are kept.
+    """
+    profile = session.profile
+    before = profile.get("recurring", [])
+    previous = {template["id"]: template for template in before}
+    current = {template["id"]: template for template in templates}
+    if templates:
+        profile["recurring"] = templates
+    else:
+        profile.pop("recurring", None)
+    profile["_recurring_version"] = profile.get("_recurring_version", 0) + 1
+    notify_change(session, ProfileChange("templates", "", None, None, before, templates))
+    # The month refreshes below follow from the template change; undoing it
+    # recomputes them, so they are not logged as operations of their own.
+    recording, session.recording = session.recording, False
+    try:
+        for key in sorted(profile.get("months", {})):
+            try:
+                parse_month_key(key)
+            except ValueError:
+                continue
+            month_data = profile["months"][key]
+            ensure_month_defaults(month_data)
+            touched = any(
+                "template" in item for field_name in LIST_FIELDS.values() for item in month_data[field_name]
+            )
+            if not touched and not any(recurring_active(template, key) for template in templates):
+                continue
+            replace_month_lists(
+                session,
+                key,
+                {
+                    list_name: expand_month_items(
+                        {**previous, **current}, key, compact_month_items(previous, key, month_data[field_name])
+                    )
+                    for list_name, field_name in LIST_FIELDS.items()
+                },
+            )
+    finally:
+        session.recording = recording
+
+
+HISTORY_LIMIT = 50
+
+
+def record_operation(session: Session, change: ProfileChange) -> None:
+    """Change listener that logs the inverse of every edit for undo/redo.
+
+    An entry only holds what is needed to reverse the edit (the removed or
+    previous item, the replaced lists), so the log grows with the size of the
+    edits rather than the profile. Entries collect in ``pending_ops`` until the
+    next save turns them into one undoable step.
+    """
+    if not session.recording:
+        return
+    op: Dict[str, Any] = {"kind": change.kind, "month": change.month}
+    if change.list_name is not None:
+        op["list"] = change.list_name
+    if change.index is not None:
+        op["index"] = change.index
+    if change.kind == "replace":
+        op["before"] = {list_name: list(items) for list_name, items in change.before.items()}
+    elif change.kind == "templates":
+        op["before"] = list(change.before)
+    elif change.kind == "pop":
+        op["before"] = change.transaction
+    elif change.kind == "update" and "transactions" in change.before:
+        # The ledger is unchanged by an update and is back to this state by the
+        # time the update is reverted, so it is not copied into the log.
+        op["before"] = {name: value for name, value in change.before.items() if name != "transactions"}
+    elif change.before is not None and change.kind != "append":
+        op["before"] = change.before
+    session.pending_ops.append(op)
+
+
+def close_history_step(session: Session) -> None:
+    """Turn the edits since the last save into one undo step."""
+    if not session.pending_ops:
+        return
+    log = session.profile.setdefault("oplog", {"undo": [], "redo": []})
+    log["undo"].append(session.pending_ops)
+    del log["undo"][:-HISTORY_LIMIT]
+    log["redo"] = []
+    session.pending_ops = []
+
+
+def revert_operation(session: Session, op: Dict[str, Any]) -> None:
+    kind = op["kind"]
+    if kind == "insert":
+        remove_item(session, op["month"], op["list"], op["index"])
+    elif kind == "remove":
+        insert_item(session, op["month"], op["list"], op["before"], op["index"])
+    elif kind == "update":
+        before = op["before"]
+        current = get_item_list(session, op["month"], op["list"])[op["index"]]
+        if "transactions" in current and "transactions" not in before:
+            before = {**before, "transactions": current["transactions"]}
+        set_item(session, op["month"], op["list"], op["index"], before)
+    elif kind == "append":
+        pop_transaction(session, op["month"], op["index"])
+    elif kind == "pop":
+        append_transaction(session, op["month"], op["index"], op["before"])
+    elif kind == "replace":
+        replace_month_lists(session, op["month"], op["before"])
+    elif kind == "templates":
+        set_recurring_templates(session, op["before"])
+
+
+def step_history(session: Session, source: str, target: str) -> Optional[List[Dict[str, Any]]]:
+    """Revert the newest step on the ``source`` stack and push its inverse onto ``target``.
+
+    Returns the reverted step, or ``None`` when there is nothing to revert.
+    """
+    close_history_step(session)
+    log = session.profile.get("oplog")
+    if not log or not log.get(source):
+        return None
+    step = log[source].pop()
+    for op in reversed(step):
+        revert_operation(session, op)
+    log[target].append(session.pending_ops)
+    del log[target][:-HISTORY_LIMIT]
+    session.pending_ops = []
+    return step
+
+
+class NameTrie:
+    """Case-insensitive prefix trie of item names with frequency-ranked suggestions.
+
+    Every node caches its ``TOP`` most frequent completions, so a prefix lookup
+    only walks ``len(prefix)`` nodes regardless of how many names are stored.
+    When nothing starts with the typed text, suggestions fall back to prefixes
+    within one edit (typo, missing or extra letter).
+    """
+
+    TOP = 8
+
+    def __init__(self) -> None:
+        self.root: Dict[str, Any] = {"children": {}, "best": []}
+        self.counts: Dict[str, int] = {}
+        self.spelling: Dict[str, str] = {}
+
+    @classmethod
+    def from_names(cls, names: Iterator[str]) -> "NameTrie":
+        """Bulk build: inserting names by descending frequency keeps every
+        node's ranking append-only, which is much cheaper than ``add``."""
+        trie = cls()
+        for name in names:
+            name = name.strip()
+            if name:
+                normalized = name.lower()
+                trie.counts[normalized] = trie.counts.get(normalized, 0) + 1
+                trie.spelling.setdefault(normalized, name)
+        for normalized in sorted(trie.counts, key=lambda entry: -trie.counts[entry]):
+            node = trie.root
+            if len(node["best"]) < cls.TOP:
+                node["best"].append(normalized)
+            for char in normalized:
+                node = node["children"].setdefault(char, {"children": {}, "best": []})
+                if len(node["best"]) < cls.TOP:
+                    node["best"].append(normalized)
+        return trie
+
+    def add(self, name: str) -> None:
+        name = name.strip()
+        if not name:
+            return
+        normalized = name.lower()
+        self.counts[normalized] = self.counts.get(normalized, 0) + 1
+        self.spelling.setdefault(normalized, name)
+        node = self.root
+        self._rank(node, normalized)
+        for char in normalized:
+            node = node["children"].setdefault(char, {"children": {}, "best": []})
+            self._rank(node, normalized)
+
+    def _rank(self, node: Dict[str, Any], normalized: str) -> None:
+        best: List[str] = node["best"]
+        if normalized in best:
+            best.remove(normalized)
+        count = self.counts[normalized]
+        position = 0
+        while position < len(best) and self.counts[best[position]] >= count:
+            position += 1
+        best.insert(position, normalized)
+        del best[self.TOP :]
+
+    def _node(self, prefix: str) -> Optional[Dict[str, Any]]:
+        node = self.root
+        for char in prefix:
+            node = node["children"].get(char)
+            if node is None:
+                return None
+        return node
+
+    def _fuzzy_nodes(self, prefix: str) -> List[Dict[str, Any]]:
+        found: List[Dict[str, Any]] = []
+
+        def walk(node: Dict[str, Any], position: int, edits: int) -> None:
+            if position == len(prefix):
+                found.append(node)
+                if edits:
+                    return
+            if position < len(prefix):
+                child = node["children"].get(prefix[position])
+                if child is not None:
+                    walk(child, position + 1, edits)
+            if edits:
+                return
+            if position < len(prefix):
+                walk(node, position + 1, 1)  # extra letter typed
+            for char, child in node["children"].items():
+                walk(child, position, 1)  # letter missing
+                if position < len(prefix) and char != prefix[position]:
+                    walk(child, position + 1, 1)  # wrong letter
+
+        walk(self.root, 0, 0)
+        return found
+
+    def suggest(self, text: str, limit: int = TOP) -> List[str]:
+        prefix = text.lower()
+        node = self._node(prefix)
+        candidates = list(node["best"]) if node is not None else []
+        if len(candidates) < limit and prefix:
+            seen = set(candidates)
+            fuzzy: List[str] = []
+            for fuzzy_node in self._fuzzy_nodes(prefix):
+                for normalized in fuzzy_node["best"]:
+                    if normalized not in seen:
+                        seen.add(normalized)
+                        fuzzy.append(normalized)
+            fuzzy.sort(key=lambda normalized: -self.counts[normalized])
+            candidates.extend(fuzzy)
+        return [self.spelling[normalized] for normalized in candidates[:limit]]
+
+
+@dataclass
+class ItemCompletions:
+    names: NameTrie
+    categories: NameTrie
+
+
+def iter_profile_items(profile: Dict[str, Any]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    for key in sorted(profile.get("months", {})):
+        try:
+            year, month = parse_month_key(key)
+        except ValueError:
+            continue
+        month_data = get_month_data(profile, year, month)
+        for list_name, field_name in LIST_FIELDS.items():
+            for item in month_data[field_name]:
+                yield key, list_name, item
+
+
+def update_item_completions(session: Session, change: ProfileChange) -> None:
+    if session.completions is None or change.kind in ("remove", "templates", "append", "pop"):
+        return
+    added = change.after.values() if change.kind == "replace" else [[change.after]]
+    for items in added:
+        for item in items:
+            session.completions.names.add(item.get("name", ""))
+            session.completions.categories.add(item.get("category", ""))
+
+
+def get_item_completions(session: Session) -> ItemCompletions:
+    """Build the name/category tries once per session and keep them current."""
+    if session.completions is None:
+        items = [item for _, _, item in iter_profile_items(session.profile)]
+        session.completions = ItemCompletions(
+            NameTrie.from_names(item.get("name", "") for item in items),
+            NameTrie.from_names(item.get("category", "") for item in items),
+        )
+        if update_item_completions not in session.listeners:
+            session.listeners.append(update_item_completions)
+    return session.completions
+
+
+@contextmanager
+def autocomplete(trie: Optional[NameTrie]) -> Iterator[None]:
+    """Offer ``trie`` suggestions on Tab for the ``input()`` calls inside the block."""
+    if readline is None or trie is None:
+        yield
+        return
+    previous_completer = readline.get_completer()
+    previous_delims = readline.get_completer_delims()
+    matches: List[str] = []
+
+    def complete(text: str, state: int) -> Optional[str]:
+        if state == 0:
+            matches[:] = trie.suggest(readline.get_line_buffer())
+        return matches[state] if state < len(matches) else None
+
+    readline.set_completer_delims("")
+    readline.set_completer(complete)
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+    try:
+        yield
+    finally:
+        readline.set_completer(previous_completer)
+        readline.set_completer_delims(previous_delims)
+
+
+def prompt_item_name(session: Session, message: str) -> str:
+    with autocomplete(get_item_completions(session).names):
+        return input(message).strip()
+
+
+def prompt_item_category(session: Session, message: str) -> str:
+    with autocomplete(get_item_completions(session).categories):
+        return input(message).strip()
 
 
 def add_income(session: Session) -> None:
     profile = session.profile
-    month_data = sync_current_month_references(profile)
-    name = input(tr(profile, "prompt_income_name")).strip() or tr(profile, "default_name")
+    sync_current_month_references(profile)
+    name = prompt_item_name(session, tr(profile, "prompt_income_name")) or tr(profile, "default_name")
     amount = prompt_positive_int(tr(profile, "prompt_amount"), tr(profile, "error_positive_int"))
-    month_data["income_sources"].append({"name": name, "amount": amount})
+    insert_item(session, current_month_key(profile), "income", {"name": name, "amount": amount})
     persist_session(session)
     console.print(f"[green]{tr(profile, 'income_added')}[/]")
 
 
 def add_saving(session: Session) -> None:
     profile = session.profile
-    month_data = sync_current_month_references(profile)
-    name = input(tr(profile, "prompt_saving_name")).strip() or tr(profile, "default_name")
+    sync_current_month_references(profile)
+    name = prompt_item_name(session, tr(profile, "prompt_saving_name")) or tr(profile, "default_name")
     amount = prompt_positive_int(tr(profile, "prompt_amount"), tr(profile, "error_positive_int"))
-    month_data["saving_list"].append({"name": name, "amount": amount})
+    insert_item(session, current_month_key(profile), "saving", {"name": name, "amount": amount})
     persist_session(session)
     console.print(f"[green]{tr(profile, 'saving_added')}[/]")
 
 
 def add_budget_item(session: Session) -> None:
     profile = session.profile
-    month_data = sync_current_month_references(profile)
-    name = input(tr(profile, "prompt_budget_name")).strip() or tr(profile, "default_name")
+    sync_current_month_references(profile)
+    name = prompt_item_name(session, tr(profile, "prompt_budget_name")) or tr(profile, "default_name")
     allocation = prompt_positive_int(tr(profile, "prompt_amount"), tr(profile, "error_positive_int"))
-    category = input(tr(profile, "prompt_budget_category")).strip()
-    month_data["budgeting_list"].append(
+    category = prompt_item_category(session, tr(profile, "prompt_budget_category"))
+    insert_item(
+        session,
+        current_month_key(profile),
+        "budget",
         {
             "name": name,
             "allocation": allocation,
             "realization": 0,
             "category": category,
-        }
+        },
     )
     persist_session(session)
     console.print(f"[green]{tr(profile, 'budget_added')}[/]")
@@ -888,11 +2980,12 @@ def parse_pasted_rows(
 
     for idx, raw_line in enumerate(lines, 1):
         if "\t" in raw_line:
-            columns = [part.strip() for part in raw_line.split("\t")]
+            delimiter = "\t"
         elif ";" in raw_line:
-            columns = [part.strip() for part in raw_line.split(";")]
+            delimiter = ";"
         else:
-            columns = [part.strip() for part in raw_line.split(",")]
+            delimiter = ","
+        columns = [part.strip() for part in raw_line.split(delimiter)]
 
         if data_type in {"income", "saving"}:
             if len(columns) < 2:
@@ -903,7 +2996,8 @@ def parse_pasted_rows(
             name = columns[0].strip() or tr(profile, "default_name")
             amount_text = columns[1]
             if len(columns) > 2:
-                amount_text += "".join(columns[2:])
+                # Only a comma split can cut through an amount like "1,500,000".
+                amount_text = ",".join(columns[1:]) if delimiter == "," else "".join(columns[1:])
             if not amount_text.strip():
                 errors.append(
                     tr(profile, "paste_error", line=idx, reason=tr(profile, "paste_reason_missing_amount"))
@@ -956,21 +3050,10 @@ def parse_pasted_rows(
 
             category = category.strip()
             realization_text = realization_text.strip()
-            if realization_text and parse_amount_value(realization_text) is None:
-                if category:
-                    category = f"{category} {realization_text}".strip()
-                    realization_text = ""
-                else:
-                    category = realization_text
-                    realization_text = ""
-
-            if realization_text and parse_amount_value(realization_text) is None:
-                errors.append(
-                    tr(profile, "paste_error", line=idx, reason=tr(profile, "paste_reason_invalid_realization"))
-                )
-                continue
-
             realization = parse_amount_value(realization_text) if realization_text else 0
+            if realization is None:
+                category = f"{category} {realization_text}".strip()
+                realization = 0
             items.append(
                 {
                     "name": name,
@@ -1011,7 +3094,7 @@ def display_paste_preview(profile: Dict[str, Any], data_type: str, items: List[D
 
 def paste_from_spreadsheet(session: Session) -> None:
     profile = session.profile
-    month_data = sync_current_month_references(profile)
+    sync_current_month_references(profile)
 
     console.print(f"\n[bold cyan]{tr(profile, 'paste_menu_title')}[/]")
     console.print(f"1. {tr(profile, 'paste_menu_option_income')}")
@@ -1052,12 +3135,9 @@ def paste_from_spreadsheet(session: Session) -> None:
         console.print(f"[yellow]{tr(profile, 'paste_cancelled')}[/]")
         return
 
-    if data_type == "income":
-        month_data["income_sources"].extend(items)
-    elif data_type == "saving":
-        month_data["saving_list"].extend(items)
-    else:
-        month_data["budgeting_list"].extend(items)
+    key = current_month_key(profile)
+    for item in items:
+        insert_item(session, key, data_type, item)
 
     persist_session(session)
     console.print(f"[green]{tr(profile, 'paste_success', count=len(items), target=target_label)}[/]")
@@ -1122,11 +3202,287 @@ def edit_realization(session: Session) -> None:
         console.print(f"[red]{tr(profile, 'invalid_choice')}[/]")
         return
 
-    month_data["budgeting_list"][index - 1]["realization"] = realization
+    update_item(session, current_month_key(profile), "budget", index - 1, {"realization": realization})
     persist_session(session)
     console.print(f"[green]{tr(profile, 'realization_updated')}[/]")
 
 
+@dataclass
+class RealizationRule:
+    """A realization for the budget items picked by ``selectors``.
+
+    Percentage rules pay that share of each item's allocation; otherwise every
+    selected item gets ``amount``.
+    """
+
+    selectors: List[str]
+    amount: int
+    percent: bool = False
+
+
+def parse_realization_rule(line: str) -> RealizationRule:
+    """Parse ``1-5, 8 = 100%``, ``Food = 50%`` or ``Listrik = 250rb``; ``*`` selects every item."""
+    head, separator, tail = line.partition("=")
+    selectors = [token.strip() for token in head.split(",") if token.strip()]
+    tail = tail.strip()
+    if not separator or not selectors or not tail:
+        raise ValueError(line)
+    if tail.endswith("%"):
+        number = tail[:-1].strip()
+        if not number.isdigit() or not 1 <= int(number) <= 100:
+            raise ValueError(line)
+        return RealizationRule(selectors, int(number), True)
+    amount = parse_amount_value(tail)
+    if amount is None:
+        raise ValueError(line)
+    return RealizationRule(selectors, amount)
+
+
+def realization_rule_indices(items: List[Dict[str, Any]], rule: RealizationRule) -> List[int]:
+    """Indices a rule selects by 1-based number, range, category or item name.
+
+    Raises ``IndexError`` for numbers outside the list and ``KeyError`` for
+    names that match nothing.
+    """
+    selected: Set[int] = set()
+    for token in rule.selectors:
+        first, dash, last = token.partition("-")
+        if token == "*":
+            selected.update(range(len(items)))
+        elif token.isdigit() or (dash and first.strip().isdigit() and last.strip().isdigit()):
+            start, end = int(first), int(last if dash else first)
+            if not 1 <= start <= end <= len(items):
+                raise IndexError(token)
+            selected.update(range(start - 1, end))
+        else:
+            name = token.lower()
+            matches = [
+                index
+                for index, item in enumerate(items)
+                if name in (str(item.get("category", "")).lower(), str(item.get("name", "")).lower())
+            ]
+            if not matches:
+                raise KeyError(token)
+            selected.update(matches)
+    return sorted(selected)
+
+
+def plan_realizations(
+    items: List[Dict[str, Any]], rules: List[Tuple[RealizationRule, List[int]]]
+) -> Dict[int, int]:
+    """The new realization of every item the rules change; later rules win."""
+    planned: Dict[int, int] = {}
+    for rule, indices in rules:
+        for index in indices:
+            allocation = int(items[index].get("allocation", 0))
+            planned[index] = round(allocation * rule.amount / 100) if rule.percent else rule.amount
+    return {index: value for index, value in planned.items() if value != int(items[index].get("realization", 0))}
+
+
+def read_realization_rules(
+    profile: Dict[str, Any], items: List[Dict[str, Any]]
+) -> List[Tuple[RealizationRule, List[int]]]:
+    rules: List[Tuple[RealizationRule, List[int]]] = []
+    selected: Set[int] = set()
+    while True:
+        line = input(tr(profile, "bulk_realization_rule_prompt", count=len(selected))).strip()
+        if not line:
+            return rules
+        try:
+            rule = parse_realization_rule(line)
+            indices = realization_rule_indices(items, rule)
+        except ValueError:
+            console.print(f"[red]{tr(profile, 'bulk_realization_invalid_rule')}[/]")
+            continue
+        except IndexError:
+            console.print(f"[red]{tr(profile, 'invalid_number')}[/]")
+            continue
+        except KeyError as error:
+            console.print(f"[red]{tr(profile, 'bulk_realization_unknown', name=error.args[0])}[/]")
+            continue
+        rules.append((rule, indices))
+        selected.update(indices)
+
+
+def bulk_edit_realization(session: Session) -> None:
+    """Set the realization of many budget items at once, preview the totals and save once."""
+    profile = session.profile
+    month_data = sync_current_month_references(profile)
+    items = month_data["budgeting_list"]
+    if not items:
+        console.print(f"[yellow]{tr(profile, 'no_budget_items_edit')}[/]")
+        return
+
+    table = Table(title=tr(profile, "budgeting_menu_bulk_realization"), header_style="bold white", expand=True)
+    table.add_column("#", justify="right")
+    table.add_column(tr(profile, "column_name"), style="white")
+    table.add_column(tr(profile, "column_category"), style="white")
+    table.add_column(tr(profile, "column_allocation"), style="green", justify="right")
+    table.add_column(tr(profile, "column_realization"), style="cyan", justify="right")
+    for number, item in enumerate(items, start=1):
+        table.add_row(
+            str(number),
+            item.get("name", tr(profile, "default_item_name")),
+            item.get("category", ""),
+            format_currency(int(item.get("allocation", 0))),
+            format_currency(int(item.get("realization", 0))),
+        )
+    console.print(table)
+    console.print(tr(profile, "bulk_realization_help"))
+
+    rules = read_realization_rules(profile, items)
+    if not rules:
+        return
+    planned = plan_realizations(items, rules)
+    if not planned:
+        console.print(f"[yellow]{tr(profile, 'bulk_realization_unchanged')}[/]")
+        return
+
+    before = calculate_month_totals(month_data)
+    after = calculate_month_totals(
+        {
+            **month_data,
+            "budgeting_list": [
+                {**item, "realization": planned[index]} if index in planned else item
+                for index, item in enumerate(items)
+            ],
+        }
+    )
+    preview = Table(
+        title=tr(profile, "bulk_realization_preview_title", count=len(planned)),
+        caption=tr(
+            profile,
+            "bulk_realization_totals",
+            spending_before=format_currency(before["total_spending"]),
+            spending_after=format_currency(after["total_spending"]),
+            savings_before=format_currency(before["savings"]),
+            savings_after=format_currency(after["savings"]),
+        ),
+        header_style="bold white",
+        expand=True,
+    )
+    preview.add_column("#", justify="right")
+    preview.add_column(tr(profile, "column_name"), style="white")
+    preview.add_column(tr(profile, "column_allocation"), style="green", justify="right")
+    preview.add_column(tr(profile, "column_realization"), justify="right")
+    preview.add_column(tr(profile, "bulk_realization_column_new"), style="cyan", justify="right")
+    for index, realization in sorted(planned.items()):
+        item = items[index]
+        preview.add_row(
+            str(index + 1),
+            item.get("name", tr(profile, "default_item_name")),
+            format_currency(int(item.get("allocation", 0))),
+            format_currency(int(item.get("realization", 0))),
+            format_currency(realization),
+        )
+    console.print(preview)
+
+    if not prompt_yes(tr(profile, "bulk_realization_confirm", count=len(planned))):
+        console.print(f"[yellow]{tr(profile, 'bulk_realization_cancelled')}[/]")
+        return
+    key = current_month_key(profile)
+    for index, realization in sorted(planned.items()):
+        update_item(session, key, "budget", index, {"realization": realization})
+    persist_session(session)
+    console.print(f"[green]{tr(profile, 'bulk_realization_updated', count=len(planned))}[/]")
+
+
+LEDGER_SHOWN = 20
+LEDGER_DATE_PATTERN = re.compile(r"\d{4}-\d{1,2}-\d{1,2}")
+
+
+def parse_transaction(line: str) -> Dict[str, Any]:
+    """Parse ``150rb``, ``-25rb refund`` or ``2025-05-03 Rp 1,5 jt token listrik``.
+
+    The amount is the longest run of leading words that reads as one; the
+    rest is the note.
+    """
+    words = line.split()
+    day = words.pop(0) if words and LEDGER_DATE_PATTERN.fullmatch(words[0]) else None
+    sign = 1
+    if words and words[0].startswith("-"):
+        sign = -1
+        words[0] = words[0][1:]
+        if not words[0]:
+            words.pop(0)
+    for count in range(len(words), 0, -1):
+        amount = parse_amount_value(" ".join(words[:count]))
+        if amount is not None:
+            return build_transaction({"date": day, "amount": sign * amount, "note": " ".join(words[count:])})
+    raise ValueError(line)
+
+
+def display_item_ledger(profile: Dict[str, Any], item: Dict[str, Any]) -> None:
+    """The newest payments of a budget item with running totals.
+
+    Realization recorded without a ledger entry (before the first payment or
+    set by hand) is shown as one "not itemized" line.
+    """
+    transactions = item.get("transactions", [])
+    realization = int(item.get("realization", 0))
+    start = max(0, len(transactions) - LEDGER_SHOWN)
+    running = realization - sum(transaction["amount"] for transaction in transactions[start:])
+    table = Table(
+        title=tr(profile, "ledger_title", name=item.get("name", tr(profile, "default_item_name"))),
+        caption=tr(
+            profile,
+            "ledger_caption",
+            realization=format_currency(realization),
+            allocation=format_currency(int(item.get("allocation", 0))),
+            shown=len(transactions) - start,
+            count=len(transactions),
+        ),
+        header_style="bold white",
+        expand=True,
+    )
+    table.add_column(tr(profile, "ledger_column_date"), style="white")
+    table.add_column(tr(profile, "column_amount"), style="cyan", justify="right")
+    table.add_column(tr(profile, "ledger_column_note"), style="white")
+    table.add_column(tr(profile, "ledger_column_running"), style="green", justify="right")
+    if running and start == 0:
+        table.add_row("-", format_currency(running), tr(profile, "ledger_unitemized"), format_currency(running))
+    for transaction in transactions[start:]:
+        running += transaction["amount"]
+        table.add_row(
+            transaction["date"],
+            format_currency(transaction["amount"]),
+            transaction.get("note", ""),
+            format_currency(running),
+        )
+    console.print(table)
+
+
+def item_ledger(session: Session) -> None:
+    """Show a budget item's payments and record new ones; saved once when done."""
+    profile = session.profile
+    month_data = sync_current_month_references(profile)
+    if not month_data["budgeting_list"]:
+        console.print(f"[yellow]{tr(profile, 'no_budget_items_edit')}[/]")
+        return
+    list_budget_items(profile)
+    index = prompt_positive_int(tr(profile, "prompt_budget_index"), tr(profile, "error_positive_int"))
+    if index == 0 or index > len(month_data["budgeting_list"]):
+        console.print(f"[red]{tr(profile, 'invalid_number')}[/]")
+        return
+
+    key = current_month_key(profile)
+    added = 0
+    while True:
+        display_item_ledger(profile, month_data["budgeting_list"][index - 1])
+        line = input(tr(profile, "ledger_prompt")).strip()
+        if not line:
+            break
+        try:
+            append_transaction(session, key, index - 1, parse_transaction(line))
+        except ValueError:
+            console.print(f"[red]{tr(profile, 'ledger_invalid')}[/]")
+            continue
+        added += 1
+    if added:
+        persist_session(session)
+        console.print(f"[green]{tr(profile, 'ledger_saved', count=added)}[/]")
+
+
 def delete_item(session: Session) -> None:
     profile = session.profile
     month_data = sync_current_month_references(profile)
@@ -1137,19 +3493,20 @@ def delete_item(session: Session) -> None:
     choice = input(tr(profile, "delete_prompt_choice")).strip().lower()
 
     collections = {
-        "1": (month_data["income_sources"], "delete_income_option"),
-        "2": (month_data["saving_list"], "delete_saving_option"),
-        "3": (month_data["budgeting_list"], "delete_budget_option"),
-        "income_sources": (month_data["income_sources"], "delete_income_option"),
-        "savings": (month_data["saving_list"], "delete_saving_option"),
-        "budget": (month_data["budgeting_list"], "delete_budget_option"),
+        "1": ("income", "delete_income_option"),
+        "2": ("saving", "delete_saving_option"),
+        "3": ("budget", "delete_budget_option"),
+        "income_sources": ("income", "delete_income_option"),
+        "savings": ("saving", "delete_saving_option"),
+        "budget": ("budget", "delete_budget_option"),
     }
 
     if choice not in collections:
         console.print(f"[red]{tr(profile, 'invalid_choice')}[/]")
         return
 
-    collection, label_key = collections[choice]
+    list_name, label_key = collections[choice]
+    collection = month_data[LIST_FIELDS[list_name]]
     category_label = tr(profile, label_key)
     if not collection:
         console.print(f"[yellow]{tr(profile, 'delete_no_items', category=category_label.lower())}[/]")
@@ -1168,7 +3525,7 @@ def delete_item(session: Session) -> None:
         console.print(f"[red]{tr(profile, 'invalid_number')}[/]")
         return
 
-    removed = collection.pop(index - 1)
+    removed = remove_item(session, current_month_key(profile), list_name, index - 1)
     persist_session(session)
     removed_name = removed.get("name", tr(profile, "default_item_name"))
     console.print(f"[green]{tr(profile, 'delete_success', name=removed_name)}[/]")
@@ -1184,8 +3541,13 @@ def budgeting_menu(session: Session) -> None:
         console.print(f"4. {tr(profile, 'budgeting_menu_edit_budget')}")
         console.print(f"5. {tr(profile, 'budgeting_menu_delete_item')}")
         console.print(f"6. {tr(profile, 'budgeting_menu_copy_prev')}")
-        console.print(f"7. {tr(profile, 'budgeting_menu_paste')}")
-        console.print(f"8. {tr(profile, 'budgeting_menu_back')}")
+        console.print(f"7. {tr(profile, 'budgeting_menu_copy_range')}")
+        console.print(f"8. {tr(profile, 'budgeting_menu_recurring')}")
+        console.print(f"9. {tr(profile, 'budgeting_menu_paste')}")
+        console.print(f"10. {tr(profile, 'budgeting_menu_whatif')}")
+        console.print(f"11. {tr(profile, 'budgeting_menu_bulk_realization')}")
+        console.print(f"12. {tr(profile, 'budgeting_menu_ledger')}")
+        console.print(f"13. {tr(profile, 'budgeting_menu_back')}")
         choice = input(tr(profile, "prompt_choice")).strip()
 
         if choice == "1":
@@ -1201,73 +3563,435 @@ def budgeting_menu(session: Session) -> None:
         elif choice == "6":
             copy_previous_month(session)
         elif choice == "7":
-            paste_from_spreadsheet(session)
+            copy_month_range(session)
         elif choice == "8":
+            recurring_menu(session)
+        elif choice == "9":
+            paste_from_spreadsheet(session)
+        elif choice == "10":
+            plan_what_if(session)
+        elif choice == "11":
+            bulk_edit_realization(session)
+        elif choice == "12":
+            item_ledger(session)
+        elif choice == "13":
             break
         else:
             console.print(f"[red]{tr(profile, 'invalid_choice')}[/]")
 
 
-def adjust_copied_budget_allocations(session: Session, month_data: Dict[str, Any]) -> None:
-    profile = session.profile
-    console.print(f"\n[bold cyan]{tr(profile, 'adjust_budget_header')}[/]")
-    console.print(tr(profile, "adjust_skip_hint"))
+def copy_month_to_range(session: Session, source_key: str, target_keys: List[str]) -> None:
+    """Make every target month a copy of ``source_key`` in one step.
+
+    Targets get fresh lists that reference the source's item dicts (items are
+    only ever replaced, never edited in place), so nothing is duplicated in
+    memory, and untouched copies are stored as references.
+    """
+    year, month = parse_month_key(source_key)
+    source = get_month_data(session.profile, year, month)
+    # Payments belong to their month, so copies of paid items start without a
+    # ledger (and ledgers, which grow in place, are never shared).
+    unpaid = {
+        id(item): {name: value for name, value in item.items() if name != "transactions"}
+        for item in source["budgeting_list"]
+        if "transactions" in item
+    }
+    for target_key in target_keys:
+        # Recurring items are not copied; the target month gets its own.
+        target_year, target_month = parse_month_key(target_key)
+        get_month_data(session.profile, target_year, target_month).pop("skipped_templates", None)
+        replace_month_lists(
+            session,
+            target_key,
+            {
+                list_name: [unpaid.get(id(item), item) for item in source[field_name] if "template" not in item]
+                for list_name, field_name in LIST_FIELDS.items()
+            },
+        )
 
-    updated = 0
-    for item in month_data.get("budgeting_list", []):
-        name = item.get("name", tr(profile, "default_item_name"))
-        current_allocation = format_currency(int(item.get("allocation", 0)))
-        while True:
-            raw = input(tr(profile, "adjust_budget_prompt", name=name, allocation=current_allocation)).strip()
-            if not raw:
-                break
-            amount = parse_amount_value(raw)
-            if amount is None:
-                console.print(f"[red]{tr(profile, 'adjust_invalid_amount')}[/]")
-                continue
-            item["allocation"] = amount
-            updated += 1
-            break
 
-    if updated:
-        console.print(f"[green]{tr(profile, 'adjust_complete', count=updated)}[/]")
+def prompt_yes(message: str) -> bool:
+    return input(message).strip().lower() in {"y", "ya", "yes"}
 
 
-def copy_previous_month(session: Session) -> None:
-    profile = session.profile
-    current_year = profile.get("current_year", 2025)
-    current_month = normalize_month_value(profile.get("current_month", 5))
-    prev_year, prev_month = get_previous_month(current_year, current_month)
-    prev_label = format_month_label(profile, prev_year, prev_month)
+def prompt_month_key(profile: Dict[str, Any], message: str, default: Optional[str]) -> Optional[str]:
+    """Read a ``YYYY-MM`` month; Enter gives ``default``, bad input prints an error and gives ``None``."""
+    raw = input(message).strip()
+    if not raw:
+        return default
+    try:
+        return month_key(*parse_month_key(raw))
+    except ValueError:
+        console.print(f"[red]{tr(profile, 'invalid_month')}[/]")
+        return None
 
-    months = profile.setdefault("months", {})
-    prev_key = month_key(prev_year, prev_month)
-    if prev_key not in months:
-        console.print(f"[yellow]{tr(profile, 'copy_prev_missing', month_label=prev_label)}[/]")
+
+def copy_month_range(session: Session) -> None:
+    profile = session.profile
+    current_key = current_month_key(profile)
+    source_key = prompt_month_key(profile, tr(profile, "range_copy_source_prompt", month=current_key), current_key)
+    if source_key is None:
+        return
+    source_year, source_month = parse_month_key(source_key)
+    source_label = format_month_label(profile, source_year, source_month)
+    source = get_month_data(profile, source_year, source_month)
+    if not any(source[field_name] for field_name in LIST_FIELDS.values()):
+        console.print(f"[yellow]{tr(profile, 'copy_prev_missing', month_label=source_label)}[/]")
         return
 
-    prev_data = get_month_data(profile, prev_year, prev_month)
-    if not any(prev_data[field] for field in ("income_sources", "saving_list", "budgeting_list")):
-        console.print(f"[yellow]{tr(profile, 'copy_prev_missing', month_label=prev_label)}[/]")
+    count = prompt_positive_int(tr(profile, "range_copy_count_prompt"), tr(profile, "error_positive_int"))
+    if not 1 <= count <= 120:
+        console.print(f"[red]{tr(profile, 'invalid_number')}[/]")
+        return
+    targets: List[str] = []
+    year, month = source_year, source_month
+    for _ in range(count):
+        year, month = get_next_month(year, month)
+        targets.append(month_key(year, month))
+
+    filled = [
+        key
+        for key in targets
+        if any(get_month_data(profile, *parse_month_key(key))[field_name] for field_name in LIST_FIELDS.values())
+    ]
+    if filled and not prompt_yes(tr(profile, "range_copy_overwrite_prompt", count=len(filled))):
+        targets = [key for key in targets if key not in filled]
+    if not targets:
         return
 
-    confirmation = input(tr(profile, "copy_prev_confirm", month_label=prev_label)).strip().lower()
-    if confirmation not in {"y", "ya", "yes"}:
+    first_label = format_month_label(profile, *parse_month_key(targets[0]))
+    last_label = format_month_label(profile, *parse_month_key(targets[-1]))
+    if not prompt_yes(
+        tr(profile, "range_copy_confirm", month_label=source_label, count=len(targets), first=first_label, last=last_label)
+    ):
         return
+    copy_month_to_range(session, source_key, targets)
+    persist_session(session)
+    console.print(f"[green]{tr(profile, 'range_copy_success', month_label=source_label, count=len(targets))}[/]")
 
-    current_data = get_month_data(profile, current_year, current_month)
-    current_data["income_sources"] = deepcopy(prev_data["income_sources"])
-    current_data["saving_list"] = deepcopy(prev_data["saving_list"])
-    current_data["budgeting_list"] = deepcopy(prev_data["budgeting_list"])
 
-    sync_current_month_references(profile)
-    if current_data["budgeting_list"]:
-        adjust_choice = input(tr(profile, "copy_prev_adjust_prompt")).strip().lower()
-        if adjust_choice in {"y", "ya", "yes"}:
-            adjust_copied_budget_allocations(session, current_data)
+def display_recurring_templates(profile: Dict[str, Any]) -> None:
+    templates = profile.get("recurring", [])
+    if not templates:
+        console.print(f"[yellow]{tr(profile, 'recurring_empty')}[/]")
+        return
+    key = current_month_key(profile)
+    table = Table(title=tr(profile, "recurring_title"), header_style="bold white", expand=True)
+    table.add_column("#", justify="right", style="white")
+    table.add_column(tr(profile, "column_list"), style="white")
+    table.add_column(tr(profile, "column_name"), style="white")
+    table.add_column(tr(profile, "column_category"), style="white")
+    table.add_column(tr(profile, "column_amount"), style="green", justify="right")
+    table.add_column(tr(profile, "recurring_column_every"), justify="right", style="white")
+    table.add_column(tr(profile, "recurring_column_start"), style="white")
+    table.add_column(tr(profile, "recurring_column_end"), style="white")
+    for idx, template in enumerate(templates, 1):
+        table.add_row(
+            str(idx),
+            tr(profile, f"paste_target_{template['list']}"),
+            template["name"],
+            template.get("category", ""),
+            format_currency(recurring_amount(template, key)),
+            str(template.get("every", 1)),
+            template["start"],
+            template.get("end") or "-",
+        )
+    console.print(table)
 
-    persist_session(session)
-    console.print(f"[green]{tr(profile, 'copy_prev_success', month_label=prev_label)}[/]")
+
+def prompt_recurring_template(profile: Dict[str, Any]) -> Optional[int]:
+    templates = profile.get("recurring", [])
+    if not templates:
+        console.print(f"[yellow]{tr(profile, 'recurring_empty')}[/]")
+        return None
+    index = prompt_positive_int(tr(profile, "recurring_prompt_index"), tr(profile, "error_positive_int"))
+    if index == 0 or index > len(templates):
+        console.print(f"[red]{tr(profile, 'invalid_number')}[/]")
+        return None
+    return index - 1
+
+
+def add_recurring_template(session: Session) -> None:
+    profile = session.profile
+    lists = {"1": "income", "2": "saving", "3": "budget"}
+    list_name = lists.get(input(tr(profile, "recurring_list_prompt")).strip())
+    if list_name is None:
+        console.print(f"[red]{tr(profile, 'invalid_choice')}[/]")
+        return
+    name = prompt_item_name(session, tr(profile, "recurring_name_prompt")) or tr(profile, "default_name")
+    amount = prompt_positive_int(tr(profile, "prompt_amount"), tr(profile, "error_positive_int"))
+    template: Dict[str, Any] = {"id": secrets.token_hex(4), "list": list_name, "name": name}
+    if list_name == "budget":
+        template["category"] = prompt_item_category(session, tr(profile, "prompt_budget_category"))
+    every_text = input(tr(profile, "recurring_every_prompt")).strip()
+    if every_text and (not every_text.isdigit() or not 1 <= int(every_text) <= 12):
+        console.print(f"[red]{tr(profile, 'invalid_number')}[/]")
+        return
+    template["every"] = int(every_text or 1)
+    current_key = current_month_key(profile)
+    start = prompt_month_key(profile, tr(profile, "recurring_start_prompt", month=current_key), current_key)
+    if start is None:
+        return
+    template["start"] = start
+    end = prompt_month_key(profile, tr(profile, "recurring_end_prompt"), "")
+    if end is None:
+        return
+    if end:
+        if end < start:
+            console.print(f"[red]{tr(profile, 'recurring_end_before_start')}[/]")
+            return
+        template["end"] = end
+    template["amounts"] = [[start, amount]]
+    set_recurring_templates(session, profile.get("recurring", []) + [template])
+    persist_session(session)
+    console.print(f"[green]{tr(profile, 'recurring_added', name=name)}[/]")
+
+
+def change_recurring_amount(session: Session) -> None:
+    profile = session.profile
+    index = prompt_recurring_template(profile)
+    if index is None:
+        return
+    amount = prompt_positive_int(tr(profile, "prompt_amount"), tr(profile, "error_positive_int"))
+    current_key = current_month_key(profile)
+    since = prompt_month_key(profile, tr(profile, "recurring_since_prompt", month=current_key), current_key)
+    if since is None:
+        return
+    templates = list(profile["recurring"])
+    template = templates[index]
+    amounts = sorted([entry for entry in template.get("amounts", []) if entry[0] != since] + [[since, amount]])
+    templates[index] = {**template, "amounts": amounts}
+    set_recurring_templates(session, templates)
+    persist_session(session)
+    console.print(f"[green]{tr(profile, 'recurring_updated', name=template['name'])}[/]")
+
+
+def end_recurring_template(session: Session) -> None:
+    profile = session.profile
+    index = prompt_recurring_template(profile)
+    if index is None:
+        return
+    templates = list(profile["recurring"])
+    template = templates[index]
+    end = prompt_month_key(profile, tr(profile, "recurring_end_prompt"), "")
+    if end is None:
+        return
+    if end and end < template["start"]:
+        console.print(f"[red]{tr(profile, 'recurring_end_before_start')}[/]")
+        return
+    templates[index] = {name: value for name, value in template.items() if name != "end"}
+    if end:
+        templates[index]["end"] = end
+    set_recurring_templates(session, templates)
+    persist_session(session)
+    console.print(f"[green]{tr(profile, 'recurring_updated', name=template['name'])}[/]")
+
+
+def delete_recurring_template(session: Session) -> None:
+    profile = session.profile
+    index = prompt_recurring_template(profile)
+    if index is None:
+        return
+    templates = list(profile["recurring"])
+    removed = templates.pop(index)
+    if not prompt_yes(tr(profile, "recurring_delete_confirm", name=removed["name"])):
+        return
+    set_recurring_templates(session, templates)
+    persist_session(session)
+    console.print(f"[green]{tr(profile, 'delete_success', name=removed['name'])}[/]")
+
+
+def recurring_menu(session: Session) -> None:
+    profile = session.profile
+    actions = {
+        "1": add_recurring_template,
+        "2": change_recurring_amount,
+        "3": end_recurring_template,
+        "4": delete_recurring_template,
+    }
+    while True:
+        console.print()
+        display_recurring_templates(profile)
+        console.print(f"\n[bold cyan]{tr(profile, 'recurring_menu_title')}[/]")
+        console.print(f"1. {tr(profile, 'recurring_menu_add')}")
+        console.print(f"2. {tr(profile, 'recurring_menu_amount')}")
+        console.print(f"3. {tr(profile, 'recurring_menu_end')}")
+        console.print(f"4. {tr(profile, 'recurring_menu_delete')}")
+        console.print(f"5. {tr(profile, 'recurring_menu_back')}")
+        choice = input(tr(profile, "prompt_choice")).strip()
+        if choice in actions:
+            actions[choice](session)
+        elif choice == "5":
+            break
+        else:
+            console.print(f"[red]{tr(profile, 'invalid_choice')}[/]")
+
+
+def adjust_copied_budget_allocations(session: Session, month_data: Dict[str, Any]) -> None:
+    profile = session.profile
+    console.print(f"\n[bold cyan]{tr(profile, 'adjust_budget_header')}[/]")
+    console.print(tr(profile, "adjust_skip_hint"))
+
+    key = current_month_key(profile)
+    updated = 0
+    for index, item in enumerate(list(month_data.get("budgeting_list", []))):
+        name = item.get("name", tr(profile, "default_item_name"))
+        current_allocation = format_currency(int(item.get("allocation", 0)))
+        while True:
+            raw = input(tr(profile, "adjust_budget_prompt", name=name, allocation=current_allocation)).strip()
+            if not raw:
+                break
+            amount = parse_amount_value(raw)
+            if amount is None:
+                console.print(f"[red]{tr(profile, 'adjust_invalid_amount')}[/]")
+                continue
+            update_item(session, key, "budget", index, {"allocation": amount})
+            updated += 1
+            break
+
+    if updated:
+        console.print(f"[green]{tr(profile, 'adjust_complete', count=updated)}[/]")
+
+
+def whatif_rule_label(rule: WhatIfRule) -> str:
+    if rule.kind == "scale":
+        return f"{rule.target} %"
+    if rule.kind == "cap":
+        return f"cap {rule.target}"
+    return f"{rule.source} > {rule.target}"
+
+
+def whatif_value_label(rule: WhatIfRule, value: float) -> str:
+    if rule.kind == "scale":
+        return f"{value:+g}%"
+    return format_currency(int(value))
+
+
+def read_whatif_rules(profile: Dict[str, Any], items: List[Dict[str, Any]]) -> List[Tuple[WhatIfRule, List[int]]]:
+    rules: List[Tuple[WhatIfRule, List[int]]] = []
+    count = 1
+    while True:
+        line = input(tr(profile, "whatif_rule_prompt", count=count)).strip()
+        if not line:
+            return rules
+        try:
+            rule = parse_whatif_rule(line)
+        except ValueError:
+            console.print(f"[red]{tr(profile, 'whatif_invalid_rule')}[/]")
+            continue
+        columns = whatif_columns(items, rule)
+        if not columns:
+            console.print(f"[red]{tr(profile, 'whatif_unknown_target')}[/]")
+            continue
+        if count * len(rule.values) > WHATIF_MAX_SCENARIOS:
+            console.print(f"[red]{tr(profile, 'whatif_too_many', limit=WHATIF_MAX_SCENARIOS)}[/]")
+            continue
+        rules.append((rule, columns))
+        count *= len(rule.values)
+
+
+def plan_what_if(session: Session) -> None:
+    """Try combinations of allocation rules on a base month and apply the best one to the current month."""
+    profile = session.profile
+    current_key = current_month_key(profile)
+    previous_key = month_key(*get_previous_month(profile.get("current_year", 2025), profile.get("current_month", 5)))
+    default_key = previous_key if previous_key in profile.get("months", {}) else current_key
+    base_key = prompt_month_key(profile, tr(profile, "whatif_base_prompt", month=default_key), default_key)
+    if base_key is None:
+        return
+    current = sync_current_month_references(profile)
+    # Only read the base month: planning must not add it to the profile or materialize its templates.
+    base = peek_month_data(profile, base_key)
+    items = [item for item in base["budgeting_list"] if "template" not in item]
+    if not items:
+        console.print(f"[yellow]{tr(profile, 'whatif_no_items', month=base_key)}[/]")
+        return
+    fixed = sum(
+        max(int(item.get("allocation", 0)), int(item.get("realization", 0)))
+        for item in base["budgeting_list"]
+        if "template" in item
+    )
+    income = calculate_month_totals(current)["total_income"] or calculate_month_totals(base)["total_income"]
+
+    console.print(f"\n[bold cyan]{tr(profile, 'whatif_header')}[/]")
+    console.print(tr(profile, "whatif_help"))
+    rules = read_whatif_rules(profile, items)
+    if not rules:
+        return
+    scenarios = evaluate_whatif(items, income, fixed, rules)
+    baseline = evaluate_whatif(items, income, fixed, [])[0]
+
+    table = Table(
+        title=tr(profile, "whatif_results_title", count=len(scenarios)),
+        caption=tr(profile, "whatif_baseline", savings=format_currency(baseline["savings"])),
+        header_style="bold white",
+    )
+    table.add_column("#", justify="right")
+    for rule, _ in rules:
+        table.add_column(whatif_rule_label(rule), style="white", justify="right")
+    table.add_column(tr(profile, "whatif_column_spending"), style="cyan", justify="right")
+    table.add_column(tr(profile, "whatif_column_savings"), style="green", justify="right")
+    table.add_column(tr(profile, "whatif_column_unfunded"), style="red", justify="right")
+    for rank, scenario in enumerate(scenarios[:WHATIF_SHOWN], start=1):
+        table.add_row(
+            str(rank),
+            *(whatif_value_label(rule, value) for (rule, _), value in zip(rules, scenario["values"])),
+            format_currency(scenario["spending"]),
+            format_currency(scenario["savings"]),
+            format_currency(scenario["unfunded"]) if scenario["unfunded"] else "-",
+        )
+    console.print(table)
+
+    raw = input(tr(profile, "whatif_choose_prompt", count=min(WHATIF_SHOWN, len(scenarios)))).strip()
+    if not raw:
+        return
+    if not raw.isdigit() or not 1 <= int(raw) <= min(WHATIF_SHOWN, len(scenarios)):
+        console.print(f"[red]{tr(profile, 'invalid_choice')}[/]")
+        return
+    allocations = iter(scenarios[int(raw) - 1]["allocations"])
+    planned = {id(item): {**item, "allocation": next(allocations)} for item in items}
+    if base_key == current_key:
+        budget = [planned.get(id(item), item) for item in current["budgeting_list"]]
+    else:
+        if current["budgeting_list"] and not prompt_yes(tr(profile, "whatif_overwrite_prompt", month=current_key)):
+            return
+        budget = list(planned.values())
+    replace_month_lists(session, current_key, {"budget": budget})
+    persist_session(session)
+    console.print(f"[green]{tr(profile, 'whatif_applied', month=current_key)}[/]")
+
+
+def copy_previous_month(session: Session) -> None:
+    profile = session.profile
+    current_year = profile.get("current_year", 2025)
+    current_month = normalize_month_value(profile.get("current_month", 5))
+    prev_year, prev_month = get_previous_month(current_year, current_month)
+    prev_label = format_month_label(profile, prev_year, prev_month)
+
+    months = profile.setdefault("months", {})
+    prev_key = month_key(prev_year, prev_month)
+    if prev_key not in months:
+        console.print(f"[yellow]{tr(profile, 'copy_prev_missing', month_label=prev_label)}[/]")
+        return
+
+    prev_data = get_month_data(profile, prev_year, prev_month)
+    if not any(prev_data[field] for field in ("income_sources", "saving_list", "budgeting_list")):
+        console.print(f"[yellow]{tr(profile, 'copy_prev_missing', month_label=prev_label)}[/]")
+        return
+
+    confirmation = input(tr(profile, "copy_prev_confirm", month_label=prev_label)).strip().lower()
+    if confirmation not in {"y", "ya", "yes"}:
+        return
+
+    copy_month_to_range(session, prev_key, [month_key(current_year, current_month)])
+    current_data = sync_current_month_references(profile)
+    if current_data["budgeting_list"]:
+        adjust_choice = input(tr(profile, "copy_prev_adjust_prompt")).strip().lower()
+        if adjust_choice in {"y", "ya", "yes"}:
+            adjust_copied_budget_allocations(session, current_data)
+
+    persist_session(session)
+    console.print(f"[green]{tr(profile, 'copy_prev_success', month_label=prev_label)}[/]")
 
 
 def change_period(session: Session) -> None:
@@ -1311,10 +4035,9 @@ def change_period(session: Session) -> None:
         console.print(f"[red]{tr(profile, 'invalid_month')}[/]")
         return
 
-    profile["current_year"] = selected_year
-    profile["current_month"] = selected_month
-    sync_current_month_references(profile)
-    persist_session(session)
+    show_period(session, selected_year, selected_month)
+    if session.month_cache is not None:
+        session.month_cache.prefetch(profile, current_month_key(profile))
     console.print(f"[green]{tr(profile, 'period_updated')}[/]")
 
 
@@ -1326,15 +4049,15 @@ def change_language(session: Session) -> None:
         tr(
             profile,
             "language_current",
-            language=LANGUAGE_STRINGS[current_code]["language_name"],
+            language=language_name(current_code),
         )
     )
-    codes = list(LANGUAGE_STRINGS.keys())
+    codes = list(available_languages())
     for idx, code in enumerate(codes, 1):
-        console.print(f"{idx}. {LANGUAGE_STRINGS[code]['language_name']} [{code}]")
+        console.print(f"{idx}. {language_name(code)} \\[{code}]")
 
     selection = input(tr(profile, "language_menu_prompt")).strip().lower()
-    if selection in LANGUAGE_STRINGS:
+    if selection in codes:
         chosen_code = selection
     else:
         try:
@@ -1347,10 +4070,9 @@ def change_language(session: Session) -> None:
             return
 
     profile["language"] = chosen_code
-    session.data["default_language"] = chosen_code
-    persist_session(session)
+    persist_session(session, default_language=chosen_code)
     console.print(
-        f"[green]{tr(profile, 'language_changed', language=LANGUAGE_STRINGS[chosen_code]['language_name'])}[/]"
+        f"[green]{tr(profile, 'language_changed', language=language_name(chosen_code))}[/]"
     )
     display_dashboard(profile)
 
@@ -1367,51 +4089,135 @@ def add_or_update_salt(user: Dict[str, Any]) -> bytes:
     return salt
 
 
-def authenticate_user(data: Dict[str, Any]) -> Session:
+def create_user_entry(
+    email: str, password: str, params: Optional[Dict[str, Any]] = None, salt: Optional[bytes] = None
+) -> Tuple[Dict[str, Any], bytes]:
+    """A new user entry under ``params`` (default: the calibrated KDF) and its profile key."""
+    params = params or calibrate_kdf()
+    salt = salt or generate_salt()
+    key, verifier = split_master_key(run_kdf(password, salt, params))
+    user = {
+        "email": email,
+        "salt": base64.b64encode(salt).decode("utf-8"),
+        "kdf": dict(params),
+        "verifier": verifier,
+    }
+    return user, key
+
+
+def upgrade_user_kdf(
+    data: Dict[str, Any], email: str, user: Dict[str, Any], password: str, old_key: bytes
+) -> Optional[bytes]:
+    """Re-key a user to the calibrated KDF and re-encrypt the profile, index and history.
+
+    The new user entry and record are committed together. Returns the new key,
+    or None when the profile changed on disk meanwhile (the next login tries again).
+    """
+    fresh_user, new_key = create_user_entry(email, password)
+    record = data["profiles"].get(email)
+    new_record = reencrypt_profile_record(record, old_key, new_key)
+    upgraded = {name: value for name, value in user.items() if name not in KDF_USER_FIELDS}
+    upgraded.update(fresh_user)
+    try:
+        conflicts = commit_profile_records(
+            data, {email: new_record}, {email: record_revision(record)}, users={email: upgraded}
+        )
+    except DataFileError:
+        return None
+    return None if conflicts else new_key
+
+
+def unlock_with_kdf_upgrade(
+    data: Dict[str, Any], email: str, user: Dict[str, Any], password: str, key: bytes, profile: Dict[str, Any]
+) -> Tuple[bytes, Dict[str, Any]]:
+    """The key and profile to open a login's session with, upgrading a legacy KDF first.
+
+    When the upgrade loses a race, ``data`` already holds the other process's
+    user entry and record, so the key is derived again from that entry and the
+    profile decrypted again from that record; the old key is never paired with
+    the refreshed document. Raises like :func:`derive_user_key` and
+    :func:`decrypt_profile_payload`.
+    """
+    if not kdf_needs_upgrade(user):
+        return key, profile
+    new_key = upgrade_user_kdf(data, email, user, password, key)
+    if new_key is not None:
+        return new_key, profile
+    current = next((entry for entry in data["users"] if entry.get("email") == email), None)
+    if current is None:
+        raise InvalidCredentialsError("user no longer exists")
+    key = derive_user_key(password, current)
+    record = data["profiles"].get(email)
+    return key, decrypt_profile_payload(key, record) if isinstance(record, dict) else default_profile()
+
+
+def resolve_data_source(source: Union[Dict[str, Any], "Future[Dict[str, Any]]"]) -> Dict[str, Any]:
+    if isinstance(source, Future):
+        return source.result()
+    return source
+
+
+def peek_default_language(source: Union[Dict[str, Any], "Future[Dict[str, Any]]"]) -> str:
+    if isinstance(source, Future):
+        if not source.done() or source.exception() is not None:
+            return "id"
+        source = source.result()
+    return source.get("default_language", "id")
+
+
+def authenticate_user(
+    data_source: Union[Dict[str, Any], "Future[Dict[str, Any]]"],
+    timings: Optional[LoginTimings] = None,
+) -> Session:
     while True:
-        language_code = data.get("default_language", "id")
-        strings = LANGUAGE_STRINGS.get(language_code, LANGUAGE_STRINGS["id"])
-
-        console.print(f"\n[bold cyan]{strings['auth_title']}[/]")
-        email = input(strings["prompt_email"]).strip().lower()
+        language_code = peek_default_language(data_source)
+        strings = translator_for(language_code)
+
+        console.print(f"\n[bold cyan]{strings('auth_title')}[/]")
+        prompt_started = time.perf_counter()
+        email = input(strings("prompt_email")).strip().lower()
+        if timings is not None:
+            timings.record("user_input", prompt_started)
         if not email:
-            console.print(f"[red]{strings['email_required']}[/]")
+            console.print(f"[red]{strings('email_required')}[/]")
             continue
 
+        wait_started = time.perf_counter()
+        data = resolve_data_source(data_source)
+        if timings is not None:
+            timings.record("wait_for_data", wait_started)
         user = next((entry for entry in data["users"] if entry.get("email") == email), None)
 
         if user:
-            password = getpass(strings["prompt_password"])
-            if not verify_password(user.get("password_hash", ""), password):
-                console.print(f"[red]{strings['invalid_credentials']}[/]")
-                continue
-            salt = add_or_update_salt(user)
-            key = derive_key(password, salt)
-            payload = data["profiles"].get(email)
+            prompt_started = time.perf_counter()
+            password = getpass(strings("prompt_password"))
+            if timings is not None:
+                timings.record("user_input", prompt_started)
             try:
-                profile = decrypt_profile_payload(key, payload) if isinstance(payload, dict) else default_profile()
+                key, profile = unlock_profile_pipelined(password, user, data["profiles"].get(email), timings)
+                key, profile = unlock_with_kdf_upgrade(data, email, user, password, key, profile)
+            except InvalidCredentialsError:
+                console.print(f"[red]{strings('invalid_credentials')}[/]")
+                continue
             except ValueError:
                 console.print("[red]Gagal membuka data terenkripsi. Coba ulangi atau hubungi admin.[/]")
                 continue
-            ensure_profile_defaults(profile)
-            session = Session(data=data, email=email, profile=profile, key=key)
+            session = start_session(data, email, profile, key, record_revision(data["profiles"].get(email)))
             persist_session(session)
-            console.print(f"[green]{strings['login_success'].format(email=email)}[/]")
+            console.print(f"[green]{strings('login_success', email=email)}[/]")
             return session
 
-        console.print(f"[yellow]{strings['user_not_found_signup']}[/]")
+        console.print(f"[yellow]{strings('user_not_found_signup')}[/]")
         while True:
-            password = getpass(strings["prompt_password"])
-            confirm = getpass(strings["prompt_password_confirm"])
+            password = getpass(strings("prompt_password"))
+            confirm = getpass(strings("prompt_password_confirm"))
             if password != confirm:
-                console.print(f"[red]{strings['password_mismatch']}[/]")
+                console.print(f"[red]{strings('password_mismatch')}[/]")
                 continue
             break
 
-        salt = generate_salt()
-        key = derive_key(password, salt)
-        salt_b64 = base64.b64encode(salt).decode("utf-8")
-        data["users"].append({"email": email, "password_hash": hash_password(password), "salt": salt_b64})
+        user, key = create_user_entry(email, password)
+        data["users"].append(user)
 
         pending_profile = data.get("pending_profile")
         if isinstance(pending_profile, dict):
@@ -1420,32 +4226,467 @@ def authenticate_user(data: Dict[str, Any]) -> Session:
         else:
             profile = default_profile()
         ensure_profile_defaults(profile)
-        session = Session(data=data, email=email, profile=profile, key=key)
+        session = start_session(data, email, profile, key)
         persist_session(session)
-        console.print(f"[green]{strings['signup_success'].format(email=email)}[/]")
+        console.print(f"[green]{strings('signup_success', email=email)}[/]")
         return session
 
 
+def display_search_results(
+    profile: Dict[str, Any], query: str, results: List[Tuple[str, str, int, Dict[str, Any]]]
+) -> None:
+    if not results:
+        console.print(f"[yellow]{tr(profile, 'search_no_results', query=query)}[/]")
+        return
+    table = Table(title=tr(profile, "search_results_title", query=query), header_style="bold white", expand=True)
+    table.add_column(tr(profile, "column_period"), style="white")
+    table.add_column(tr(profile, "column_list"), style="white")
+    table.add_column(tr(profile, "column_name"), style="white")
+    table.add_column(tr(profile, "column_category"), style="white")
+    table.add_column(tr(profile, "column_amount"), style="green", justify="right")
+    table.add_column(tr(profile, "column_realization"), style="cyan", justify="right")
+    for month_text, list_name, _, summary in results:
+        year, month = parse_month_key(month_text)
+        is_budget = list_name == "budget"
+        table.add_row(
+            format_month_label(profile, year, month),
+            tr(profile, f"paste_target_{list_name}"),
+            summary.get("name", tr(profile, "default_item_name")),
+            summary.get("category", ""),
+            format_currency(int(summary.get("allocation" if is_budget else "amount", 0))),
+            format_currency(int(summary.get("realization", 0))) if is_budget else "-",
+        )
+    console.print(table)
+
+
+def search_items(session: Session) -> None:
+    profile = session.profile
+    query = input(tr(profile, "search_prompt")).strip()
+    if not query:
+        return
+    if session.search_index is None:
+        session.search_index = SearchIndex.build(profile)
+    display_search_results(profile, query, session.search_index.search(query))
+
+
+def unlock_command_user(data: Dict[str, Any], email: str) -> Tuple[bytes, Dict[str, Any]]:
+    """Prompt for the password of ``email`` for a one-shot command; exit on failure.
+
+    Returns the profile key and a minimal profile for ``tr`` in the default language.
+    """
+    viewer = {"language": data.get("default_language", "id")}
+    user = next((entry for entry in data["users"] if entry.get("email") == email), None)
+    password = getpass(tr(viewer, "prompt_password"))
+    try:
+        if user is None:
+            raise InvalidCredentialsError(email)
+        return derive_user_key(password, user), viewer
+    except InvalidCredentialsError:
+        console.print(f"[red]{tr(viewer, 'invalid_credentials')}[/]")
+        sys.exit(1)
+
+
+def run_search_command(email: str, query: str) -> None:
+    """Answer a search from the stored encrypted index, opening the profile only if it is stale."""
+    data = read_data_file()
+    email = email.strip().lower()
+    key, viewer = unlock_command_user(data, email)
+    record = data["profiles"].get(email)
+    index = None
+    if isinstance(record, dict) and isinstance(record.get("index"), dict):
+        payload = decrypt_payload(key, record["index"])
+        if payload.get("revision") == record_revision(record):
+            index = SearchIndex.from_payload(payload)
+    if index is None:
+        profile = decrypt_profile_payload(key, record) if isinstance(record, dict) else default_profile()
+        viewer["language"] = get_language(profile)
+        index = SearchIndex.build(profile)
+    display_search_results(viewer, query, index.search(query))
+
+
+def history_item_label(list_name: str, item: Optional[Dict[str, Any]]) -> str:
+    if item is None:
+        return "-"
+    if list_name == "budget":
+        return f"{format_currency(int(item.get('allocation', 0)))} / {format_currency(int(item.get('realization', 0)))}"
+    return format_currency(int(item.get("amount", 0)))
+
+
+def month_item_changes(
+    old_month: Dict[str, Any], new_month: Dict[str, Any]
+) -> Iterator[Tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """Yield ``(list, name, before, after)`` for every item that differs, matching items by name."""
+    for list_name, field_name in LIST_FIELDS.items():
+        unmatched: Dict[str, List[Dict[str, Any]]] = {}
+        for item in old_month.get(field_name, []):
+            unmatched.setdefault(item.get("name", ""), []).append(item)
+        for item in new_month.get(field_name, []):
+            candidates = unmatched.get(item.get("name", ""))
+            before = candidates.pop(0) if candidates else None
+            if before != item:
+                yield list_name, item.get("name", ""), before, item
+        for name, items in unmatched.items():
+            for item in items:
+                yield list_name, name, item, None
+
+
+def restore_history_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    profile = decode_profile_from_storage(json.loads(json.dumps(document)))
+    ensure_profile_defaults(profile)
+    return profile
+
+
+def display_history_versions(viewer: Dict[str, Any], versions: List[Tuple[Dict[str, Any], List[str], int]]) -> None:
+    table = Table(title=tr(viewer, "history_versions_title"), header_style="bold white", expand=True)
+    table.add_column(tr(viewer, "history_column_revision"), justify="right", style="white")
+    table.add_column(tr(viewer, "history_column_saved"), style="white")
+    table.add_column(tr(viewer, "history_column_kind"), style="white")
+    table.add_column(tr(viewer, "history_column_months"), style="white")
+    table.add_column(tr(viewer, "history_column_size"), justify="right", style="white")
+    for entry, months, size in versions:
+        table.add_row(
+            str(entry["revision"]),
+            entry.get("saved_at", ""),
+            tr(viewer, f"history_kind_{entry['kind']}"),
+            ", ".join(months) or "-",
+            f"{size:,}",
+        )
+    console.print(table)
+
+
+def display_history_diff(
+    viewer: Dict[str, Any], old: Dict[str, Any], new: Dict[str, Any], title: str, month: Optional[str]
+) -> None:
+    table = Table(title=title, header_style="bold white", expand=True)
+    table.add_column(tr(viewer, "column_period"), style="white")
+    table.add_column(tr(viewer, "column_list"), style="white")
+    table.add_column(tr(viewer, "column_name"), style="white")
+    table.add_column(tr(viewer, "history_column_before"), style="red", justify="right")
+    table.add_column(tr(viewer, "history_column_after"), style="green", justify="right")
+    keys = sorted(set(old["months"]) | set(new["months"]))
+    rows = 0
+    for key in keys:
+        if month and key != month:
+            continue
+        try:
+            year, month_number = parse_month_key(key)
+        except ValueError:
+            continue
+        old_month = old["months"].get(key, {})
+        new_month = new["months"].get(key, {})
+        for list_name, name, before, after in month_item_changes(old_month, new_month):
+            table.add_row(
+                format_month_label(viewer, year, month_number),
+                tr(viewer, f"paste_target_{list_name}"),
+                name,
+                history_item_label(list_name, before),
+                history_item_label(list_name, after),
+            )
+            rows += 1
+    if rows:
+        console.print(table)
+    else:
+        console.print(f"[yellow]{tr(viewer, 'history_no_differences')}[/]")
+
+
+def run_history_command(args: argparse.Namespace) -> None:
+    """List, compare or restore saved versions of one profile, or set its retention policy."""
+    data = read_data_file()
+    email = args.email.strip().lower()
+    key, viewer = unlock_command_user(data, email)
+    record = data["profiles"].get(email)
+    entries = record.get("history", []) if isinstance(record, dict) else []
+    profile = decrypt_profile_payload(key, record) if isinstance(record, dict) else default_profile()
+    viewer["language"] = get_language(profile)
+
+    if args.history_action == "retention":
+        retention = dict(profile.get("history_retention", {}))
+        if args.versions is not None:
+            retention["versions"] = max(1, args.versions)
+        if args.size_factor is not None:
+            retention["size_factor"] = max(0.0, args.size_factor)
+        if retention != profile.get("history_retention", {}):
+            session = start_session(data, email, profile, key, record_revision(record))
+            session.profile["history_retention"] = retention
+            persist_session(session)
+        console.print(
+            tr(
+                viewer,
+                "history_retention_status",
+                versions=retention.get("versions", HISTORY_KEEP_VERSIONS),
+                size_factor=retention.get("size_factor", HISTORY_SIZE_FACTOR),
+            )
+        )
+        return
+
+    versions: Dict[int, Dict[str, Any]] = {}
+    listing: List[Tuple[Dict[str, Any], List[str], int]] = []
+    previous: Optional[Dict[str, Any]] = None
+    for sealed, entry, document in iter_history_versions(key, entries):
+        versions[entry["revision"]] = document
+        changed: List[str] = []
+        if previous is not None:
+            delta = profile_delta(previous, document)
+            changed = sorted(path[len("months/") :] for path in [*delta["set"], *delta["del"]] if path.startswith("months/"))
+        listing.append((entry, changed, len(sealed["ciphertext"])))
+        previous = document
+    if args.history_action == "list":
+        if not listing:
+            console.print(f"[yellow]{tr(viewer, 'history_empty')}[/]")
+            return
+        display_history_versions(viewer, listing)
+        total = sum(size for _, _, size in listing)
+        console.print(tr(viewer, "history_size_summary", total=f"{total:,}", current=f"{len(record['ciphertext']):,}"))
+        return
+
+    wanted = [args.revision] if args.history_action == "restore" else [args.old, args.new]
+    for revision in wanted:
+        if revision is not None and revision not in versions:
+            console.print(f"[red]{tr(viewer, 'history_unknown_version', revision=revision)}[/]")
+            sys.exit(1)
+
+    if args.history_action == "diff":
+        old = restore_history_document(versions[args.old])
+        new = restore_history_document(versions[args.new]) if args.new is not None else profile
+        title = tr(viewer, "history_diff_title", old=args.old, new=args.new if args.new is not None else "-")
+        display_history_diff(viewer, old, new, title, args.month)
+        return
+
+    try:
+        target = month_key(*parse_month_key(args.month))
+    except ValueError:
+        console.print(f"[red]{tr(viewer, 'invalid_month')}[/]")
+        sys.exit(1)
+    past = restore_history_document(versions[args.revision])
+    past_month = get_month_data(past, *parse_month_key(target))
+    session = start_session(data, email, profile, key, record_revision(record))
+    replace_month_lists(
+        session, target, {list_name: list(past_month[field_name]) for list_name, field_name in LIST_FIELDS.items()}
+    )
+    persist_session(session)
+    year, month = parse_month_key(target)
+    console.print(
+        f"[green]{tr(viewer, 'history_restored', month_label=format_month_label(viewer, year, month), revision=args.revision)}[/]"
+    )
+
+
+def month_contributions(list_name: Optional[str], item: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """What one item adds to the month totals (savings are derived from the others)."""
+    if item is None:
+        return {}
+    if list_name == "income":
+        return {"total_income": int(item.get("amount", 0))}
+    if list_name == "budget":
+        return {
+            "total_budgeted_expenses": int(item.get("allocation", 0)),
+            "total_spending": int(item.get("realization", 0)),
+        }
+    return {}
+
+
+class LiveDashboard:
+    """Rich renderables of one month's dashboard, rebuilt piecewise from change notifications.
+
+    Stat panels are rebuilt only when their total moves, and expense rows only
+    for the items an insert, update or remove touched. Replacing a month's lists
+    or its recurring templates rebuilds everything.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.status: Any = ""
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        self.key = current_month_key(self.session.profile)
+        self.view = dashboard_view(self.session.profile, self.session.month_cache)
+        self.header = rich_dashboard_header(self.view)
+        self.panels = {stat: rich_stat_panel(self.view, stat) for stat in DASHBOARD_STATS}
+        budget = sync_current_month_references(self.session.profile)["budgeting_list"]
+        self.rows = [self.row(item) for item in budget]
+
+    def row(self, item: Dict[str, Any]) -> Tuple[str, Tuple[Any, ...]]:
+        expense = expense_row(item)
+        return expense["name"], rich_expense_cells(expense)
+
+    def on_change(self, session: Session, change: ProfileChange) -> None:
+        if change.kind in ("replace", "templates"):
+            if change.kind == "templates" or change.month == self.key:
+                self.rebuild()
+            return
+        if change.month != self.key:
+            return
+        if change.list_name == "budget":
+            if change.kind == "insert":
+                self.rows.insert(change.index, self.row(change.after))
+            elif change.kind == "remove":
+                self.rows.pop(change.index)
+            else:
+                self.rows[change.index] = self.row(change.after)
+        totals = self.view["totals"]
+        before = dict(totals)
+        for stat, amount in month_contributions(change.list_name, change.before).items():
+            totals[stat] -= amount
+        for stat, amount in month_contributions(change.list_name, change.after).items():
+            totals[stat] += amount
+        totals["savings"] = totals["total_income"] - totals["total_spending"]
+        for stat in DASHBOARD_STATS:
+            if totals[stat] != before[stat]:
+                self.panels[stat] = rich_stat_panel(self.view, stat)
+
+    def renderable(self) -> Any:
+        stats = Table.grid(expand=True)
+        for _ in DASHBOARD_STATS:
+            stats.add_column()
+        stats.add_row(*(self.panels[stat] for stat in DASHBOARD_STATS))
+        expenses = Table(title=self.view["expenses_title"], header_style="bold white", expand=True)
+        expenses.add_column("#", style="dim", justify="right")
+        name, allocation, realization, progress, usage = self.view["columns"]
+        expenses.add_column(name, style="white")
+        expenses.add_column(allocation, style="green", justify="right")
+        expenses.add_column(realization, style="cyan", justify="right")
+        expenses.add_column(progress, style="white")
+        expenses.add_column(usage, style="yellow", justify="right")
+        if not self.rows:
+            expenses.add_row("", self.view["no_expenses"], "-", "-", "-", "-")
+        for position in sorted(range(len(self.rows)), key=lambda index: self.rows[index][0]):
+            expenses.add_row(str(position + 1), *self.rows[position][1])
+        help_text = Text(tr(self.session.profile, "live_help"), style="dim")
+        return Group(*self.header, stats, expenses, help_text, self.status)
+
+
+def run_live_command(session: Session, command: str) -> Tuple[bool, str]:
+    """Apply one side-prompt command to the current month; return ``(changed, error message)``."""
+    profile = session.profile
+    key = current_month_key(profile)
+    budget = sync_current_month_references(profile)["budgeting_list"]
+    action, _, rest = command.strip().partition(" ")
+    rest = rest.strip()
+    if action in ("u", "y"):
+        source, target = ("undo", "redo") if action == "u" else ("redo", "undo")
+        if step_history(session, source, target) is None:
+            return False, tr(profile, f"history_{source}_empty")
+        return True, ""
+    if action == "+":
+        name, _, amount_text = rest.rpartition(" ")
+        amount = parse_amount_value(amount_text)
+        if not name.strip() or amount is None:
+            return False, tr(profile, "live_invalid_command")
+        insert_item(session, key, "budget", {"name": name.strip(), "allocation": amount, "realization": 0, "category": ""})
+        return True, ""
+    if action not in ("r", "a", "p", "-"):
+        return False, tr(profile, "live_invalid_command")
+    number_text, _, amount_text = rest.partition(" ")
+    if not number_text.isdigit() or not 1 <= int(number_text) <= len(budget):
+        return False, tr(profile, "invalid_number")
+    index = int(number_text) - 1
+    if action == "-":
+        remove_item(session, key, "budget", index)
+        return True, ""
+    if action == "p":
+        try:
+            append_transaction(session, key, index, parse_transaction(amount_text))
+        except ValueError:
+            return False, tr(profile, "ledger_invalid")
+        return True, ""
+    amount_text = amount_text.strip()
+    if action == "r" and amount_text.endswith("%") and amount_text[:-1].strip().isdigit():
+        amount = round(int(budget[index].get("allocation", 0)) * int(amount_text[:-1]) / 100)
+    else:
+        amount = parse_amount_value(amount_text)
+    if amount is None:
+        return False, tr(profile, "adjust_invalid_amount")
+    update_item(session, key, "budget", index, {"realization" if action == "r" else "allocation": amount})
+    return True, ""
+
+
+def live_dashboard(session: Session) -> None:
+    """Keep the dashboard on screen while edits are typed at a prompt below it."""
+    profile = session.profile
+    dashboard = LiveDashboard(session)
+    session.listeners.append(dashboard.on_change)
+    console.clear()
+    live = Live(
+        dashboard.renderable(),
+        console=console.resolve(),
+        auto_refresh=False,
+        redirect_stdout=False,
+        redirect_stderr=False,
+    )
+    try:
+        with live:
+            while True:
+                command = input(tr(profile, "live_prompt"))
+                if console.is_terminal:
+                    # Drop the echoed prompt line so the next refresh redraws in place.
+                    console.file.write("\x1b[1A\x1b[2K")
+                if command.strip().lower() == "q":
+                    break
+                if not command.strip():
+                    live.refresh()
+                    continue
+                changed, error = run_live_command(session, command)
+                dashboard.status = Text(error, style="red") if error else ""
+                if changed:
+                    try:
+                        commit_session(session)
+                    except ProfileConflictError:
+                        reload_session_profile(session)
+                        dashboard.rebuild()
+                        dashboard.status = Text(tr(profile, "profile_conflict_reloaded"), style="yellow")
+                    except DataFileError:
+                        dashboard.status = Text(tr(profile, "data_file_unreadable"), style="red")
+                live.update(dashboard.renderable(), refresh=True)
+    finally:
+        session.listeners.remove(dashboard.on_change)
+
+
+def undo_redo(session: Session, source: str, target: str) -> None:
+    profile = session.profile
+    step = step_history(session, source, target)
+    if step is None:
+        console.print(f"[yellow]{tr(profile, f'history_{source}_empty')}[/]")
+        return
+    persist_session(session)
+    months = sorted({op["month"] for op in step if op["month"]})
+    labels = [format_month_label(profile, *parse_month_key(key)) for key in months]
+    console.print(
+        f"[green]{tr(profile, f'history_{source}_done', count=len(step), months=', '.join(labels) or '-')}[/]"
+    )
+
+
 def main_menu(session: Session) -> None:
     profile = session.profile
     while True:
         console.print(f"\n[bold cyan]{tr(profile, 'main_menu_title')}[/]")
         console.print(f"1. {tr(profile, 'main_menu_dashboard')}")
-        console.print(f"2. {tr(profile, 'main_menu_budget')}")
-        console.print(f"3. {tr(profile, 'main_menu_period')}")
-        console.print(f"4. {tr(profile, 'main_menu_language')}")
-        console.print(f"5. {tr(profile, 'main_menu_exit')}")
+        console.print(f"2. {tr(profile, 'main_menu_live')}")
+        console.print(f"3. {tr(profile, 'main_menu_budget')}")
+        console.print(f"4. {tr(profile, 'main_menu_period')}")
+        console.print(f"5. {tr(profile, 'main_menu_search')}")
+        console.print(f"6. {tr(profile, 'main_menu_undo')}")
+        console.print(f"7. {tr(profile, 'main_menu_redo')}")
+        console.print(f"8. {tr(profile, 'main_menu_language')}")
+        console.print(f"9. {tr(profile, 'main_menu_exit')}")
         choice = input(tr(profile, "prompt_choice")).strip()
 
         if choice == "1":
-            display_dashboard(profile)
+            browse_dashboard(session)
         elif choice == "2":
-            budgeting_menu(session)
+            live_dashboard(session)
         elif choice == "3":
-            change_period(session)
+            budgeting_menu(session)
         elif choice == "4":
-            change_language(session)
+            change_period(session)
         elif choice == "5":
+            search_items(session)
+        elif choice == "6":
+            undo_redo(session, "undo", "redo")
+        elif choice == "7":
+            undo_redo(session, "redo", "undo")
+        elif choice == "8":
+            change_language(session)
+        elif choice == "9":
             persist_session(session)
             console.print(f"[green]{tr(profile, 'thank_you')}[/]")
             break
@@ -1453,10 +4694,2072 @@ def main_menu(session: Session) -> None:
             console.print(f"[red]{tr(profile, 'invalid_choice')}[/]")
 
 
-def main() -> None:
+class ServiceError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class ServiceState:
+    """In-memory state shared by every request handled in ``serve`` mode.
+
+    The parsed data document is loaded once, each logged-in user's profile
+    stays decrypted in a single ``Session`` no matter how many tokens point at
+    it, mutations are serialized per user, and dirty profiles are re-encrypted
+    and written to disk in batches by a background flusher.
+
+    Every acknowledged edit is kept until it is on disk. When another process
+    saved the same profile first, the flusher replays the unsaved edits on top
+    of that version; if they no longer apply, the profile stays dirty in memory
+    and the user's requests are answered with 409 instead of dropping them.
+    """
+
+    def __init__(self, flush_interval: float = 2.0) -> None:
+        self.data = load_data()
+        self.flush_interval = flush_interval
+        self.sessions: Dict[str, Session] = {}
+        self.tokens: Dict[str, str] = {}
+        self.dirty: Set[str] = set()
+        self.unsaved: Dict[str, List[Callable[[Session], Any]]] = {}
+        self.conflicted: Set[str] = set()
+        self.user_locks: Dict[str, threading.Lock] = {}
+        self.registry_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_loop, name="tagihan-flusher", daemon=True)
+
+    def start(self) -> None:
+        self.flusher.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.flusher.is_alive():
+            self.flusher.join()
+        self.flush()
+
+    def user_lock(self, email: str) -> threading.Lock:
+        with self.registry_lock:
+            return self.user_locks.setdefault(email, threading.Lock())
+
+    def login(self, email: str, password: str) -> str:
+        email = email.strip().lower()
+        # flush() takes flush_lock before a user's lock; login never holds a
+        # user's lock, so the two cannot wait on each other.
+        with self.flush_lock:
+            user = next((entry for entry in self.data["users"] if entry.get("email") == email), None)
+            if user is None:
+                raise ServiceError(401, "Email or password is incorrect.")
+            add_or_update_salt(user)
+            user = dict(user)
+        try:
+            key = derive_user_key(password, user)
+        except InvalidCredentialsError as error:
+            raise ServiceError(401, "Email or password is incorrect.") from error
+        with self.flush_lock:
+            if email not in self.sessions:
+                current = next((entry for entry in self.data["users"] if entry.get("email") == email), None)
+                try:
+                    if current is None:
+                        raise InvalidCredentialsError("user no longer exists")
+                    if current != user:
+                        # A flush refreshed the document with another process's re-keyed entry.
+                        user = dict(current)
+                        key = derive_user_key(password, user)
+                    payload = self.data["profiles"].get(email)
+                    profile = decrypt_profile_payload(key, payload) if isinstance(payload, dict) else default_profile()
+                    key, profile = unlock_with_kdf_upgrade(self.data, email, user, password, key, profile)
+                except InvalidCredentialsError as error:
+                    raise ServiceError(401, "Email or password is incorrect.") from error
+                except ValueError as error:
+                    raise ServiceError(500, "Encrypted profile could not be opened.") from error
+                payload = self.data["profiles"].get(email)
+                self.sessions[email] = start_session(self.data, email, profile, key, record_revision(payload))
+        token = secrets.token_urlsafe(24)
+        with self.registry_lock:
+            self.tokens[token] = email
+        return token
+
+    def logout(self, token: str) -> None:
+        with self.registry_lock:
+            self.tokens.pop(token, None)
+
+    def session_for(self, token: Optional[str]) -> Session:
+        with self.registry_lock:
+            email = self.tokens.get(token or "")
+        if email is None:
+            raise ServiceError(401, "Missing or unknown session token.")
+        if email in self.conflicted:
+            raise ServiceError(
+                409, "Profile changed on disk and the unsaved edits could not be merged; they are kept in memory."
+            )
+        return self.sessions[email]
+
+    def read(self, token: Optional[str], action: Callable[[Session], Any]) -> Any:
+        session = self.session_for(token)
+        with self.user_lock(session.email):
+            return action(session)
+
+    def write(self, token: Optional[str], action: Callable[[Session], Any]) -> Any:
+        session = self.session_for(token)
+        with self.user_lock(session.email):
+            result = action(session)
+            self.unsaved.setdefault(session.email, []).append(action)
+        with self.registry_lock:
+            self.dirty.add(session.email)
+        return result
+
+    def flush(self) -> int:
+        with self.flush_lock:
+            with self.registry_lock:
+                # Profiles whose edits could not be merged stay dirty but are not retried.
+                dirty = self.dirty - self.conflicted
+                self.dirty -= dirty
+            if not dirty:
+                return 0
+            records: Dict[str, Dict[str, Any]] = {}
+            expected: Dict[str, int] = {}
+            sealed: Dict[str, int] = {}
+            for email in dirty:
+                session = self.sessions[email]
+                with self.user_lock(email):
+                    records[email] = seal_profile_record(session, session.revision + 1)
+                    expected[email] = session.revision
+                    sealed[email] = len(self.unsaved.get(email, []))
+            try:
+                conflicts = commit_profile_records(self.data, records, expected)
+            except DataFileError as error:
+                error_console.print(f"[red]{error}; keeping {len(dirty)} profile(s) dirty.[/]")
+                with self.registry_lock:
+                    self.dirty |= dirty
+                return 0
+            for email in dirty:
+                session = self.sessions[email]
+                with self.user_lock(email):
+                    if email not in conflicts:
+                        session.revision = expected[email] + 1
+                        del self.unsaved.get(email, [])[: sealed[email]]
+                    elif self.replay_unsaved(session):
+                        error_console.print(
+                            f"[yellow]Profile {email} changed on disk; re-applied "
+                            f"{len(self.unsaved[email])} unsaved edit(s) to the latest version.[/]"
+                        )
+                    else:
+                        error_console.print(
+                            f"[red]Profile {email} changed on disk and its unsaved edits no longer apply; "
+                            "kept them in memory and refusing further requests for this user.[/]"
+                        )
+                        with self.registry_lock:
+                            self.conflicted.add(email)
+                    if email in conflicts:
+                        with self.registry_lock:
+                            self.dirty.add(email)
+            return len(dirty) - len(conflicts)
+
+    def replay_unsaved(self, session: Session) -> bool:
+        """Re-apply the user's unsaved edits on top of the latest saved profile.
+
+        The edits are tried on a scratch copy first, so the live profile is only
+        replaced when all of them still apply. Returns False when one does not.
+        """
+        edits = self.unsaved.get(session.email, [])
+        record = self.data["profiles"].get(session.email)
+        try:
+            profile = decrypt_profile_payload(session.key, record) if isinstance(record, dict) else default_profile()
+            scratch = Session(self.data, session.email, profile, session.key, record_revision(record))
+            for edit in edits:
+                edit(scratch)
+        except (IndexError, ValueError):
+            return False
+        reload_session_profile(session)
+        for edit in edits:
+            edit(session)
+        return True
+
+    def _flush_loop(self) -> None:
+        while not self.stopped.wait(self.flush_interval):
+            self.flush()
+
+
+SERVICE_MONTH_ROUTE = re.compile(
+    r"^/months/(\d{4}-\d{2})(?:/(totals|income|saving|budget)(?:/(\d+)(/transactions)?)?)?$"
+)
+
+
+def snapshot_month(session: Session, key: str) -> Dict[str, Any]:
+    year, month = parse_month_key(key)
+    month_data = get_month_data(session.profile, year, month)
+    snapshot: Dict[str, Any] = {"month": key}
+    for list_name, field_name in LIST_FIELDS.items():
+        # Ledgers can be long; they are served by the item's /transactions route.
+        snapshot[list_name] = [
+            {name: value for name, value in item.items() if name != "transactions"} for item in month_data[field_name]
+        ]
+    return snapshot
+
+
+def item_transactions(session: Session, key: str, index: int) -> Dict[str, Any]:
+    items = get_item_list(session, key, "budget")
+    if not 0 <= index < len(items):
+        raise IndexError(index)
+    item = items[index]
+    return {"realization": int(item.get("realization", 0)), "transactions": list(item.get("transactions", []))}
+
+
+def month_totals(session: Session, key: str) -> Dict[str, int]:
+    year, month = parse_month_key(key)
+    return calculate_month_totals(get_month_data(session.profile, year, month))
+
+
+def patch_item(session: Session, key: str, list_name: str, index: int, changes: Dict[str, Any]) -> Dict[str, Any]:
+    items = get_item_list(session, key, list_name)
+    if not 0 <= index < len(items):
+        raise IndexError(index)
+    build_item(list_name, {**items[index], **changes})
+    allowed = {"name", "category", "allocation", "realization"} if list_name == "budget" else {"name", "amount"}
+    return dict(update_item(session, key, list_name, index, {k: v for k, v in changes.items() if k in allowed}))
+
+
+def handle_service_request(
+    state: ServiceState, method: str, path: str, body: Dict[str, Any], token: Optional[str]
+) -> Tuple[int, Any]:
+    if path == "/login" and method == "POST":
+        token = state.login(str(body.get("email", "")), str(body.get("password", "")))
+        return 200, {"token": token}
+    if path == "/logout" and method == "POST":
+        state.logout(token or "")
+        return 200, {"ok": True}
+
+    match = SERVICE_MONTH_ROUTE.match(path)
+    if match is None:
+        raise ServiceError(404, f"No route for {path}")
+    key, resource, index_text, transactions = match.groups()
+    parse_month_key(key)
+
+    if resource is None and method == "GET":
+        return 200, state.read(token, lambda session: snapshot_month(session, key))
+    if resource == "totals" and method == "GET":
+        return 200, state.read(token, lambda session: month_totals(session, key))
+    if resource in LIST_FIELDS and index_text is None and method == "POST":
+        item = build_item(resource, body)
+        index = state.write(token, lambda session: insert_item(session, key, resource, item))
+        return 201, {"index": index, "item": item}
+    if transactions is not None and resource == "budget":
+        index = int(index_text)
+        if method == "GET":
+            return 200, state.read(token, lambda session: item_transactions(session, key, index))
+        if method == "POST":
+            transaction = build_transaction(body)
+            item = state.write(token, lambda session: append_transaction(session, key, index, transaction))
+            return 201, {"transaction": transaction, "realization": item["realization"]}
+    if resource in LIST_FIELDS and index_text is not None and transactions is None:
+        index = int(index_text)
+        if method == "PATCH":
+            updated = state.write(token, lambda session: patch_item(session, key, resource, index, body))
+            return 200, {"item": updated}
+        if method == "DELETE":
+            removed = state.write(token, lambda session: dict(remove_item(session, key, resource, index)))
+            return 200, {"item": removed}
+    raise ServiceError(405, f"{method} not allowed on {path}")
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "TagihanSerampangan/1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self.dispatch("GET")
+
+    def do_POST(self) -> None:
+        self.dispatch("POST")
+
+    def do_PATCH(self) -> None:
+        self.dispatch("PATCH")
+
+    def do_DELETE(self) -> None:
+        self.dispatch("DELETE")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def dispatch(self, method: str) -> None:
+        header = self.headers.get("Authorization", "")
+        token = header[7:] if header.startswith("Bearer ") else None
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            body = json.loads(raw.decode("utf-8")) if raw else {}
+            if not isinstance(body, dict):
+                raise ValueError("Request body must be a JSON object")
+            status, payload = handle_service_request(self.server.state, method, self.path, body, token)
+        except ServiceError as error:
+            status, payload = error.status, {"error": str(error)}
+        except IndexError:
+            status, payload = 404, {"error": "Item not found."}
+        except (ValueError, UnicodeDecodeError) as error:
+            status, payload = 400, {"error": str(error)}
+
+        encoded = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+def run_service(host: str, port: int, flush_interval: float, verbose: bool = False) -> None:
+    state = ServiceState(flush_interval)
+    server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.state = state
+    server.verbose = verbose
+    state.start()
+    console.print(f"[green]Serving on http://{host}:{server.server_address[1]} (Ctrl+C to stop)[/]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        state.stop()
+        console.print("[green]Service stopped, pending changes saved.[/]")
+
+
+def load_test_credentials(index: int) -> Tuple[str, str]:
+    return f"loadtest-{index}@example.com", f"loadtest-{index}"
+
+
+def seed_load_test_data(path: Path, users: int) -> None:
+    data = default_data()
+    data["pending_profile"] = None
+    for index in range(users):
+        email, password = load_test_credentials(index)
+        user, key = create_user_entry(email, password)
+        data["users"].append(user)
+        data["profiles"][email] = encrypt_profile_payload(key, default_profile())
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(data, handle)
+
+
+FIXTURE_INCOME = (
+    ("Gaji Bulanan", 8_000_000),
+    ("Tunjangan Transport", 750_000),
+    ("Bonus Kinerja", 2_000_000),
+    ("Honor Freelance", 3_000_000),
+    ("Sewa Kos", 1_500_000),
+    ("Usaha Online", 2_500_000),
+    ("Dividen Saham", 500_000),
+    ("Komisi Penjualan", 1_200_000),
+)
+FIXTURE_SAVINGS = (
+    ("Dana Darurat", 1_500_000),
+    ("Tabungan Pendidikan", 1_000_000),
+    ("Reksa Dana", 750_000),
+    ("Tabungan Emas", 500_000),
+    ("Dana Pensiun", 600_000),
+    ("Tabungan Umrah", 1_000_000),
+    ("Dana Liburan", 500_000),
+    ("DP Rumah", 2_000_000),
+)
+FIXTURE_BUDGET = (
+    ("Makan & Minum", "Belanja Dapur", 2_000_000),
+    ("Makan & Minum", "Makan Siang Kantor", 800_000),
+    ("Makan & Minum", "Jajan & Kopi", 300_000),
+    ("Makan & Minum", "Galon & Gas", 150_000),
+    ("Rumah", "Listrik PLN", 400_000),
+    ("Rumah", "Air PDAM", 120_000),
+    ("Rumah", "Sewa Rumah", 2_500_000),
+    ("Rumah", "Iuran Kebersihan", 50_000),
+    ("Rumah", "Internet IndiHome", 350_000),
+    ("Transportasi", "Bensin", 600_000),
+    ("Transportasi", "Ojek Online", 400_000),
+    ("Transportasi", "KRL & TransJakarta", 200_000),
+    ("Transportasi", "Parkir & Tol", 200_000),
+    ("Komunikasi", "Pulsa & Kuota", 150_000),
+    ("Kesehatan", "BPJS Kesehatan", 150_000),
+    ("Kesehatan", "Obat & Vitamin", 200_000),
+    ("Pendidikan", "SPP Anak", 750_000),
+    ("Pendidikan", "Les Privat", 500_000),
+    ("Keluarga", "Kiriman Orang Tua", 1_000_000),
+    ("Keluarga", "Arisan", 300_000),
+    ("Keluarga", "Kondangan", 200_000),
+    ("Cicilan", "Cicilan Motor", 800_000),
+    ("Cicilan", "KPR", 3_000_000),
+    ("Cicilan", "Kartu Kredit", 1_000_000),
+    ("Ibadah", "Zakat", 250_000),
+    ("Ibadah", "Infaq & Sedekah", 200_000),
+    ("Hiburan", "Netflix & Spotify", 150_000),
+    ("Hiburan", "Nongkrong", 300_000),
+    ("Pajak", "Pajak Kendaraan", 180_000),
+)
+FIXTURE_HOLIDAY_MONTHS = (4, 12)  # Lebaran and year-end
+FIXTURE_HOLIDAY_CATEGORIES = {"Makan & Minum", "Transportasi", "Keluarga"}
+FIXTURE_HOLIDAY_FACTOR = 1.3
+FIXTURE_MONTHLY_GROWTH = 1.003
+
+
+def fixture_rupiah(value: float) -> int:
+    return max(int(round(value / 1_000)) * 1_000, 0)
+
+
+def fixture_entries(rng: random.Random, pool: Tuple[Tuple[Any, ...], ...], count: int) -> List[Tuple[Any, ...]]:
+    """``count`` entries of ``pool`` in random order with a per-user median; repeats get numbered names."""
+    order = rng.sample(pool, len(pool))
+    entries = []
+    for position in range(count):
+        *head, name, median = order[position % len(order)]
+        lap = position // len(order)
+        entries.append((*head, f"{name} {lap + 1}" if lap else name, median * rng.lognormvariate(0, 0.4)))
+    return entries
+
+
+def fixture_profile(rng: random.Random, months: int, items: int, end: str) -> Dict[str, Any]:
+    """A plausible household: stable item names, amounts with slow growth, holiday peaks and noise."""
+    scale = rng.lognormvariate(0, 0.5)
+    incomes = fixture_entries(rng, FIXTURE_INCOME, items)
+    savings = fixture_entries(rng, FIXTURE_SAVINGS, items)
+    budget = fixture_entries(rng, FIXTURE_BUDGET, items)
+    year, month = parse_month_key(end)
+    periods = []
+    for _ in range(months):
+        periods.append((year, month))
+        year, month = get_previous_month(year, month)
+    profile_months: Dict[str, Any] = {}
+    for age, (year, month) in enumerate(reversed(periods)):
+        level = scale * FIXTURE_MONTHLY_GROWTH**age
+        holiday = month in FIXTURE_HOLIDAY_MONTHS
+        budgeting_list = []
+        for category, name, median in budget:
+            peak = FIXTURE_HOLIDAY_FACTOR if holiday and category in FIXTURE_HOLIDAY_CATEGORIES else 1.0
+            allocation = fixture_rupiah(median * level * peak * rng.lognormvariate(0, 0.05))
+            ratio = max(rng.gauss(0.95, 0.15), 0.0)
+            if age == months - 1:
+                ratio *= rng.random()  # the current month is still in progress
+            realization = 0 if rng.random() < 0.05 else fixture_rupiah(allocation * ratio)
+            budgeting_list.append(
+                {"name": name, "allocation": allocation, "realization": realization, "category": category}
+            )
+        profile_months[month_key(year, month)] = {
+            "income_sources": [
+                {"name": name, "amount": fixture_rupiah(median * level * rng.lognormvariate(0, 0.1))}
+                for name, median in incomes
+            ],
+            "saving_list": [
+                {"name": name, "amount": fixture_rupiah(median * level * rng.lognormvariate(0, 0.1))}
+                for name, median in savings
+            ],
+            "budgeting_list": budgeting_list,
+        }
+    current_year, current_month = parse_month_key(end)
+    profile = {
+        "months": profile_months,
+        "current_year": current_year,
+        "current_month": current_month,
+        "language": "en" if rng.random() < 0.1 else "id",
+    }
+    ensure_profile_defaults(profile)
+    return profile
+
+
+def indent_json_member(value: Any, prefix: str = "") -> str:
+    """``value`` as ``json.dump(..., indent=2)`` writes it two levels deep in the data file."""
+    return "    " + prefix + json.dumps(value, indent=2).replace("\n", "\n    ")
+
+
+def fixture_user_task(task: Tuple[int, int, int]) -> Tuple[str, bytes]:
+    seed, index, iterations = task
+    rng = random.Random(f"{seed}:{index}:user")
+    email, password = load_test_credentials(index)
+    params = {"algorithm": "pbkdf2_sha256", "iterations": iterations}
+    user, key = create_user_entry(email, password, params, rng.randbytes(16))
+    return indent_json_member(user), key
+
+
+def fixture_record_task(task: Tuple[int, int, bytes, int, int, str]) -> str:
+    seed, index, key, months, items, end = task
+    rng = random.Random(f"{seed}:{index}:profile")
+    profile = fixture_profile(rng, months, items, end)
+    record = encrypt_profile_payload(key, profile, rng.randbytes(16))
+    search_index = SearchIndex.build(profile).to_payload(1)
+    search_index["postings"] = dict(sorted(search_index["postings"].items()))  # set order varies with the hash seed
+    record["index"] = encrypt_payload(key, search_index, rng.randbytes(16))
+    record["revision"] = 1
+    email, _ = load_test_credentials(index)
+    return indent_json_member(record, f"{json.dumps(email)}: ")
+
+
+def write_json_members(handle: Any, brackets: str, members: Iterator[str]) -> None:
+    separator = f"{brackets[0]}\n"
+    for member in members:
+        handle.write(separator)
+        handle.write(member)
+        separator = ",\n"
+    handle.write(f"\n  {brackets[1]}" if separator == ",\n" else brackets)
+
+
+def generate_dataset(
+    path: Path,
+    users: int,
+    months: int,
+    items: int,
+    seed: int,
+    iterations: int,
+    workers: int,
+    end: str,
+    keyfile: Optional[Path] = None,
+) -> None:
+    """Write a data file of ``users`` encrypted ``loadtest-N`` accounts, byte-identical for the same arguments.
+
+    Users are generated in a process pool and streamed into the file in the
+    exact layout ``save_data`` produces, so the app opens it without
+    rewriting it, however large it is.
+    """
+    started = time.perf_counter()
+    chunksize = max(1, min(64, users // (max(1, workers) * 4)))
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool, temporary.open("w", encoding="utf-8") as handle:
+        accounts = list(
+            pool.map(fixture_user_task, [(seed, index, iterations) for index in range(users)], chunksize=chunksize)
+        )
+        handle.write('{\n  "users": ')
+        write_json_members(handle, "[]", (entry for entry, _ in accounts))
+        handle.write(',\n  "profiles": ')
+        tasks = [(seed, index, key, months, items, end) for index, (_, key) in enumerate(accounts)]
+        write_json_members(handle, "{}", pool.map(fixture_record_task, tasks, chunksize=chunksize))
+        handle.write(',\n  "pending_profile": null,\n  "default_language": "id"\n}')
+    os.replace(temporary, path)
+    if keyfile is not None:
+        keyfile.write_text(
+            json.dumps(dict(load_test_credentials(index) for index in range(users)), indent=2), encoding="utf-8"
+        )
+    elapsed = time.perf_counter() - started
+    size = path.stat().st_size / 1_000_000
+    console.print(
+        f"[green]Wrote {users} users × {months} months × {items} items per list to {path}: "
+        f"{size:,.1f} MB in {elapsed:.1f}s ({size / elapsed:,.1f} MB/s).[/]"
+    )
+
+
+def best_time(task: Callable[[], Any], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, rounds)):
+        started = time.perf_counter()
+        task()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def retained_bytes(task: Callable[[], Any]) -> int:
+    """Bytes still allocated by what ``task`` returns."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = task()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained
+
+
+def run_storage_benchmark(months: int, items: int, rounds: int) -> None:
+    """Compare the plain stored profile with the dictionary-encoded one on a generated history."""
+    profile = fixture_profile(random.Random(0), max(1, months), max(0, items), "2025-05")
+    key = hashlib.sha256(b"bench-storage").digest()
+    encoders = {
+        "Plain": lambda: encrypt_payload(key, encode_profile_for_storage(profile)),
+        "Dictionary": lambda: encrypt_profile_payload(key, profile),
+    }
+    results: Dict[str, List[float]] = {}
+    for label, encode in encoders.items():
+        record = encode()
+        results[label] = [
+            len(record["ciphertext"]),
+            best_time(encode, rounds) * 1000,
+            best_time(lambda: decrypt_profile_payload(key, record), rounds) * 1000,
+            retained_bytes(lambda: decrypt_profile_payload(key, record)),
+        ]
+    table = Table(
+        title=f"Stored profile: {months} months × {items} items per list", header_style="bold white"
+    )
+    table.add_column("Measure", style="white")
+    for label in encoders:
+        table.add_column(label, justify="right")
+    table.add_column("Change", style="cyan", justify="right")
+    for row, (measure, unit) in enumerate(
+        (("Payload (base64)", "bytes"), ("Encrypt", "ms"), ("Decrypt", "ms"), ("Decoded profile in memory", "bytes"))
+    ):
+        plain, packed = results["Plain"][row], results["Dictionary"][row]
+        cells = [f"{value:,.0f} {unit}" if unit == "bytes" else f"{value:,.1f} {unit}" for value in (plain, packed)]
+        table.add_row(measure, *cells, f"{(packed - plain) / plain * 100:+.0f}%" if plain else "-")
+    console.print(table)
+
+
+def service_call(
+    connection: http.client.HTTPConnection,
+    method: str,
+    path: str,
+    body: Optional[Dict[str, Any]] = None,
+    token: Optional[str] = None,
+) -> Tuple[int, Any]:
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    encoded = json.dumps(body).encode("utf-8") if body is not None else None
+    connection.request(method, path, body=encoded, headers=headers)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read().decode("utf-8"))
+
+
+def simulate_service_user(
+    host: str,
+    port: int,
+    index: int,
+    requests: int,
+    write_ratio: float,
+    barrier: threading.Barrier,
+) -> Tuple[List[float], int]:
+    email, password = load_test_credentials(index)
+    connection = http.client.HTTPConnection(host, port, timeout=60)
+    latencies: List[float] = []
+    errors = 0
+    try:
+        try:
+            status, payload = service_call(connection, "POST", "/login", {"email": email, "password": password})
+            token = payload.get("token") if status == 200 else None
+        except (OSError, http.client.HTTPException, ValueError):
+            # Still reach the barrier, or the other users and the timer wait forever.
+            token = None
+        barrier.wait()
+        if token is None:
+            return latencies, requests
+        rng = random.Random(index)
+        key = month_key(2025, 5)
+        for _ in range(requests):
+            roll = rng.random()
+            started = time.perf_counter()
+            if roll < write_ratio:
+                item = {"name": f"Beban {rng.randrange(1000)}", "allocation": rng.randrange(10_000, 500_000)}
+                status, _ = service_call(connection, "POST", f"/months/{key}/budget", item, token)
+            elif roll < (1 + write_ratio) / 2:
+                status, _ = service_call(connection, "GET", f"/months/{key}/totals", token=token)
+            else:
+                status, _ = service_call(connection, "GET", f"/months/{key}", token=token)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors += 1
+    finally:
+        connection.close()
+    return latencies, errors
+
+
+def wait_for_port(host: str, port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def run_load_test(users: int, requests: int, write_ratio: float, url: Optional[str] = None) -> None:
+    """Measure requests/sec of ``serve`` with many simulated users.
+
+    Without ``url`` a throwaway server is started in a child process on a
+    temporary data file seeded with ``loadtest-N@example.com`` accounts
+    (password ``loadtest-N``). With ``url`` those accounts must already exist.
+    """
+    server_process = None
+    workdir = None
+    if url:
+        parsed = urlparse(url)
+        host, port = parsed.hostname or "127.0.0.1", parsed.port or 80
+    else:
+        workdir = tempfile.TemporaryDirectory()
+        data_path = Path(workdir.name) / "tagihan_data.json"
+        console.print(f"Seeding {users} load-test users...")
+        seed_load_test_data(data_path, users)
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            host, port = "127.0.0.1", probe.getsockname()[1]
+        server_process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--data-file", str(data_path), "serve", "--port", str(port)],
+            stdout=subprocess.DEVNULL,
+        )
+        wait_for_port(host, port, timeout=30)
+
+    try:
+        barrier = threading.Barrier(users + 1)
+        with ThreadPoolExecutor(max_workers=users) as pool:
+            futures = [
+                pool.submit(simulate_service_user, host, port, index, requests, write_ratio, barrier)
+                for index in range(users)
+            ]
+            barrier.wait()
+            started = time.perf_counter()
+            results = [future.result() for future in futures]
+            elapsed = time.perf_counter() - started
+    finally:
+        if server_process is not None:
+            server_process.send_signal(signal.SIGINT)
+            server_process.wait(timeout=30)
+        if workdir is not None:
+            workdir.cleanup()
+
+    latencies = sorted(latency for user_latencies, _ in results for latency in user_latencies)
+    errors = sum(user_errors for _, user_errors in results)
+    total = len(latencies)
+
+    def percentile(fraction: float) -> float:
+        return latencies[min(total - 1, int(total * fraction))] * 1000 if total else 0.0
+
+    table = Table(title="Service load test", header_style="bold white")
+    table.add_column("Metric", style="white")
+    table.add_column("Value", style="cyan", justify="right")
+    table.add_row("Simulated users", str(users))
+    table.add_row("Requests", str(total))
+    table.add_row("Errors", str(errors))
+    table.add_row("Elapsed (s)", f"{elapsed:.2f}")
+    table.add_row("Requests/sec", f"{total / elapsed:.1f}" if elapsed else "-")
+    table.add_row("p50 latency (ms)", f"{percentile(0.50):.2f}")
+    table.add_row("p95 latency (ms)", f"{percentile(0.95):.2f}")
+    table.add_row("p99 latency (ms)", f"{percentile(0.99):.2f}")
+    console.print(table)
+
+
+def stress_worker(task: Tuple[str, int, int, str, str, int]) -> Tuple[int, int]:
+    """Run inside a child process: log in and commit ``operations`` edits."""
+    global DATA_FILE
+    data_path, worker, operations, email, password, seed = task
+    DATA_FILE = Path(data_path)
     data = load_data()
-    session = authenticate_user(data)
-    display_dashboard(session.profile)
+    user = get_user_entry(data, email)
+    key = derive_user_key(password, user)
+    record = data["profiles"].get(email)
+    session = start_session(data, email, decrypt_profile_payload(key, record), key, record_revision(record))
+    rng = random.Random(seed)
+    target = month_key(2025, 5)
+    conflicts = 0
+    for operation in range(operations):
+        item = {
+            "name": f"stress-{worker}-{operation}",
+            "allocation": rng.randrange(1_000, 100_000),
+            "realization": 0,
+            "category": "Stress",
+        }
+        while True:
+            insert_item(session, target, "budget", item)
+            try:
+                commit_session(session)
+                break
+            except ProfileConflictError:
+                conflicts += 1
+                reload_session_profile(session)
+    return operations, conflicts
+
+
+def run_stress_test(processes: int, users: int, operations: int) -> bool:
+    """Hammer one data file from many processes and check nothing was lost.
+
+    Workers share ``users`` accounts round-robin, so with more processes than
+    users several processes race on the same profile and must go through the
+    conflict/reload/retry path; the rest only contend on the file itself.
+    """
+    global DATA_FILE
+    original_file = DATA_FILE
+    with tempfile.TemporaryDirectory() as workdir:
+        DATA_FILE = Path(workdir) / "tagihan_data.json"
+        try:
+            data = default_data()
+            data["pending_profile"] = None
+            keys: Dict[str, bytes] = {}
+            for index in range(users):
+                email, password = load_test_credentials(index)
+                user, keys[email] = create_user_entry(email, password)
+                data["users"].append(user)
+                data["profiles"][email] = encrypt_profile_payload(keys[email], default_profile())
+            save_data(data)
+
+            tasks = []
+            for worker in range(processes):
+                email, password = load_test_credentials(worker % users)
+                tasks.append((str(DATA_FILE), worker, operations, email, password, worker))
+            started = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                results = list(pool.map(stress_worker, tasks))
+            elapsed = time.perf_counter() - started
+
+            final = read_data_file()
+            found: Set[str] = set()
+            for email, key in keys.items():
+                profile = decrypt_profile_payload(key, final["profiles"][email])
+                for item in get_month_data(profile, 2025, 5)["budgeting_list"]:
+                    if item.get("name", "").startswith("stress-"):
+                        found.add(item["name"])
+        finally:
+            DATA_FILE = original_file
+
+    expected = {f"stress-{worker}-{operation}" for worker in range(processes) for operation in range(operations)}
+    lost = expected - found
+    commits = sum(done for done, _ in results)
+    table = Table(title="Multi-process stress test", header_style="bold white")
+    table.add_column("Metric", style="white")
+    table.add_column("Value", style="cyan", justify="right")
+    table.add_row("Processes", str(processes))
+    table.add_row("Profiles", str(users))
+    table.add_row("Commits", str(commits))
+    table.add_row("Conflicts retried", str(sum(conflicts for _, conflicts in results)))
+    table.add_row("Elapsed (s)", f"{elapsed:.2f}")
+    table.add_row("Commits/sec", f"{commits / elapsed:.1f}" if elapsed else "-")
+    table.add_row("Lost updates", str(len(lost)))
+    console.print(table)
+    if lost:
+        console.print(f"[red]FAILED: {len(lost)} updates missing, e.g. {sorted(lost)[:5]}[/]")
+    else:
+        console.print("[green]OK: every committed update is present.[/]")
+    return not lost
+
+
+def load_keyfile(path: Path) -> Dict[str, Dict[str, str]]:
+    """Read ``{"email": {"password": "..."} | {"key": "<base64 key>"}}``."""
+    with path.open("r", encoding="utf-8") as handle:
+        raw = json.load(handle)
+    if not isinstance(raw, dict):
+        raise ValueError("Keyfile must map emails to credentials")
+    credentials: Dict[str, Dict[str, str]] = {}
+    for email, entry in raw.items():
+        if isinstance(entry, str):
+            entry = {"password": entry}
+        if not isinstance(entry, dict) or not ({"password", "key"} & set(entry)):
+            raise ValueError(f"Keyfile entry for {email} needs a password or key")
+        credentials[email.strip().lower()] = entry
+    return credentials
+
+
+def key_from_credentials(credentials: Dict[str, str], user: Dict[str, Any]) -> bytes:
+    if "key" in credentials:
+        return base64.b64decode(credentials["key"])
+    return derive_user_key(credentials["password"], dict(user))
+
+
+def month_in_range(key: str, start: Optional[str], end: Optional[str]) -> bool:
+    return (start is None or key >= start) and (end is None or key <= end)
+
+
+def summarize_profile_task(
+    task: Tuple[str, Dict[str, Any], Dict[str, Any], Dict[str, str], Optional[str], Optional[str]]
+) -> Tuple[str, List[Dict[str, Any]], Optional[str]]:
+    """Worker: unlock one profile and total every month in range."""
+    email, user, record, credentials, start, end = task
+    try:
+        key = key_from_credentials(credentials, user)
+        profile = decrypt_profile_payload(key, record)
+    except (ValueError, TypeError) as error:
+        return email, [], str(error)
+    rows = []
+    for key_text in sorted(profile.get("months", {})):
+        if not month_in_range(key_text, start, end):
+            continue
+        year, month = parse_month_key(key_text)
+        totals = calculate_month_totals(get_month_data(profile, year, month))
+        rows.append({"email": email, "month": key_text, **totals})
+    return email, rows, None
+
+
+REPORT_COLUMNS = ["email", "month", "total_income", "total_budgeted_expenses", "total_spending", "savings"]
+
+
+def iter_report_tasks(
+    data: Dict[str, Any], credentials: Dict[str, Dict[str, str]], start: Optional[str], end: Optional[str]
+) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any], Dict[str, str], Optional[str], Optional[str]]]:
+    for user in data["users"]:
+        email = user.get("email", "")
+        record = data["profiles"].get(email)
+        if email in credentials and isinstance(record, dict):
+            yield email, user, record, credentials[email], start, end
+
+
+def run_batch_summaries(
+    data: Dict[str, Any],
+    credentials: Dict[str, Dict[str, str]],
+    workers: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Iterator[Tuple[str, List[Dict[str, Any]], Optional[str]]]:
+    """Yield per-user summaries as soon as each worker process finishes one."""
+    tasks = iter_report_tasks(data, credentials, start, end)
+    if workers <= 1:
+        yield from map(summarize_profile_task, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(summarize_profile_task, tasks, chunksize=1)
+
+
+def run_admin_report(
+    keyfile: Path,
+    workers: int,
+    start: Optional[str],
+    end: Optional[str],
+    output_format: str,
+    output: Optional[Path],
+) -> None:
+    data = read_data_file()
+    credentials = load_keyfile(keyfile)
+    combined: Dict[str, Dict[str, int]] = {}
+    failures: List[Tuple[str, str]] = []
+    handle = output.open("w", encoding="utf-8", newline="") if output else sys.stdout
+    writer = csv.DictWriter(handle, fieldnames=REPORT_COLUMNS) if output_format == "csv" else None
+    if writer is not None:
+        writer.writeheader()
+    try:
+        for email, rows, error in run_batch_summaries(data, credentials, workers, start, end):
+            if error is not None:
+                failures.append((email, error))
+                continue
+            for row in rows:
+                if writer is not None:
+                    writer.writerow(row)
+                elif output_format == "jsonl":
+                    handle.write(json.dumps(row) + "\n")
+                month_totals = combined.setdefault(row["month"], dict.fromkeys(REPORT_COLUMNS[2:], 0))
+                for column in REPORT_COLUMNS[2:]:
+                    month_totals[column] += row[column]
+            handle.flush()
+    finally:
+        if output:
+            handle.close()
+
+    if output_format == "table":
+        table = Table(title="Combined monthly report", header_style="bold white")
+        table.add_column("Month", style="white")
+        for column, label in zip(REPORT_COLUMNS[2:], ("Income", "Budgeted", "Spending", "Savings")):
+            table.add_column(label, style="green", justify="right")
+        for month_text in sorted(combined):
+            table.add_row(month_text, *(format_currency(combined[month_text][column]) for column in REPORT_COLUMNS[2:]))
+        console.print(table)
+    missing = sorted(set(credentials) - {email for email, *_ in iter_report_tasks(data, credentials, start, end)})
+    for email in missing:
+        failures.append((email, "no such user or profile"))
+    for email, error in failures:
+        error_console.print(f"[red]{email}: {error}[/]")
+
+
+DASHBOARD_EXTENSIONS = {"rich": "ansi", "text": "txt", "json": "json", "html": "html"}
+
+
+def render_dashboard_task(
+    task: Tuple[str, Dict[str, Any], Dict[str, Any], Dict[str, str], Optional[str], str]
+) -> Tuple[str, str, Optional[str]]:
+    """Worker: unlock one profile and render its dashboard to a string."""
+    email, user, record, credentials, month, output_format = task
+    try:
+        key = key_from_credentials(credentials, user)
+        profile = decrypt_profile_payload(key, record)
+        if month is not None:
+            profile["current_year"], profile["current_month"] = parse_month_key(month)
+    except (ValueError, TypeError) as error:
+        return email, "", str(error)
+    view = dashboard_view(profile)
+    view["email"] = email
+    buffer = io.StringIO()
+    DASHBOARD_RENDERERS[output_format](view, buffer)
+    return email, buffer.getvalue(), None
+
+
+def run_dashboard_batch(
+    keyfile: Path, workers: int, month: Optional[str], output_format: str, output_dir: Optional[Path]
+) -> bool:
+    """Render the dashboard of every user in the keyfile, in parallel, to stdout or one file each."""
+    data = read_data_file()
+    credentials = load_keyfile(keyfile)
+    tasks = (
+        (email, user, record, entry, month, output_format)
+        for email, user, record, entry, *_ in iter_report_tasks(data, credentials, None, None)
+    )
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    failures: List[Tuple[str, str]] = []
+    written = 0
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        results = pool.map(render_dashboard_task, tasks, chunksize=1) if pool else map(render_dashboard_task, tasks)
+        for email, rendered, error in results:
+            if error is not None:
+                failures.append((email, error))
+                continue
+            if output_dir is None:
+                sys.stdout.write(rendered)
+            else:
+                suffix = f"-{month}" if month else ""
+                path = output_dir / f"{email}{suffix}.{DASHBOARD_EXTENSIONS[output_format]}"
+                path.write_text(rendered, encoding="utf-8")
+            written += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    missing = sorted(set(credentials) - {task[0] for task in iter_report_tasks(data, credentials, None, None)})
+    failures.extend((email, "no such user or profile") for email in missing)
+    for email, error in failures:
+        error_console.print(f"[red]{email}: {error}[/]")
+    if output_dir is not None:
+        error_console.print(f"Wrote {written} dashboard(s) to {output_dir}")
+    return not failures
+
+
+def run_report_benchmark(keyfile: Path, max_workers: int, start: Optional[str], end: Optional[str]) -> None:
+    data = read_data_file()
+    credentials = load_keyfile(keyfile)
+    table = Table(title="Batch report throughput", header_style="bold white")
+    table.add_column("Workers", justify="right")
+    table.add_column("Profiles", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Profiles/sec", style="cyan", justify="right")
+    workers = 1
+    while True:
+        started = time.perf_counter()
+        profiles = sum(1 for _ in run_batch_summaries(data, credentials, workers, start, end))
+        elapsed = time.perf_counter() - started
+        table.add_row(str(workers), str(profiles), f"{elapsed:.2f}", f"{profiles / elapsed:.1f}" if elapsed else "-")
+        if workers >= max_workers:
+            break
+        workers = min(workers * 2, max_workers)
+    console.print(table)
+
+
+def legacy_parse_amount_value(raw: str) -> int | None:
+    """The digits-only parser the amount benchmark measures against."""
+    cleaned = raw.strip()
+    if not cleaned:
+        return None
+    lowered = cleaned.lower()
+    if "-" in lowered or lowered.startswith("("):
+        return None
+    digits = "".join(ch for ch in lowered if ch.isdigit())
+    if not digits:
+        return None
+    try:
+        return int(digits)
+    except ValueError:
+        return None
+
+
+AMOUNT_BENCHMARK_NOTATIONS: Dict[str, Callable[[int], str]] = {
+    "plain": lambda value: str(value),
+    "id grouped": lambda value: f"{value:,}".replace(",", "."),
+    "rupiah": lambda value: f"Rp {value:,}".replace(",", ".") + ",-",
+    "en decimal": lambda value: f"{value:,}.00",
+    "rb suffix": lambda value: f"{value // 1_000}rb",
+    "jt suffix": lambda value: "Rp " + f"{value / 1_000_000:.3f}".rstrip("0").rstrip(".").replace(".", ",") + " jt",
+}
+
+
+def run_amount_benchmark(count: int, rounds: int) -> None:
+    rng = random.Random(7)
+    values = [rng.randrange(1, 5_000) * 1_000 for _ in range(max(1, count))]
+    table = Table(title="Amount parser throughput", header_style="bold white")
+    table.add_column("Notation", style="white")
+    table.add_column("Legacy values/sec", justify="right")
+    table.add_column("Compiled values/sec", style="cyan", justify="right")
+    table.add_column("Legacy correct", justify="right")
+    table.add_column("Compiled correct", justify="right")
+    for notation, render in AMOUNT_BENCHMARK_NOTATIONS.items():
+        samples = [render(value) for value in values]
+        row = [notation]
+        correct = []
+        for parser in (legacy_parse_amount_value, parse_amount_value):
+            best = float("inf")
+            for _ in range(max(1, rounds)):
+                started = time.perf_counter()
+                for sample in samples:
+                    parser(sample)
+                best = min(best, time.perf_counter() - started)
+            row.append(f"{len(samples) / best:,.0f}" if best else "-")
+            hits = sum(1 for sample, value in zip(samples, values) if parser(sample) == value)
+            correct.append(f"{hits * 100 / len(samples):.0f}%")
+        table.add_row(*row, *correct)
+    console.print(table)
+
+
+def forecast_benchmark_profile(years: int, categories: int) -> Dict[str, Any]:
+    """A profile with ``years`` of seasonal, trending spending over ``categories`` budget items."""
+    rng = random.Random(11)
+    shapes = [
+        (rng.randrange(100, 5_000) * 1_000, rng.uniform(-0.01, 0.02), rng.uniform(0, 0.4), rng.randrange(12))
+        for _ in range(categories)
+    ]
+    year, month = 2025 - years, 1
+    months: Dict[str, Any] = {}
+    for period in range(years * 12):
+        budget = []
+        for column, (base, growth, swing, peak) in enumerate(shapes):
+            season = 1 + swing * math.cos(2 * math.pi * (month - 1 - peak) / 12)
+            spent = base * (1 + growth * period) * season * rng.uniform(0.9, 1.1)
+            budget.append(
+                {"name": f"Item {column}", "allocation": base, "realization": int(spent), "category": f"Kategori {column}"}
+            )
+        months[month_key(year, month)] = {"income_sources": [], "saving_list": [], "budgeting_list": budget}
+        year, month = get_next_month(year, month)
+    year, month = get_previous_month(year, month)
+    return {"months": months, "current_year": year, "current_month": month, "language": "id"}
+
+
+def run_forecast_benchmark(years: int, categories: int, horizon: int, rounds: int) -> None:
+    profile = forecast_benchmark_profile(max(1, years), max(1, categories))
+    timings: Dict[str, float] = {}
+
+    def measure(label: str, task: Callable[[], Any]) -> Any:
+        best, result = float("inf"), None
+        for _ in range(max(1, rounds)):
+            started = time.perf_counter()
+            result = task()
+            best = min(best, time.perf_counter() - started)
+        timings[label] = best
+        return result
+
+    months, _, spent, _ = measure("Build month × category matrix", lambda: spending_history(profile))
+    python_result = measure("Forecast, pure Python", lambda: forecast_matrix_python(months, spent, horizon))
+    numpy_result = None
+    if load_numpy() is not None:
+        numpy_result = measure("Forecast, NumPy", lambda: forecast_matrix_numpy(months, spent, horizon).tolist())
+    table = Table(
+        title=f"Forecast: {len(months)} months × {len(spent[0])} categories, {horizon} months ahead",
+        header_style="bold white",
+    )
+    table.add_column("Step", style="white")
+    table.add_column("Best of runs", style="cyan", justify="right")
+    for label, seconds in timings.items():
+        table.add_row(label, f"{seconds * 1000:.1f} ms")
+    console.print(table)
+    if numpy_result is None:
+        console.print("NumPy is not installed; only the pure-Python forecast was measured.")
+        return
+    difference = max(abs(a - b) for left, right in zip(python_result, numpy_result) for a, b in zip(left, right))
+    console.print(
+        f"NumPy speedup: {timings['Forecast, pure Python'] / timings['Forecast, NumPy']:.1f}x, "
+        f"largest difference between the two paths: {difference:.6f}"
+    )
+
+
+EXPORT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "income": ("name", "amount"),
+    "saving": ("name", "amount"),
+    "budget": ("name", "allocation", "category", "realization"),
+}
+
+
+def iter_export_months(
+    profile: Dict[str, Any], start: Optional[str], end: Optional[str]
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """First pipeline stage: months in range, oldest first, materialized one at a time."""
+    for key in sorted(profile.get("months", {})):
+        if not month_in_range(key, start, end):
+            continue
+        try:
+            year, month = parse_month_key(key)
+        except ValueError:
+            continue
+        yield key, get_month_data(profile, year, month)
+
+
+def iter_export_rows(
+    months: Iterator[Tuple[str, Dict[str, Any]]], list_names: List[str]
+) -> Iterator[Tuple[str, str, List[Any]]]:
+    """Second stage: one ``(month, list, columns)`` row per item, columns in paste order."""
+    for key, month_data in months:
+        for list_name in list_names:
+            columns = EXPORT_COLUMNS[list_name]
+            for item in month_data[LIST_FIELDS[list_name]]:
+                yield key, list_name, [item.get(name, "" if name in ("name", "category") else 0) for name in columns]
+
+
+def write_export_rows(
+    rows: Iterator[Tuple[str, str, List[Any]]], handle: Any, output_format: str, with_month: bool
+) -> int:
+    """Last stage: write rows as they arrive and return how many were written.
+
+    CSV/TSV rows without ``with_month`` are exactly what the paste menu reads
+    (``name, amount`` or ``name, allocation, category, realization``).
+    """
+    writer = csv.writer(handle, delimiter="\t" if output_format == "tsv" else ",", lineterminator="\n")
+    count = 0
+    for key, list_name, values in rows:
+        if output_format == "jsonl":
+            handle.write(json.dumps({"month": key, "list": list_name, **dict(zip(EXPORT_COLUMNS[list_name], values))}) + "\n")
+        else:
+            writer.writerow([key, list_name, *values] if with_month else values)
+        count += 1
+    return count
+
+
+def run_export_command(
+    email: str,
+    list_names: List[str],
+    start: Optional[str],
+    end: Optional[str],
+    output_format: str,
+    output: Optional[Path],
+    with_month: bool,
+) -> None:
+    """Export items month by month through a generator pipeline.
+
+    Rows are written while the months are walked, so nothing but the decrypted
+    profile itself is held in memory. The profile is still one ciphertext and
+    is decrypted as a whole before the first row comes out.
+    """
+    data = read_data_file()
+    email = email.strip().lower()
+    key, viewer = unlock_command_user(data, email)
+    record = data["profiles"].get(email)
+    profile = decrypt_profile_payload(key, record) if isinstance(record, dict) else default_profile()
+    viewer["language"] = get_language(profile)
+    handle = output.open("w", encoding="utf-8", newline="") if output else sys.stdout
+    try:
+        count = write_export_rows(
+            iter_export_rows(iter_export_months(profile, start, end), list_names), handle, output_format, with_month
+        )
+    finally:
+        if output:
+            handle.close()
+    error_console.print(tr(viewer, "export_done", count=count))
+
+
+def rotation_journal_path() -> Path:
+    return DATA_FILE.with_name(DATA_FILE.name + ".rotation")
+
+
+def append_journal_event(path: Path, event: Dict[str, Any]) -> None:
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(event) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def read_rotation_journal(path: Path) -> Tuple[Optional[Dict[str, Any]], Dict[str, str], Set[str]]:
+    params: Optional[Dict[str, Any]] = None
+    planned: Dict[str, str] = {}
+    done: Set[str] = set()
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn final line from a crash mid-append
+            if event.get("event") == "start":
+                params = event.get("kdf")
+                if params is None and event.get("iterations"):  # journals from before calibrated KDFs
+                    params = {"algorithm": "pbkdf2_sha256", "iterations": event["iterations"]}
+            elif event.get("event") == "plan":
+                planned[event["email"]] = event.get("salt", "")
+            elif event.get("event") == "done":
+                done.add(event["email"])
+    return params, planned, done
+
+
+def reencrypt_profile_record(record: Any, old_key: bytes, new_key: bytes) -> Dict[str, Any]:
+    """Re-encrypt everything stored for one profile under ``new_key``."""
+    profile = decrypt_profile_payload(old_key, record) if isinstance(record, dict) else default_profile()
+    rotated = encrypt_profile_payload(new_key, profile)
+    if isinstance(record, dict) and record.get("history"):
+        rotated["history"] = [
+            {
+                "kind": entry.get("kind"),
+                **encrypt_bytes(new_key, open_encrypted_bytes(old_key, decode_encrypted_payload(entry))),
+            }
+            for entry in record["history"]
+        ]
+    if isinstance(record, dict) and isinstance(record.get("index"), dict):
+        index_payload = decrypt_payload(old_key, record["index"])
+        # The rotated record is committed one revision later; keep the index valid for it.
+        index_payload["revision"] = record_revision(record) + 1
+        rotated["index"] = encrypt_payload(new_key, index_payload)
+    return rotated
+
+
+def rotate_profile_task(
+    task: Tuple[str, Dict[str, Any], Any, Dict[str, str], Dict[str, Any]]
+) -> Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[str]]:
+    """Worker: unlock one profile with its old key and re-encrypt it under a fresh salt."""
+    email, user, record, credentials, params = task
+    new_password = credentials.get("new_password") or credentials.get("password")
+    if not new_password:
+        return email, None, None, "a password or new_password is required to derive the new key"
+    try:
+        old_key = key_from_credentials(credentials, user)
+        fresh_user, new_key = create_user_entry(email, new_password, params)
+        new_record = reencrypt_profile_record(record, old_key, new_key)
+    except (ValueError, TypeError) as error:
+        return email, None, None, str(error)
+    rotated = {name: value for name, value in user.items() if name not in KDF_USER_FIELDS}
+    return email, {**rotated, **fresh_user}, new_record, None
+
+
+def run_key_rotation(credentials: Dict[str, Dict[str, str]], params: Dict[str, Any], workers: int) -> bool:
+    """Re-derive keys and re-encrypt profiles in a process pool.
+
+    A journal next to the data file records every planned profile with its
+    original salt before any work starts. Each finished profile is committed
+    on its own (user entry and encrypted record in one atomic write), so after
+    a crash re-running the command skips profiles whose salt already changed
+    and only redoes the rest.
+    """
+    data = read_data_file()
+    journal = rotation_journal_path()
+    if journal.exists():
+        journal_params, planned, done = read_rotation_journal(journal)
+        params = journal_params or params
+        console.print(f"[yellow]Resuming interrupted rotation ({len(done)}/{len(planned)} done).[/]")
+    else:
+        planned = {
+            user["email"]: user.get("salt", "")
+            for user in data["users"]
+            if user.get("email") in credentials
+        }
+        append_journal_event(journal, {"event": "start", "kdf": params})
+        for email, salt in planned.items():
+            append_journal_event(journal, {"event": "plan", "email": email, "salt": salt})
+        done = set()
+
+    tasks = []
+    for email, original_salt in planned.items():
+        if email in done:
+            continue
+        user = next((entry for entry in data["users"] if entry.get("email") == email), None)
+        if user is None:
+            continue
+        if user.get("salt", "") != original_salt:
+            append_journal_event(journal, {"event": "done", "email": email})
+            done.add(email)
+            continue
+        if email not in credentials:
+            continue
+        record = data["profiles"].get(email)
+        tasks.append((email, dict(user), record, credentials[email], params))
+
+    expected = {task[0]: record_revision(task[2]) for task in tasks}
+    failures: List[Tuple[str, str]] = []
+    rotated = 0
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        for email, user, record, error in pool.map(rotate_profile_task, tasks, chunksize=1):
+            if error is not None:
+                failures.append((email, error))
+                continue
+            try:
+                conflicts = commit_profile_records(
+                    data, {email: record}, {email: expected[email]}, users={email: user}
+                )
+            except DataFileError as error:
+                failures.append((email, str(error)))
+                continue
+            if conflicts:
+                failures.append((email, "profile changed during rotation; run again"))
+                continue
+            append_journal_event(journal, {"event": "done", "email": email})
+            done.add(email)
+            rotated += 1
+
+    for email, error in failures:
+        error_console.print(f"[red]{email}: {error}[/]")
+    remaining = set(planned) - done
+    if not remaining:
+        journal.unlink()
+    console.print(
+        f"[green]Rotated {rotated} profile(s) to {describe_kdf(params)}; "
+        f"{len(remaining)} remaining.[/]"
+    )
+    return not remaining
+
+
+def prompt_rotation_credentials(email: str) -> Dict[str, Dict[str, str]]:
+    email = email.strip().lower()
+    current = getpass("Current password: ")
+    while True:
+        new_password = getpass("New password (leave blank to keep): ")
+        if not new_password:
+            break
+        if getpass("Confirm new password: ") == new_password:
+            break
+        console.print("[red]Passwords do not match. Try again.[/]")
+    entry = {"password": current}
+    if new_password:
+        entry["new_password"] = new_password
+    return {email: entry}
+
+
+@dataclass
+class FsckProblem:
+    """One finding of ``fsck``; ``path`` locates what ``--quarantine`` may move out of the file."""
+
+    location: str
+    message: str
+    severity: str = "error"
+    path: Optional[Tuple[Any, ...]] = None
+    integrity: bool = False
+
+
+FSCK_AMOUNT_FIELDS = ("amount", "allocation", "realization")
+
+
+def quarantine_path() -> Path:
+    return DATA_FILE.with_name(DATA_FILE.name + ".quarantine")
+
+
+def check_encrypted_payload(payload: Any) -> Tuple[Optional[Tuple[bytes, bytes, bytes]], Optional[str]]:
+    """Strictly decode nonce, ciphertext and tag; return the parts or what is wrong with them."""
+    if not isinstance(payload, dict):
+        return None, "not an object"
+    missing = [name for name in ("nonce", "ciphertext", "tag") if not isinstance(payload.get(name), str)]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    parts = []
+    for name in ("nonce", "ciphertext", "tag"):
+        try:
+            parts.append(base64.b64decode(payload[name], validate=True))
+        except ValueError:
+            return None, f"{name} is not valid base64"
+    nonce, ciphertext, tag = parts
+    if len(nonce) != 16:
+        return None, f"nonce is {len(nonce)} bytes, expected 16"
+    if len(tag) != 32:
+        return None, f"tag is {len(tag)} bytes, expected 32"
+    return (nonce, ciphertext, tag), None
+
+
+def open_checked_payload(
+    key: bytes, decoded: Tuple[bytes, bytes, bytes], compressed: bool = False
+) -> Tuple[Any, Optional[str]]:
+    """Verify the tag and parse the plaintext; return the document or the reason it failed."""
+    try:
+        plaintext = open_encrypted_bytes(key, decoded)
+    except ValueError:
+        return None, "HMAC tag does not match"
+    try:
+        if compressed:
+            plaintext = zlib.decompress(plaintext)
+        return json.loads(plaintext.decode("utf-8")), None
+    except (zlib.error, ValueError):
+        return None, "tag is valid but the plaintext does not parse"
+
+
+def stored_profile_problems(stored: Any) -> List[Tuple[str, str]]:
+    """Content checks on a decrypted, still encoded profile as ``(location suffix, message)`` pairs."""
+    if not isinstance(stored, dict):
+        return [("", "profile is not an object")]
+    months = stored.get("months", {})
+    if not isinstance(months, dict):
+        return [(".months", "months is not an object")]
+    problems = []
+    strings = stored.get("strings")
+    if strings is not None and not (isinstance(strings, list) and all(isinstance(value, str) for value in strings)):
+        problems.append((".strings", "not a list of strings"))
+        strings = []
+    for key, month_data in months.items():
+        where = f".months[{key}]"
+        try:
+            parse_month_key(key)
+        except ValueError:
+            problems.append((where, "invalid month key"))
+        if not isinstance(month_data, dict):
+            problems.append((where, "month is not an object"))
+            continue
+        if "copy_of" in month_data:
+            if month_data["copy_of"] not in months:
+                problems.append((where, f"copy_of points to missing month {month_data['copy_of']}"))
+            continue
+        for field_name in PROFILE_ALIAS_FIELDS:
+            items = month_data.get(field_name, [])
+            if not isinstance(items, list):
+                problems.append((f"{where}.{field_name}", "not a list"))
+                continue
+            for position, item in enumerate(items):
+                if not isinstance(item, dict):
+                    problems.append((f"{where}.{field_name}[{position}]", "item is not an object"))
+                    continue
+                for amount_field in FSCK_AMOUNT_FIELDS:
+                    value = item.get(amount_field, 0)
+                    if isinstance(value, bool) or not isinstance(value, int):
+                        problems.append((f"{where}.{field_name}[{position}].{amount_field}", f"not an integer: {value!r}"))
+                for string_field in PROFILE_STRING_FIELDS:
+                    value = item.get(string_field, "")
+                    known = strings is not None and type(value) is int and 0 <= value < len(strings)
+                    if not isinstance(value, str) and not known:
+                        problems.append((f"{where}.{field_name}[{position}].{string_field}", f"unknown string: {value!r}"))
+                if "ledger" in item:
+                    problem = ledger_problem(item["ledger"], strings)
+                    if problem is not None:
+                        problems.append((f"{where}.{field_name}[{position}].ledger", problem))
+    recurring = stored.get("recurring", [])
+    if not isinstance(recurring, list):
+        problems.append((".recurring", "not a list"))
+    else:
+        for position, template in enumerate(recurring):
+            if not isinstance(template, dict) or "id" not in template:
+                problems.append((f".recurring[{position}]", "template without id"))
+    return problems
+
+
+def fsck_history(email: str, entries: Any, key: Optional[bytes]) -> List[FsckProblem]:
+    """Check every history entry; a bad entry takes the deltas built on it along when quarantined."""
+    where = f"profiles[{email}].history"
+    if not isinstance(entries, list):
+        return [FsckProblem(where, "not a list", path=("profiles", email, "history"))]
+    bad: List[Tuple[int, str, bool]] = []
+    for position, sealed in enumerate(entries):
+        decoded, error = check_encrypted_payload(sealed)
+        if error is None and sealed.get("kind") not in ("full", "delta"):
+            error = f"unknown kind {sealed.get('kind')!r}"
+        if error is None and key is not None:
+            entry, error = open_checked_payload(key, decoded, compressed=True)
+            if error is None:
+                body = entry.get("profile") if entry.get("kind") == "full" else entry.get("delta")
+                if entry.get("kind") != sealed["kind"] or not isinstance(body, dict):
+                    error = "content does not match its kind"
+        if error is not None:
+            bad.append((position, error, error.startswith("HMAC")))
+    problems = []
+    for position, message, integrity in bad:
+        stop = next(
+            (
+                later
+                for later in range(position + 1, len(entries))
+                if isinstance(entries[later], dict) and entries[later].get("kind") == "full"
+            ),
+            len(entries),
+        )
+        if stop > position + 1:
+            message += f"; entries {position + 1}-{stop - 1} are deltas on top of it"
+        problems.append(
+            FsckProblem(f"{where}[{position}]", message, path=("profiles", email, "history", position, stop), integrity=integrity)
+        )
+    return problems
+
+
+def fsck_profile_task(
+    task: Tuple[str, Optional[Dict[str, Any]], Any, Optional[Dict[str, str]]]
+) -> Tuple[str, List[FsckProblem], bool]:
+    """Worker: check one profile record, verifying tags when credentials are given.
+
+    Returns the problems found and whether the record was checked with a key.
+    """
+    email, user, record, credentials = task
+    where = f"profiles[{email}]"
+    if not isinstance(record, dict):
+        return email, [FsckProblem(where, "record is not an object", path=("profiles", email))], False
+    problems: List[FsckProblem] = []
+    if user is None:
+        problems.append(FsckProblem(where, "no user entry owns this profile", "warning", path=("profiles", email)))
+    if "revision" in record and (isinstance(record["revision"], bool) or not isinstance(record["revision"], int)):
+        problems.append(FsckProblem(f"{where}.revision", f"not an integer: {record['revision']!r}", "warning"))
+    if "ciphertext" not in record:
+        problems.extend(
+            FsckProblem(where + suffix, message) for suffix, message in stored_profile_problems(record)
+        )
+        return email, problems, False
+
+    key: Optional[bytes] = None
+    if credentials is not None and user is not None:
+        try:
+            key = key_from_credentials(credentials, user)
+        except InvalidCredentialsError:
+            problems.append(FsckProblem(where, "keyfile password does not match; tags not verified", "warning"))
+        except (ValueError, TypeError) as error:
+            problems.append(FsckProblem(where, f"cannot derive key: {error}", "warning"))
+
+    decoded, error = check_encrypted_payload(record)
+    if error is None and key is not None:
+        stored, error = open_checked_payload(key, decoded)
+        if error is None:
+            problems.extend(
+                FsckProblem(where + suffix, message) for suffix, message in stored_profile_problems(stored)
+            )
+    if error is not None:
+        problems.append(
+            FsckProblem(where, f"payload: {error}", path=("profiles", email), integrity=error.startswith("HMAC"))
+        )
+
+    if "index" in record:
+        decoded, error = check_encrypted_payload(record["index"])
+        if error is None and key is not None:
+            payload, error = open_checked_payload(key, decoded)
+            if error is None and not (isinstance(payload, dict) and isinstance(payload.get("revision"), int)):
+                error = "tag is valid but the index has no revision"
+            elif error is None and payload["revision"] != record_revision(record):
+                problems.append(FsckProblem(f"{where}.index", "stale; rebuilt at next login", "warning"))
+        if error is not None:
+            problems.append(
+                FsckProblem(f"{where}.index", error, path=("profiles", email, "index"), integrity=error.startswith("HMAC"))
+            )
+
+    if "history" in record:
+        problems.extend(fsck_history(email, record["history"], key))
+
+    if key is not None and "password" not in credentials:
+        # A raw key cannot be checked against the password hash like a password can.
+        parts = 1 + ("index" in record) + (len(record["history"]) if isinstance(record.get("history"), list) else 0)
+        failed = [problem for problem in problems if problem.integrity]
+        if failed and len(failed) == parts:
+            # Nothing verifies: far more likely a wrong key than every part being tampered with.
+            problems = [problem for problem in problems if not problem.integrity]
+            problems.append(FsckProblem(where, "no part verifies with the keyfile credentials (wrong key?)", "warning"))
+            return email, problems, False
+    return email, problems, key is not None
+
+
+def fsck_user_problems(users: List[Any]) -> List[FsckProblem]:
+    problems = []
+    seen: Set[str] = set()
+    for position, user in enumerate(users):
+        where = f"users[{position}]"
+        if not isinstance(user, dict):
+            problems.append(FsckProblem(where, "not an object", path=("users", position)))
+            continue
+        email = user.get("email")
+        if not isinstance(email, str) or not email:
+            problems.append(FsckProblem(where, "missing email", path=("users", position)))
+            continue
+        where = f"users[{email}]"
+        if email in seen:
+            problems.append(FsckProblem(where, "duplicate entry; only the first is used", path=("users", position)))
+            continue
+        seen.add(email)
+        if "verifier" in user:
+            verifier = user["verifier"]
+            if not isinstance(verifier, str) or not re.fullmatch(r"[0-9a-f]{64}", verifier):
+                problems.append(FsckProblem(f"{where}.verifier", "not a SHA-256 hex digest"))
+            problem = kdf_params_problem(user.get("kdf"))
+            if problem is not None:
+                problems.append(FsckProblem(f"{where}.kdf", f"{problem}; the password cannot be checked"))
+        else:
+            password_hash = user.get("password_hash")
+            if not isinstance(password_hash, str) or not re.fullmatch(r"[0-9a-f]{64}", password_hash):
+                problems.append(FsckProblem(f"{where}.password_hash", "not a SHA-256 hex digest"))
+        try:
+            salt = base64.b64decode(user.get("salt") or "", validate=True)
+        except (ValueError, TypeError):
+            salt = b""
+        if not salt:
+            problems.append(FsckProblem(f"{where}.salt", "missing or not valid base64; the profile key cannot be derived"))
+        if "verifier" not in user and "kdf" in user and user_kdf_iterations(user) != (user["kdf"] or {}).get("iterations"):
+            problems.append(FsckProblem(f"{where}.kdf", "invalid iterations; the default is used", "warning"))
+    return problems
+
+
+def iter_fsck_tasks(
+    raw: Dict[str, Any], credentials: Dict[str, Dict[str, str]]
+) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Any, Optional[Dict[str, str]]]]:
+    users = {}
+    for user in raw["users"]:
+        if isinstance(user, dict) and isinstance(user.get("email"), str):
+            users.setdefault(user["email"], user)
+    for email, record in raw["profiles"].items():
+        yield email, users.get(email), record, credentials.get(email)
+
+
+def run_fsck_checks(
+    raw: Any, credentials: Dict[str, Dict[str, str]], workers: int
+) -> Iterator[Tuple[str, List[FsckProblem], bool]]:
+    """Yield ``(scope, problems, verified)``: the document and users first, then each profile."""
+    if not isinstance(raw, dict):
+        yield "", [FsckProblem("<document>", "top level is not a JSON object")], False
+        return
+    if "users" not in raw and "profiles" not in raw:
+        yield "", [FsckProblem("<document>", "legacy single-profile file; migrated on next start", "warning")], False
+        return
+    problems = []
+    for name, expected in (("users", list), ("profiles", dict)):
+        if not isinstance(raw.get(name), expected):
+            problems.append(FsckProblem(name, f"not a JSON {expected.__name__}", path=(name,)))
+    if raw.get("default_language", DEFAULT_LANGUAGE) not in available_languages():
+        problems.append(FsckProblem("default_language", f"unknown language {raw['default_language']!r}", "warning"))
+    if raw.get("pending_profile") is not None and not isinstance(raw["pending_profile"], dict):
+        problems.append(FsckProblem("pending_profile", "not an object", "warning"))
+    if isinstance(raw.get("users"), list):
+        problems.extend(fsck_user_problems(raw["users"]))
+    yield "", problems, False
+    if not isinstance(raw.get("users"), list) or not isinstance(raw.get("profiles"), dict):
+        return
+    tasks = iter_fsck_tasks(raw, credentials)
+    if workers <= 1:
+        yield from map(fsck_profile_task, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(fsck_profile_task, tasks, chunksize=1)
+
+
+def quarantine_problems(checked: Dict[str, Any], problems: List[FsckProblem]) -> Tuple[int, List[str]]:
+    """Move the entries behind ``problems`` into the quarantine file.
+
+    The data file is re-read under the lock; a profile whose revision moved
+    on since the check (or a users list that changed) is left alone.
+    Returns how many entries were moved and what was skipped.
+    """
+    skipped: List[str] = []
+    moved: List[Dict[str, Any]] = []
+    with data_file_lock():
+        with DATA_FILE.open("r", encoding="utf-8") as handle:
+            latest = json.load(handle)
+        history_drops: Dict[str, Set[int]] = {}
+        user_drops: Set[int] = set()
+        reasons: Dict[Tuple[Any, ...], List[str]] = {}
+        for problem in problems:
+            if problem.path is not None:
+                reasons.setdefault(problem.path, []).append(problem.message)
+        paths = set(reasons)
+        whole_records = {path[1] for path in paths if len(path) == 2 and path[0] == "profiles"}
+        for problem in problems:
+            path = problem.path
+            if path not in paths:
+                continue
+            paths.discard(path)
+            entry = {"location": problem.location, "reason": "; ".join(reasons[path])}
+            if len(path) == 1:
+                moved.append({**entry, "value": latest.get(path[0])})
+                latest[path[0]] = [] if path[0] == "users" else {}
+                continue
+            if path[0] == "users":
+                if latest.get("users") != checked.get("users"):
+                    skipped.append(f"{problem.location}: users changed since the check")
+                    continue
+                user_drops.add(path[1])
+                moved.append({**entry, "value": latest["users"][path[1]]})
+                continue
+            email = path[1]
+            if len(path) > 2 and email in whole_records:
+                continue
+            record = latest.get("profiles", {}).get(email)
+            if not isinstance(record, dict) or record_revision(record) != record_revision(checked["profiles"].get(email)):
+                skipped.append(f"{problem.location}: profile changed since the check")
+                continue
+            if len(path) == 2:
+                moved.append({**entry, "value": latest["profiles"].pop(email)})
+            elif path[2] == "index":
+                moved.append({**entry, "value": record.pop("index", None)})
+            elif len(path) == 3:
+                moved.append({**entry, "value": record.pop("history", None)})
+            else:
+                history_drops.setdefault(email, set()).update(range(path[3], path[4]))
+                moved.append({**entry, "value": record["history"][path[3] : path[4]]})
+        for email, positions in history_drops.items():
+            record = latest["profiles"].get(email)
+            if isinstance(record, dict) and isinstance(record.get("history"), list):
+                record["history"] = [entry for position, entry in enumerate(record["history"]) if position not in positions]
+        if user_drops:
+            latest["users"] = [user for position, user in enumerate(latest["users"]) if position not in user_drops]
+        if moved:
+            stamp = datetime.now().isoformat(timespec="seconds")
+            with quarantine_path().open("a", encoding="utf-8") as handle:
+                for entry in moved:
+                    handle.write(json.dumps({"time": stamp, **entry}) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+            save_data(latest)
+    return len(moved), skipped
+
+
+def run_fsck(keyfile: Optional[Path], workers: int, quarantine: bool) -> bool:
+    """Check the whole data file; return True when no errors remain."""
+    started = time.perf_counter()
+    try:
+        with DATA_FILE.open("r", encoding="utf-8") as handle:
+            raw = json.load(handle)
+    except json.JSONDecodeError as error:
+        error_console.print(f"[red]{DATA_FILE}: not valid JSON at line {error.lineno}, column {error.colno}: {error.msg}[/]")
+        return False
+    except OSError as error:
+        error_console.print(f"[red]{DATA_FILE}: {error}[/]")
+        return False
+    credentials = load_keyfile(keyfile) if keyfile else {}
+
+    table = Table(title=f"fsck {DATA_FILE}", header_style="bold white")
+    table.add_column("Location", style="white", overflow="fold")
+    table.add_column("Severity")
+    table.add_column("Problem", overflow="fold")
+    found: List[FsckProblem] = []
+    profiles = verified = 0
+    for scope, problems, was_verified in run_fsck_checks(raw, credentials, workers):
+        profiles += bool(scope)
+        verified += was_verified
+        for problem in problems:
+            found.append(problem)
+            color = "red" if problem.severity == "error" else "yellow"
+            table.add_row(Text(problem.location), Text(problem.severity, style=color), Text(problem.message))
+    if found:
+        console.print(table)
+    errors = sum(1 for problem in found if problem.severity == "error")
+    users = len(raw["users"]) if isinstance(raw, dict) and isinstance(raw.get("users"), list) else 0
+    console.print(
+        f"Checked {users} user(s) and {profiles} profile(s), {verified} of them with a key, "
+        f"in {time.perf_counter() - started:.2f}s: {errors} error(s), {len(found) - errors} warning(s)."
+    )
+    if quarantine and any(problem.path is not None for problem in found):
+        count, skipped = quarantine_problems(raw, found)
+        for reason in skipped:
+            error_console.print(f"[yellow]Not quarantined: {reason}[/]")
+        console.print(f"[green]Moved {count} entr{'y' if count == 1 else 'ies'} to {quarantine_path()}.[/]")
+        errors = sum(1 for problem in found if problem.severity == "error" and problem.path is None) + len(skipped)
+    return errors == 0
+
+
+def display_login_timings(timings: LoginTimings) -> None:
+    table = Table(title="Login timing breakdown", header_style="bold white")
+    table.add_column("Phase", style="white")
+    table.add_column("Seconds", style="cyan", justify="right")
+    for phase, seconds in timings.phases.items():
+        table.add_row(phase, f"{seconds:.4f}")
+    console.print(table)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="TagihanSerampangan money management dashboard")
+    parser.add_argument("--data-file", type=Path, help="path to the data file (default: tagihan_data.json)")
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="print a timing breakdown from launch to the first dashboard",
+    )
+    parser.add_argument(
+        "--kdf",
+        choices=("scrypt", "pbkdf2_sha256"),
+        help=f"key derivation for new and upgraded accounts (default: {KDF_ALGORITHM})",
+    )
+    parser.add_argument(
+        "--kdf-target",
+        type=float,
+        help=f"seconds one key derivation should take on this machine (default: {KDF_TARGET_SECONDS})",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser("calibrate-kdf", help="show the KDF parameters calibrated for this machine")
+
+    serve = commands.add_parser("serve", help="run the local multi-user HTTP/JSON service")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--flush-interval", type=float, default=2.0, help="seconds between batched writes")
+    serve.add_argument("--verbose", action="store_true", help="log every request")
+
+    loadtest = commands.add_parser("loadtest", help="measure requests/sec of the service with simulated users")
+    loadtest.add_argument("--users", type=int, default=20)
+    loadtest.add_argument("--requests", type=int, default=200, help="requests per simulated user")
+    loadtest.add_argument("--write-ratio", type=float, default=0.2)
+    loadtest.add_argument("--url", help="target an already running service instead of spawning one")
+
+    generate = commands.add_parser("generate", help="write a deterministic synthetic data file for load tests")
+    generate.add_argument("output", type=Path, help="data file to create")
+    generate.add_argument("--users", type=int, default=100)
+    generate.add_argument("--months", type=int, default=24, help="months of history per user")
+    generate.add_argument("--items", type=int, default=10, help="items per income, saving and budget list")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--end", default="2025-05", help="last (current) month of every profile")
+    generate.add_argument(
+        "--iterations", type=int, default=DEFAULT_KDF_ITERATIONS, help="PBKDF2 iterations (lower generates faster)"
+    )
+    generate.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    generate.add_argument("--keyfile", type=Path, help="also write the email-to-password map here")
+    generate.add_argument("--force", action="store_true", help="overwrite an existing output file")
+
+    stress = commands.add_parser("stress", help="check that concurrent CLI processes never lose updates")
+    stress.add_argument("--processes", type=int, default=8)
+    stress.add_argument("--users", type=int, default=4, help="profiles shared round-robin by the processes")
+    stress.add_argument("--operations", type=int, default=25, help="commits per process")
+
+    report = commands.add_parser("report", help="combined monthly report across many profiles")
+    report.add_argument("--keyfile", type=Path, required=True, help="JSON map of email to password or base64 key")
+    report.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    report.add_argument("--from", dest="start", help="first month, e.g. 2025-01")
+    report.add_argument("--to", dest="end", help="last month, e.g. 2025-12")
+    report.add_argument("--format", choices=("table", "csv", "jsonl"), default="table")
+    report.add_argument("--output", type=Path, help="write csv/jsonl rows here instead of stdout")
+    report.add_argument("--benchmark", action="store_true", help="measure throughput for 1..--workers processes")
+
+    rotate = commands.add_parser("rotate-keys", help="change passwords and re-encrypt profiles with fresh keys")
+    rotate_source = rotate.add_mutually_exclusive_group(required=True)
+    rotate_source.add_argument("--keyfile", type=Path, help="JSON map of email to password/key and new_password")
+    rotate_source.add_argument("--email", help="rotate a single account, prompting for passwords")
+    rotate.add_argument("--iterations", type=int, help="PBKDF2 iterations for new keys (default: the calibrated KDF)")
+    rotate.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+
+    bench = commands.add_parser("bench-amounts", help="compare amount parser throughput with the legacy parser")
+    bench.add_argument("--values", type=int, default=200_000)
+    bench.add_argument("--rounds", type=int, default=3, help="best of this many runs is reported")
+
+    bench_forecast = commands.add_parser("bench-forecast", help="time the spending forecast with and without NumPy")
+    bench_forecast.add_argument("--years", type=int, default=10)
+    bench_forecast.add_argument("--categories", type=int, default=200)
+    bench_forecast.add_argument("--horizon", type=int, default=FORECAST_HORIZON)
+    bench_forecast.add_argument("--rounds", type=int, default=3, help="best of this many runs is reported")
+
+    bench_storage = commands.add_parser("bench-storage", help="compare plain and dictionary-encoded stored profiles")
+    bench_storage.add_argument("--months", type=int, default=120)
+    bench_storage.add_argument("--items", type=int, default=20, help="items per income, saving and budget list")
+    bench_storage.add_argument("--rounds", type=int, default=3, help="best of this many runs is reported")
+
+    fsck = commands.add_parser("fsck", help="check every user and profile record in the data file")
+    fsck.add_argument("--keyfile", type=Path, help="JSON map of email to password or base64 key; enables tag checks")
+    fsck.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    fsck.add_argument("--quarantine", action="store_true", help="move corrupt entries to <data file>.quarantine")
+
+    dashboard = commands.add_parser("dashboard", help="render monthly dashboards for many users without the menu")
+    dashboard.add_argument("--keyfile", type=Path, required=True, help="JSON map of email to password or base64 key")
+    dashboard.add_argument("--month", help="month to show, e.g. 2025-05 (default: each profile's current month)")
+    dashboard.add_argument("--format", choices=tuple(DASHBOARD_RENDERERS), default="text")
+    dashboard.add_argument("--output-dir", type=Path, help="write one file per user here instead of stdout")
+    dashboard.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+
+    search = commands.add_parser("search", help="search item names and categories across all months")
+    search.add_argument("query")
+    search.add_argument("--email", required=True)
+
+    export = commands.add_parser("export", help="stream items of selected months to CSV, TSV or JSONL")
+    export.add_argument("--email", required=True)
+    export.add_argument(
+        "--list",
+        dest="lists",
+        action="append",
+        choices=list(LIST_FIELDS),
+        help="list to export; repeat for several (default: all; csv/tsv take one list to stay pasteable)",
+    )
+    export.add_argument("--from", dest="start", help="first month, e.g. 2025-01")
+    export.add_argument("--to", dest="end", help="last month, e.g. 2025-12")
+    export.add_argument("--format", choices=("csv", "tsv", "jsonl"), default="tsv")
+    export.add_argument("--output", type=Path, help="write here instead of stdout")
+    export.add_argument("--with-month", action="store_true", help="prefix csv/tsv rows with month and list")
+
+    history = commands.add_parser("history", help="list, compare and restore saved versions of a profile")
+    history.add_argument("--email", required=True)
+    history_actions = history.add_subparsers(dest="history_action", required=True)
+    history_actions.add_parser("list", help="show saved versions")
+    history_diff = history_actions.add_parser("diff", help="compare two versions (or one with the current profile)")
+    history_diff.add_argument("old", type=int, help="revision to compare from")
+    history_diff.add_argument("new", type=int, nargs="?", help="revision to compare to (default: current)")
+    history_diff.add_argument("--month", help="only this month, e.g. 2025-05")
+    history_restore = history_actions.add_parser("restore", help="bring back one month as it was in a version")
+    history_restore.add_argument("revision", type=int)
+    history_restore.add_argument("month", help="month to restore, e.g. 2025-05")
+    history_retention = history_actions.add_parser("retention", help="show or change how much history is kept")
+    history_retention.add_argument("--versions", type=int, help="maximum number of versions")
+    history_retention.add_argument("--size-factor", type=float, help="maximum history size as a multiple of the profile")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    global DATA_FILE, KDF_ALGORITHM, KDF_TARGET_SECONDS
+    args = parse_args(argv)
+    if args.data_file is not None:
+        DATA_FILE = args.data_file
+    if args.kdf is not None:
+        KDF_ALGORITHM = args.kdf
+    if args.kdf_target is not None:
+        KDF_TARGET_SECONDS = max(args.kdf_target, 0.01)
+    if KDF_ALGORITHM == "scrypt" and not hasattr(hashlib, "scrypt"):
+        error_console.print("[red]scrypt is not available in this Python build; use --kdf pbkdf2_sha256.[/]")
+        sys.exit(2)
+    if args.command == "calibrate-kdf":
+        run_kdf_calibration()
+        return
+    if args.command == "serve":
+        run_service(args.host, args.port, args.flush_interval, args.verbose)
+        return
+    if args.command == "loadtest":
+        run_load_test(args.users, args.requests, args.write_ratio, args.url)
+        return
+    if args.command == "generate":
+        try:
+            parse_month_key(args.end)
+        except ValueError as error:
+            error_console.print(f"[red]{error}[/]")
+            sys.exit(2)
+        if args.output.exists() and not args.force:
+            error_console.print(f"[red]{args.output} already exists; pass --force to overwrite it.[/]")
+            sys.exit(1)
+        generate_dataset(
+            args.output,
+            max(0, args.users),
+            max(1, args.months),
+            max(0, args.items),
+            args.seed,
+            max(1, args.iterations),
+            args.workers,
+            args.end,
+            args.keyfile,
+        )
+        return
+    if args.command == "report":
+        if args.benchmark:
+            run_report_benchmark(args.keyfile, args.workers, args.start, args.end)
+        else:
+            run_admin_report(args.keyfile, args.workers, args.start, args.end, args.format, args.output)
+        return
+    if args.command == "rotate-keys":
+        credentials = load_keyfile(args.keyfile) if args.keyfile else prompt_rotation_credentials(args.email)
+        params = {"algorithm": "pbkdf2_sha256", "iterations": max(1, args.iterations)} if args.iterations else None
+        if not run_key_rotation(credentials, params or calibrate_kdf(), args.workers):
+            sys.exit(1)
+        return
+    if args.command == "bench-amounts":
+        run_amount_benchmark(args.values, args.rounds)
+        return
+    if args.command == "bench-forecast":
+        run_forecast_benchmark(args.years, args.categories, args.horizon, args.rounds)
+        return
+    if args.command == "bench-storage":
+        run_storage_benchmark(args.months, args.items, args.rounds)
+        return
+    if args.command == "fsck":
+        if not run_fsck(args.keyfile, args.workers, args.quarantine):
+            sys.exit(1)
+        return
+    if args.command == "dashboard":
+        try:
+            if args.month is not None:
+                parse_month_key(args.month)
+        except ValueError as error:
+            error_console.print(f"[red]{error}[/]")
+            sys.exit(2)
+        if not run_dashboard_batch(args.keyfile, args.workers, args.month, args.format, args.output_dir):
+            sys.exit(1)
+        return
+    if args.command == "search":
+        run_search_command(args.email, args.query)
+        return
+    if args.command == "history":
+        run_history_command(args)
+        return
+    if args.command == "export":
+        lists = args.lists or list(LIST_FIELDS)
+        if args.format != "jsonl" and len(lists) > 1 and not args.with_month:
+            error_console.print("[red]csv/tsv export takes one --list (or use --with-month or --format jsonl)[/]")
+            sys.exit(2)
+        run_export_command(args.email, lists, args.start, args.end, args.format, args.output, args.with_month)
+        return
+    if args.command == "stress":
+        if not run_stress_test(args.processes, args.users, args.operations):
+            sys.exit(1)
+        return
+
+    timings = LoginTimings()
+
+    def timed_load() -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            return load_data()
+        finally:
+            timings.record("load_data (background)", started)
+
+    # Reading, normalizing and rewriting the data file overlaps with the login prompt.
+    with ThreadPoolExecutor(max_workers=1) as loader:
+        data_future = loader.submit(timed_load)
+        session = authenticate_user(data_future, timings)
+
+    render_started = time.perf_counter()
+    display_dashboard(session.profile, session.month_cache)
+    timings.record("dashboard", render_started)
+    total = time.perf_counter() - timings.launched
+    timings.phases["total"] = total
+    timings.phases["total excluding user input"] = total - timings.phases.get("user_input", 0.0)
+    if args.timings:
+        display_login_timings(timings)
     main_menu(session)
 
 
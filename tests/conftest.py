@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import tagihanserampangan  # noqa: E402
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    """Point the module at a throwaway data file and keep KDF runs cheap."""
+    path = tmp_path / "tagihan_data.json"
+    monkeypatch.setattr(tagihanserampangan, "DATA_FILE", path)
+    monkeypatch.setattr(tagihanserampangan, "KDF_TARGET_SECONDS", 0.01)
+    return path
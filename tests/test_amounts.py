@@ -0,0 +1,36 @@
+import pytest
+
+from tagihanserampangan import default_profile, merge_amount_tokens, parse_amount_value, parse_pasted_rows
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("150000", 150_000),
+        ("1.500.000", 1_500_000),
+        ("1,500,000.50", 1_500_001),
+        ("1,5", 2),
+        ("1.250 jt", 1_250_000),
+        ("Rp 2,5 jt", 2_500_000),
+        ("750rb", 750_000),
+        ("Rp15.000,-", 15_000),
+    ],
+)
+def test_parses_notations(raw, expected):
+    assert parse_amount_value(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["²", "12²", "١٢٣", ",-", "", "-5000", "1.50.000"])
+def test_rejects_malformed_and_non_ascii_digits(raw):
+    assert parse_amount_value(raw) is None
+
+
+def test_paste_reports_unicode_digit_amount_instead_of_crashing():
+    rows, errors = parse_pasted_rows(default_profile(), ["Listrik\t²"], "bill")
+    assert rows == []
+    assert len(errors) == 1
+
+
+def test_merge_amount_tokens_only_joins_ascii_groups():
+    assert merge_amount_tokens("1", ["500", "000"]) == ("1,500,000", [])
+    assert merge_amount_tokens("1", ["²²²"]) == ("1", ["²²²"])
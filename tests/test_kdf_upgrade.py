@@ -0,0 +1,84 @@
+import base64
+import json
+
+import pytest
+
+import tagihanserampangan as t
+
+EMAIL = "legacy@example.com"
+PASSWORD = "rahasia-lama"
+MONTH = "2025-05"
+
+
+@pytest.fixture
+def legacy_user(data_file):
+    """A data file with one user still on the unsalted hash and a cheap PBKDF2 key."""
+    salt = bytes(range(16))
+    user = {
+        "email": EMAIL,
+        "password_hash": t.hash_password(PASSWORD),
+        "salt": base64.b64encode(salt).decode("utf-8"),
+        "kdf": {"algorithm": "pbkdf2_sha256", "iterations": 1_000},
+    }
+    data = t.default_data()
+    data["pending_profile"] = None
+    data["users"].append(user)
+    data["profiles"][EMAIL] = t.encrypt_profile_payload(t.derive_key(PASSWORD, salt, 1_000), t.default_profile())
+    data_file.write_text(json.dumps(data), encoding="utf-8")
+    return data_file
+
+
+def log_in_and_edit(name):
+    """Another process: load the file, log in (upgrading the KDF) and save one edit."""
+    data = t.load_data()
+    user = t.get_user_entry(data, EMAIL)
+    record = data["profiles"][EMAIL]
+    key = t.derive_user_key(PASSWORD, user)
+    key, profile = t.unlock_with_kdf_upgrade(data, EMAIL, user, PASSWORD, key, t.decrypt_profile_payload(key, record))
+    session = t.start_session(data, EMAIL, profile, key, t.record_revision(data["profiles"][EMAIL]))
+    t.insert_item(session, MONTH, "budget", t.build_item("budget", {"name": name, "allocation": 1_000}))
+    t.commit_session(session)
+
+
+def saved_budget_names():
+    data = t.load_data()
+    user = t.get_user_entry(data, EMAIL)
+    assert not t.kdf_needs_upgrade(user)
+    profile = t.decrypt_profile_payload(t.derive_user_key(PASSWORD, user), data["profiles"][EMAIL])
+    return [item["name"] for item in profile.get("months", {}).get(MONTH, {}).get("budgeting_list", [])]
+
+
+def test_cli_login_that_loses_the_upgrade_race_reopens_the_other_version(legacy_user, monkeypatch):
+    unlock = t.unlock_profile_pipelined
+    raced = []
+
+    def unlock_then_race(*args, **kwargs):
+        unlocked = unlock(*args, **kwargs)
+        if not raced:
+            raced.append(True)
+            log_in_and_edit("From B")
+        return unlocked
+
+    monkeypatch.setattr(t, "unlock_profile_pipelined", unlock_then_race)
+    monkeypatch.setattr("builtins.input", lambda prompt="": EMAIL)
+    monkeypatch.setattr(t, "getpass", lambda prompt="": PASSWORD)
+
+    session = t.authenticate_user(t.load_data())
+    assert "From B" in [item["name"] for item in t.get_item_list(session, MONTH, "budget")]
+    t.insert_item(session, MONTH, "budget", t.build_item("budget", {"name": "From A", "allocation": 1_000}))
+    t.persist_session(session)
+
+    assert saved_budget_names()[-2:] == ["From B", "From A"]
+
+
+def test_service_login_that_loses_the_upgrade_race_reopens_the_other_version(legacy_user):
+    state = t.ServiceState(flush_interval=3600)
+    try:
+        log_in_and_edit("From B")
+        token = state.login(EMAIL, PASSWORD)
+        state.write(token, lambda session: t.insert_item(session, MONTH, "budget", {"name": "From A", "allocation": 1}))
+        assert state.flush() == 1
+    finally:
+        state.stop()
+
+    assert saved_budget_names()[-2:] == ["From B", "From A"]
@@ -0,0 +1,103 @@
+import socket
+import threading
+
+import pytest
+
+import tagihanserampangan as t
+
+MONTH = "2025-05"
+
+
+@pytest.fixture
+def service(data_file):
+    t.seed_load_test_data(data_file, 1)
+    state = t.ServiceState(flush_interval=3600)
+    yield state
+    state.stop()
+
+
+def budget_names(session):
+    return [item["name"] for item in t.get_item_list(session, MONTH, "budget")]
+
+
+def test_login_never_holds_a_user_lock_while_waiting_for_the_flusher(service):
+    email, password = t.load_test_credentials(0)
+    token = service.login(email, password)
+    service.write(token, lambda session: t.insert_item(session, MONTH, "budget", {"name": "Unsaved", "allocation": 1}))
+
+    logged_in = threading.Event()
+    service.flush_lock.acquire()
+    try:
+        second = threading.Thread(target=lambda: (service.login(email, password), logged_in.set()), daemon=True)
+        second.start()
+        # The flusher holds flush_lock and now needs the user's lock; a waiting login must not be holding it.
+        acquired = service.user_lock(email).acquire(timeout=5)
+        assert acquired
+        service.user_lock(email).release()
+    finally:
+        service.flush_lock.release()
+    second.join(timeout=10)
+    assert logged_in.is_set()
+    assert service.flush() == 1
+
+
+def commit_from_other_process(edit):
+    email, password = t.load_test_credentials(0)
+    data = t.load_data()
+    record = data["profiles"][email]
+    key = t.derive_user_key(password, t.get_user_entry(data, email))
+    session = t.start_session(data, email, t.decrypt_profile_payload(key, record), key, t.record_revision(record))
+    edit(session)
+    t.commit_session(session)
+
+
+def saved_names():
+    email, password = t.load_test_credentials(0)
+    data = t.load_data()
+    key = t.derive_user_key(password, t.get_user_entry(data, email))
+    profile = t.decrypt_profile_payload(key, data["profiles"][email])
+    return [item["name"] for item in profile["months"][MONTH]["budgeting_list"]]
+
+
+def test_flush_replays_acknowledged_edits_after_a_conflict(service):
+    token = service.login(*t.load_test_credentials(0))
+    status, _ = t.handle_service_request(service, "POST", f"/months/{MONTH}/budget", {"name": "Ours"}, token)
+    assert status == 201
+    commit_from_other_process(lambda session: t.insert_item(session, MONTH, "budget", {"name": "Theirs"}))
+
+    assert service.flush() == 0
+    assert service.flush() == 1
+    assert saved_names()[-2:] == ["Theirs", "Ours"]
+
+
+def test_flush_keeps_edits_that_no_longer_apply_and_answers_409(service):
+    token = service.login(*t.load_test_credentials(0))
+    last = len(budget_names(service.session_for(token))) - 1
+    t.handle_service_request(service, "PATCH", f"/months/{MONTH}/budget/{last}", {"allocation": 7}, token)
+
+    def remove_all(session):
+        while t.get_item_list(session, MONTH, "budget"):
+            t.remove_item(session, MONTH, "budget", 0)
+
+    commit_from_other_process(remove_all)
+    assert service.flush() == 0
+    with pytest.raises(t.ServiceError) as raised:
+        t.handle_service_request(service, "GET", f"/months/{MONTH}/totals", {}, token)
+    assert raised.value.status == 409
+    kept = t.get_item_list(service.sessions[t.load_test_credentials(0)[0]], MONTH, "budget")
+    assert kept[last]["allocation"] == 7
+
+
+def test_load_test_user_reaches_the_barrier_when_login_fails():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    barrier = threading.Barrier(2)
+    result = []
+    worker = threading.Thread(
+        target=lambda: result.append(t.simulate_service_user("127.0.0.1", port, 0, 3, 0.5, barrier)), daemon=True
+    )
+    worker.start()
+    barrier.wait(timeout=10)
+    worker.join(timeout=10)
+    assert result == [([], 3)]